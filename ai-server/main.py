@@ -4,11 +4,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from neo4j import GraphDatabase
 from groq import Groq
 import json
-from typing import List, Dict, Any, Set, Tuple, Optional
-import re
-import math
-from collections import defaultdict, Counter
-from difflib import SequenceMatcher
+import copy
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Set, Optional
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
@@ -17,6 +18,18 @@ import logging
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import uvicorn
+from services.search_index import InvertedIndex
+from services.corpus_stats import CorpusStatistics, CorpusStatisticsCache
+from services.sparse_scoring import SparseScoringEngine
+from services.topk import select_top_k, min_max_normalize
+from services.trigram_index import TrigramSimilarityIndex, fuzzy_similarity
+from services.query_cache import QueryParseCache
+from services.evaluation_cache import EvaluationCache
+from services.candidate_queries import ALL_CANDIDATES_QUERY, CANDIDATES_BY_LOCATION_QUERY, CANDIDATE_BY_ID_QUERY
+from services.snapshot import write_snapshot, read_snapshot
+from services.candidate_store import CandidateStore
+from services.llm_client import RateLimitedLLMClient
+import numpy as np
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -84,9 +97,24 @@ class ComparisonResponse(BaseModel):
     overall_summary: str
     recommendation: Optional[str] = None
 
-# Global variable to store candidates data for comparison
+# Global variable to store candidates data for comparison: a memory-mapped
+# CandidateStore once loaded, parsed per candidate on demand
 candidates_data = {}
 
+# Candidate fields used to build the comparison summary
+COMPARISON_FIELDS = ['_id', 'candidate_name', 'contact_information', 'education', 'experience', 'projects', 'skills']
+
+# Per-candidate LLM evaluations in /compare run concurrently, capped and time-limited
+COMPARE_CONCURRENCY = int(os.getenv("COMPARE_CONCURRENCY", "6"))
+COMPARE_LLM_TIMEOUT = float(os.getenv("COMPARE_LLM_TIMEOUT", "60"))
+compare_semaphore = asyncio.Semaphore(COMPARE_CONCURRENCY)
+
+def release_compare_slot(analysis: asyncio.Future):
+    """Done-callback of a /compare evaluation: free its slot, and retrieve the error of one that timed out"""
+    compare_semaphore.release()
+    if not analysis.cancelled() and analysis.exception() is not None:
+        logger.error(f"AI analysis failed: {analysis.exception()}")
+
 # Standardized parameters for consistent comparison
 STANDARD_PARAMETERS = [
     "Technical Skills Depth",
@@ -120,6 +148,30 @@ class AdvancedCandidateSystem:
         # Groq configuration
         self.groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         self.llm_model = os.getenv("LLM_MODEL", "llama3-8b-8192")
+        # Every Groq call goes through one shared request/token budget with retries
+        self.llm = RateLimitedLLMClient(
+            self.groq_client,
+            requests_per_minute=float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30")),
+            tokens_per_minute=float(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000")),
+            max_retries=int(os.getenv("GROQ_MAX_RETRIES", "3"))
+        )
+        
+        # Cache of LLM query parses; bump the prompt version whenever the parsing prompt changes
+        self.query_parse_prompt_version = "1"
+        self.query_cache = QueryParseCache(
+            max_entries=int(os.getenv("QUERY_CACHE_SIZE", "1024")),
+            ttl_seconds=float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600")),
+            persist_path=os.getenv("QUERY_CACHE_PATH")
+        )
+        
+        # Persistent cache of per-candidate parameter evaluations for /compare;
+        # bump the prompt version whenever the evaluation prompt changes
+        self.evaluation_model = "llama-3.1-8b-instant"
+        self.evaluation_prompt_version = "1"
+        self.evaluation_cache = EvaluationCache(
+            os.getenv("EVALUATION_CACHE_PATH", "evaluation_cache.sqlite3"),
+            max_entries=int(os.getenv("EVALUATION_CACHE_SIZE", "10000"))
+        )
         
         # Initialize NLP components
         self.stemmer = PorterStemmer()
@@ -129,6 +181,11 @@ class AdvancedCandidateSystem:
         self.k1 = 1.5  # Term frequency saturation parameter
         self.b = 0.75  # Length normalization parameter
         
+        # Fuzzy similarity: "bounded" prunes SequenceMatcher calls and may underestimate a score
+        # by at most max_error; "exact" is the brute-force reference
+        self.similarity_mode = os.getenv("SIMILARITY_MODE", "bounded")
+        self.similarity_max_error = float(os.getenv("SIMILARITY_MAX_ERROR", "0.0"))
+        
         # Comprehensive technology and skill synonyms
         self.tech_synonyms = {
             'javascript': ['js', 'node.js', 'nodejs', 'react', 'angular', 'vue'],
@@ -143,8 +200,30 @@ class AdvancedCandidateSystem:
             'mobile': ['android', 'ios', 'react native', 'flutter', 'swift', 'kotlin']
         }
         
+        # Resident inverted index, built once at startup and queried per search. Statistics are
+        # patched after candidate writes; a burst of writes refreshes them (and rebuilds the scoring
+        # engine and similarity index) at most once per CORPUS_STATS_REFRESH_SECONDS
+        self.search_index = InvertedIndex()
+        self.corpus_stats = CorpusStatisticsCache(
+            self.search_index,
+            scope_document=self.scope_candidate_to_location,
+            refresh_interval=float(os.getenv("CORPUS_STATS_REFRESH_SECONDS", "2"))
+        )
+        # Searches run concurrently on worker threads; lazy index/engine builds happen once
+        self.build_lock = threading.Lock()
+        # Full rebuilds from the graph (startup, /index/rebuild, background refresh) run one at a time
+        self.rebuild_lock = threading.Lock()
+        
+        # Local snapshot of the joined candidate documents, used for cold starts and
+        # when the graph is unreachable; refreshed from the graph in the background
+        self.snapshot_path = os.getenv("SEARCH_SNAPSHOT_PATH", "search_snapshot.bin")
+        self.snapshot_refresh_seconds = float(os.getenv("SEARCH_SNAPSHOT_REFRESH_SECONDS", "3600"))
+        self.snapshot_refresh_stop = threading.Event()
+        
     def close(self):
+        self.snapshot_refresh_stop.set()
         self.driver.close()
+        self.evaluation_cache.close()
     
     def preprocess_text(self, text: str) -> List[str]:
         """Advanced text preprocessing with stemming and stop word removal"""
@@ -183,130 +262,79 @@ class AdvancedCandidateSystem:
     
     def fuzzy_string_similarity(self, s1: str, s2: str) -> float:
         """Calculate fuzzy string similarity using multiple algorithms"""
-        if not s1 or not s2:
-            return 0.0
-        
-        s1_lower = s1.lower().strip()
-        s2_lower = s2.lower().strip()
-        
-        # Exact match
-        if s1_lower == s2_lower:
-            return 1.0
-        
-        # Substring match
-        if s1_lower in s2_lower or s2_lower in s1_lower:
-            return 0.8
-        
-        # Sequence matcher similarity
-        seq_similarity = SequenceMatcher(None, s1_lower, s2_lower).ratio()
-        
-        # Token-based similarity
-        tokens1 = set(s1_lower.split())
-        tokens2 = set(s2_lower.split())
-        
-        if tokens1 and tokens2:
-            token_similarity = len(tokens1.intersection(tokens2)) / len(tokens1.union(tokens2))
-        else:
-            token_similarity = 0.0
-        
-        # Return maximum similarity
-        return max(seq_similarity, token_similarity)
+        return fuzzy_similarity(s1, s2)
+    
+    def add_text_corpus(self, candidate: Dict[str, Any]):
+        """Set a candidate's ``text_corpus`` from its fields and ``processed_tokens`` from that"""
+        text_corpus = []
+        
+        # Add all textual information
+        if candidate.get('name'):
+            text_corpus.append(candidate['name'])
+        if candidate.get('description'):
+            text_corpus.append(candidate['description'])
+        if candidate.get('summary'):
+            text_corpus.append(candidate['summary'])
+        
+        # Add skills and technologies
+        all_skills = (candidate.get('skills', []) or []) + (candidate.get('technologies', []) or [])
+        text_corpus.extend(all_skills)
+        
+        # Add company information
+        for company in (candidate.get('companies', []) or []):
+            if isinstance(company, dict) and company.get('name'):
+                text_corpus.append(company['name'])
+            elif isinstance(company, str):
+                text_corpus.append(company)
+        
+        # Add project information
+        for project in (candidate.get('projects', []) or []):
+            if isinstance(project, dict):
+                if project.get('name'):
+                    text_corpus.append(project['name'])
+                if project.get('description'):
+                    text_corpus.append(project['description'])
+                if project.get('technologies'):
+                    if isinstance(project['technologies'], list):
+                        text_corpus.extend(project['technologies'])
+                    else:
+                        text_corpus.append(str(project['technologies']))
+        
+        # Add publication information
+        for pub in (candidate.get('publications', []) or []):
+            if isinstance(pub, dict):
+                if pub.get('title'):
+                    text_corpus.append(pub['title'])
+                if pub.get('description'):
+                    text_corpus.append(pub['description'])
+                if pub.get('keywords'):
+                    text_corpus.append(pub['keywords'])
+        
+        # Add achievement information
+        for achievement in (candidate.get('achievements', []) or []):
+            if isinstance(achievement, dict):
+                if achievement.get('title'):
+                    text_corpus.append(achievement['title'])
+                if achievement.get('description'):
+                    text_corpus.append(achievement['description'])
+        
+        # Add courses and education
+        text_corpus.extend(candidate.get('courses', []) or [])
+        text_corpus.extend(candidate.get('education', []) or [])
+        text_corpus.extend(candidate.get('locations', []) or [])
+        
+        # Store processed text corpus
+        candidate['text_corpus'] = ' '.join(filter(None, text_corpus))
+        candidate['processed_tokens'] = self.preprocess_text(candidate['text_corpus'])
     
     def extract_all_candidates_comprehensive(self, location_filter: str = None) -> List[Dict[str, Any]]:
         """Extract ALL candidates with comprehensive information (no limits)"""
         logger.info("Extracting all candidates comprehensively...")
         
         with self.driver.session(database=self.neo4j_database) as session:
-            # Comprehensive query to get ALL candidate data
-            query = """
-                MATCH (c:Candidate)
-                OPTIONAL MATCH (c)-[:HAS_SKILL]->(s:Skill)
-                OPTIONAL MATCH (c)-[:HAS_EXPERIENCE_WITH]->(t:Technology)
-                OPTIONAL MATCH (c)-[:WORKED_AT]->(co:Company)
-                OPTIONAL MATCH (c)-[:WORKED_ON]->(p:Project)
-                OPTIONAL MATCH (c)-[:PUBLISHED]->(pub:Publication)
-                OPTIONAL MATCH (c)-[:ACHIEVED]->(a:Achievement)
-                OPTIONAL MATCH (c)-[:COMPLETED]->(course:Course)
-                OPTIONAL MATCH (c)-[:LOCATED_IN]->(l:Location)
-                OPTIONAL MATCH (c)-[edu_rel]->(edu)
-                WHERE (edu:Institution OR edu:University OR edu:College OR edu:School OR edu:Education)
-                
-                WITH c,
-                     COLLECT(DISTINCT s.name) AS skills,
-                     COLLECT(DISTINCT t.name) AS technologies,
-                     COLLECT(DISTINCT {name: co.name, role: 'company'}) AS companies,
-                     COLLECT(DISTINCT {name: p.name, description: p.description, technologies: p.technologies}) AS projects,
-                     COLLECT(DISTINCT {title: pub.title, description: pub.description, keywords: pub.keywords}) AS publications,
-                     COLLECT(DISTINCT {title: a.title, description: a.description}) AS achievements,
-                     COLLECT(DISTINCT course.name) AS courses,
-                     COLLECT(DISTINCT l.name) AS locations,
-                     COLLECT(DISTINCT edu.name) AS education
-                
-                RETURN 
-                    c.candidate_id AS candidate_id,
-                    c.name AS name,
-                    c.email AS email,
-                    c.phone AS phone,
-                    c.linkedin AS linkedin,
-                    c.github AS github,
-                    c.description AS description,
-                    c.summary AS summary,
-                    skills,
-                    technologies,
-                    companies,
-                    projects,
-                    publications,
-                    achievements,
-                    courses,
-                    locations,
-                    education
-            """
-            
-            if location_filter:
-                # Add location filter to the query
-                query = """
-                    MATCH (c:Candidate)-[:LOCATED_IN]->(l:Location)
-                    WHERE toLower(l.name) CONTAINS toLower($location_filter)
-                    OPTIONAL MATCH (c)-[:HAS_SKILL]->(s:Skill)
-                    OPTIONAL MATCH (c)-[:HAS_EXPERIENCE_WITH]->(t:Technology)
-                    OPTIONAL MATCH (c)-[:WORKED_AT]->(co:Company)
-                    OPTIONAL MATCH (c)-[:WORKED_ON]->(p:Project)
-                    OPTIONAL MATCH (c)-[:PUBLISHED]->(pub:Publication)
-                    OPTIONAL MATCH (c)-[:ACHIEVED]->(a:Achievement)
-                    OPTIONAL MATCH (c)-[:COMPLETED]->(course:Course)
-                    OPTIONAL MATCH (c)-[edu_rel]->(edu)
-                    WHERE (edu:Institution OR edu:University OR edu:College OR edu:School OR edu:Education)
-                    
-                    WITH c,
-                         COLLECT(DISTINCT s.name) AS skills,
-                         COLLECT(DISTINCT t.name) AS technologies,
-                         COLLECT(DISTINCT {name: co.name, role: 'company'}) AS companies,
-                         COLLECT(DISTINCT {name: p.name, description: p.description, technologies: p.technologies}) AS projects,
-                         COLLECT(DISTINCT {title: pub.title, description: pub.description, keywords: pub.keywords}) AS publications,
-                         COLLECT(DISTINCT {title: a.title, description: a.description}) AS achievements,
-                         COLLECT(DISTINCT course.name) AS courses,
-                         COLLECT(DISTINCT l.name) AS locations,
-                         COLLECT(DISTINCT edu.name) AS education
-                    
-                    RETURN 
-                        c.candidate_id AS candidate_id,
-                        c.name AS name,
-                        c.email AS email,
-                        c.phone AS phone,
-                        c.linkedin AS linkedin,
-                        c.github AS github,
-                        c.description AS description,
-                        c.summary AS summary,
-                        skills,
-                        technologies,
-                        companies,
-                        projects,
-                        publications,
-                        achievements,
-                        courses,
-                        locations,
-                        education
-                """
+            # Comprehensive query to get ALL candidate data (with location filter if specified),
+            # collecting each relationship in its own subquery
+            query = CANDIDATES_BY_LOCATION_QUERY if location_filter else ALL_CANDIDATES_QUERY
             
             result = session.run(query, location_filter=location_filter) if location_filter else session.run(query)
             candidates = []
@@ -315,244 +343,192 @@ class AdvancedCandidateSystem:
                 candidate = dict(record)
                 
                 # Create comprehensive text corpus for each candidate
-                text_corpus = []
-                
-                # Add all textual information
-                if candidate.get('name'):
-                    text_corpus.append(candidate['name'])
-                if candidate.get('description'):
-                    text_corpus.append(candidate['description'])
-                if candidate.get('summary'):
-                    text_corpus.append(candidate['summary'])
-                
-                # Add skills and technologies
-                all_skills = (candidate.get('skills', []) or []) + (candidate.get('technologies', []) or [])
-                text_corpus.extend(all_skills)
-                
-                # Add company information
-                for company in (candidate.get('companies', []) or []):
-                    if isinstance(company, dict) and company.get('name'):
-                        text_corpus.append(company['name'])
-                    elif isinstance(company, str):
-                        text_corpus.append(company)
-                
-                # Add project information
-                for project in (candidate.get('projects', []) or []):
-                    if isinstance(project, dict):
-                        if project.get('name'):
-                            text_corpus.append(project['name'])
-                        if project.get('description'):
-                            text_corpus.append(project['description'])
-                        if project.get('technologies'):
-                            if isinstance(project['technologies'], list):
-                                text_corpus.extend(project['technologies'])
-                            else:
-                                text_corpus.append(str(project['technologies']))
-                
-                # Add publication information
-                for pub in (candidate.get('publications', []) or []):
-                    if isinstance(pub, dict):
-                        if pub.get('title'):
-                            text_corpus.append(pub['title'])
-                        if pub.get('description'):
-                            text_corpus.append(pub['description'])
-                        if pub.get('keywords'):
-                            text_corpus.append(pub['keywords'])
-                
-                # Add achievement information
-                for achievement in (candidate.get('achievements', []) or []):
-                    if isinstance(achievement, dict):
-                        if achievement.get('title'):
-                            text_corpus.append(achievement['title'])
-                        if achievement.get('description'):
-                            text_corpus.append(achievement['description'])
-                
-                # Add courses and education
-                text_corpus.extend(candidate.get('courses', []) or [])
-                text_corpus.extend(candidate.get('education', []) or [])
-                text_corpus.extend(candidate.get('locations', []) or [])
-                
-                # Store processed text corpus
-                candidate['text_corpus'] = ' '.join(filter(None, text_corpus))
-                candidate['processed_tokens'] = self.preprocess_text(candidate['text_corpus'])
+                self.add_text_corpus(candidate)
                 
                 candidates.append(candidate)
             
             logger.info(f"Extracted {len(candidates)} candidates comprehensively")
             return candidates
     
-    def calculate_tf_idf_scores(self, candidates: List[Dict[str, Any]], query_terms: Set[str]) -> Dict[str, float]:
-        """Calculate TF-IDF scores for candidates"""
+    def build_search_index(self):
+        """Build the resident search index from the full candidate graph and refresh the local snapshot"""
+        with self.rebuild_lock:
+            # Updates arriving while the graph is read are replayed onto the new index
+            self.search_index.begin_build()
+            try:
+                candidates = self.extract_all_candidates_comprehensive()
+            except Exception:
+                self.search_index.cancel_build()
+                raise
+            self.search_index.build(candidates)
+            self.save_search_snapshot(candidates)
+    
+    def save_search_snapshot(self, candidates: List[Dict[str, Any]]):
+        """Write the local search snapshot; a failure only costs the next cold start"""
+        if not self.snapshot_path:
+            return
+        try:
+            write_snapshot(self.snapshot_path, candidates)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Failed to write search snapshot {self.snapshot_path}: {e}")
+    
+    def load_search_snapshot(self) -> bool:
+        """Build the search index from the local snapshot, with no graph round trips"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            candidates = read_snapshot(self.snapshot_path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # A truncated or corrupt snapshot only costs a build from the graph
+            logger.error(f"Failed to read search snapshot {self.snapshot_path}: {e}")
+            return False
+        self.search_index.build(candidates)
+        return True
+    
+    def start_snapshot_refresh(self, refresh_now: bool = False):
+        """Rebuild the index and snapshot from the graph in a background thread, every refresh interval"""
+        interval = self.snapshot_refresh_seconds
+        if interval <= 0 and not refresh_now:
+            return
+        
+        def refresh_loop():
+            delay = 0 if refresh_now else interval
+            while not self.snapshot_refresh_stop.wait(delay):
+                try:
+                    self.build_search_index()
+                except Exception as e:
+                    # Keep serving the current index (possibly from the snapshot) while the graph is unreachable
+                    logger.error(f"Background search index refresh failed: {e}")
+                if interval <= 0:
+                    return
+                delay = interval
+        
+        threading.Thread(target=refresh_loop, name="search-snapshot-refresh", daemon=True).start()
+    
+    def get_search_index(self) -> InvertedIndex:
+        """Return the search index, building it on first use"""
+        if not self.search_index.is_built:
+            with self.build_lock:
+                if not self.search_index.is_built:
+                    self.build_search_index()
+        return self.search_index
+    
+    def refresh_candidate_in_index(self, candidate_id: str) -> bool:
+        """Re-read one candidate from the graph and update only its index entry"""
+        candidate = self.get_candidate_by_id(candidate_id)
+        if not candidate or not candidate.get('candidate_id'):
+            # Candidate no longer exists in the graph
+            self.search_index.remove_document(candidate_id)
+            return False
+        
+        self.search_index.update_document(candidate)
+        logger.info(f"Re-indexed candidate {candidate_id}")
+        return True
+    
+    def remove_candidate_from_index(self, candidate_id: str) -> bool:
+        """Remove one candidate from the search index"""
+        removed = self.search_index.remove_document(candidate_id)
+        if removed:
+            logger.info(f"Removed candidate {candidate_id} from search index")
+        return removed
+    
+    def scope_candidate_to_location(self, candidate: Dict[str, Any], location_filter: str) -> Dict[str, Any]:
+        """
+        A candidate as the location-filtered graph query returns it.
+
+        Only its locations matching ``location_filter`` are listed, and its
+        text and tokens are rebuilt from those, so location-scoped searches
+        score the same documents as before. Returns ``candidate`` itself when
+        all of its locations match.
+        """
+        locations = candidate.get('locations') or []
+        needle = location_filter.lower()
+        matching = [location for location in locations if needle in (location or '').lower()]
+        if len(matching) == len(locations):
+            return candidate
+        
+        scoped = dict(candidate, locations=matching)
+        self.add_text_corpus(scoped)
+        return scoped
+    
+    def get_corpus_statistics(self, location_filter: str = None) -> CorpusStatistics:
+        """Corpus statistics for the candidates in scope, reused until the candidate set changes"""
+        self.get_search_index()
+        return self.corpus_stats.get(location_filter)
+    
+    def get_similarity_index(self, stats: CorpusStatistics) -> TrigramSimilarityIndex:
+        """Trigram similarity index for a statistics snapshot, built once per snapshot"""
+        if stats.similarity_index is None:
+            with self.build_lock:
+                if stats.similarity_index is None:
+                    stats.similarity_index = TrigramSimilarityIndex(stats.candidate_ids, stats.documents)
+        return stats.similarity_index
+    
+    def get_scoring_engine(self, stats: CorpusStatistics) -> SparseScoringEngine:
+        """Sparse-matrix scorer for a statistics snapshot, built once per snapshot"""
+        engine = stats.scoring_engine
+        if engine is None or (engine.k1, engine.b) != (self.k1, self.b):
+            with self.build_lock:
+                engine = stats.scoring_engine
+                if engine is None or (engine.k1, engine.b) != (self.k1, self.b):
+                    engine = SparseScoringEngine(stats, k1=self.k1, b=self.b)
+                    stats.scoring_engine = engine
+        return engine
+    
+    def process_query_terms(self, query_terms: Set[str]) -> List[str]:
+        """Stem each query term once, in query term order"""
+        return [self.stemmer.stem(term.lower()) for term in query_terms]
+    
+    def calculate_tf_idf_scores(self, engine: SparseScoringEngine, processed_terms: List[str]) -> np.ndarray:
+        """Calculate TF-IDF scores for all candidates (in engine column order) with sparse-matrix row sums"""
         logger.info("Calculating TF-IDF scores...")
-        
-        # Calculate document frequencies
-        df = Counter()
-        total_docs = len(candidates)
-        
-        for candidate in candidates:
-            unique_terms = set(candidate['processed_tokens'])
-            for term in unique_terms:
-                df[term] += 1
-        
-        # Calculate TF-IDF scores for each candidate
-        tfidf_scores = {}
-        
-        for candidate in candidates:
-            candidate_id = candidate['candidate_id']
-            doc_tokens = candidate['processed_tokens']
-            doc_length = len(doc_tokens)
-            
-            if doc_length == 0:
-                tfidf_scores[candidate_id] = 0.0
-                continue
-            
-            # Calculate TF-IDF for query terms
-            score = 0.0
-            tf = Counter(doc_tokens)
-            
-            for term in query_terms:
-                processed_term = self.stemmer.stem(term.lower())
-                
-                if processed_term in tf:
-                    # Calculate TF with log normalization
-                    term_freq = 1 + math.log(tf[processed_term])
-                    
-                    # Calculate IDF
-                    doc_freq = df.get(processed_term, 0)
-                    if doc_freq > 0:
-                        inverse_doc_freq = math.log(total_docs / doc_freq)
-                        score += term_freq * inverse_doc_freq
-            
-            tfidf_scores[candidate_id] = score
-        
-        return tfidf_scores
+        return engine.tf_idf_scores(processed_terms)
     
-    def calculate_bm25_scores(self, candidates: List[Dict[str, Any]], query_terms: Set[str]) -> Dict[str, float]:
-        """Calculate BM25 scores using industry-standard algorithm"""
+    def calculate_bm25_scores(self, engine: SparseScoringEngine, processed_terms: List[str]) -> np.ndarray:
+        """Calculate BM25 scores for all candidates (in engine column order) with sparse-matrix row sums"""
         logger.info("Calculating BM25 scores...")
-        
-        # Calculate average document length
-        total_length = sum(len(candidate['processed_tokens']) for candidate in candidates)
-        avg_doc_length = total_length / len(candidates) if candidates else 0
-        
-        # Calculate document frequencies
-        df = Counter()
-        total_docs = len(candidates)
-        
-        for candidate in candidates:
-            unique_terms = set(candidate['processed_tokens'])
-            for term in unique_terms:
-                df[term] += 1
-        
-        # Calculate BM25 scores
-        bm25_scores = {}
-        
-        for candidate in candidates:
-            candidate_id = candidate['candidate_id']
-            doc_tokens = candidate['processed_tokens']
-            doc_length = len(doc_tokens)
-            
-            if doc_length == 0:
-                bm25_scores[candidate_id] = 0.0
-                continue
-            
-            score = 0.0
-            tf = Counter(doc_tokens)
-            
-            for term in query_terms:
-                processed_term = self.stemmer.stem(term.lower())
-                
-                if processed_term in tf:
-                    # BM25 formula
-                    term_freq = tf[processed_term]
-                    doc_freq = df.get(processed_term, 0)
-                    
-                    if doc_freq > 0:
-                        # IDF component
-                        idf = math.log((total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
-                        
-                        # TF component with BM25 normalization
-                        tf_component = (term_freq * (self.k1 + 1)) / (
-                            term_freq + self.k1 * (1 - self.b + self.b * (doc_length / avg_doc_length))
-                        )
-                        
-                        score += idf * tf_component
-            
-            bm25_scores[candidate_id] = score
-        
-        return bm25_scores
+        return engine.bm25_scores(processed_terms)
     
-    def calculate_semantic_similarity_scores(self, candidates: List[Dict[str, Any]], query: str) -> Dict[str, float]:
-        """Calculate semantic similarity scores using fuzzy matching"""
+    def calculate_semantic_similarity_scores(self, similarity_index: TrigramSimilarityIndex, query: str) -> np.ndarray:
+        """Calculate semantic similarity scores using fuzzy matching (in index column order)"""
         logger.info("Calculating semantic similarity scores...")
-        
-        similarity_scores = {}
-        query_lower = query.lower()
-        
-        for candidate in candidates:
-            candidate_id = candidate['candidate_id']
-            max_similarity = 0.0
-            
-            # Check similarity with all text fields
-            text_fields = [
-                candidate.get('name', ''),
-                candidate.get('description', ''),
-                candidate.get('summary', ''),
-                candidate.get('text_corpus', '')
-            ]
-            
-            for field in text_fields:
-                if field:
-                    similarity = self.fuzzy_string_similarity(query_lower, field)
-                    max_similarity = max(max_similarity, similarity)
-            
-            # Check specific field matches
-            for skill in (candidate.get('skills', []) or []):
-                similarity = self.fuzzy_string_similarity(query_lower, skill)
-                max_similarity = max(max_similarity, similarity)
-            
-            for tech in (candidate.get('technologies', []) or []):
-                similarity = self.fuzzy_string_similarity(query_lower, tech)
-                max_similarity = max(max_similarity, similarity)
-            
-            similarity_scores[candidate_id] = max_similarity
-        
-        return similarity_scores
+        return similarity_index.similarity_scores(
+            query.lower(), mode=self.similarity_mode, max_error=self.similarity_max_error
+        )
     
-    def calculate_exact_match_bonus(self, candidates: List[Dict[str, Any]], query_terms: Set[str]) -> Dict[str, float]:
-        """Calculate bonus scores for exact matches"""
+    def calculate_exact_match_bonus(self, engine: SparseScoringEngine, query_terms: Set[str]) -> np.ndarray:
+        """Calculate bonus scores for exact matches (in engine column order)"""
         logger.info("Calculating exact match bonuses...")
+        return engine.exact_match_bonus(query_terms)
+    
+    def parse_query_with_llm(self, natural_language_query: str) -> Dict[str, Any]:
+        """Enhanced query parsing with LLM, cached on the normalized query"""
+        cache_key = QueryParseCache.make_key(natural_language_query, self.llm_model, self.query_parse_prompt_version)
+        cached = self.query_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Query parse served from cache")
+            return copy.deepcopy(cached)
         
-        exact_match_scores = {}
-        
-        for candidate in candidates:
-            candidate_id = candidate['candidate_id']
-            bonus_score = 0.0
-            
-            text_corpus_lower = candidate.get('text_corpus', '').lower()
-            
-            for term in query_terms:
-                term_lower = term.lower()
-                
-                # Top priority: Exact location match
-                location_lower = candidate.get('locations', [''])[0].lower() if candidate.get('locations') else ''
-                if term_lower == location_lower and location_lower:
-                    bonus_score += 10.0  # Highest priority
-
-                # Exact word match bonus
-                if f' {term_lower} ' in f' {text_corpus_lower} ':
-                    bonus_score += 2.0
-                
-                # Partial match bonus
-                elif term_lower in text_corpus_lower:
-                    bonus_score += 1.0
-            
-            exact_match_scores[candidate_id] = bonus_score
+        try:
+            parsed_query = self._parse_query_uncached(natural_language_query)
+        except Exception as e:
+            # Fallbacks are not cached so a transient LLM failure is retried on the next search
+            logger.error(f"Error parsing query with LLM: {e}")
+            return {
+                "skills": [],
+                "locations": [],
+                "companies": [],
+                "institutions": [],
+                "roles": [],
+                "key_terms": natural_language_query.split(),
+                "expanded_terms": natural_language_query.split()
+            }
         
-        return exact_match_scores
+        self.query_cache.put(cache_key, parsed_query)
+        return copy.deepcopy(parsed_query)
     
-    def parse_query_with_llm(self, natural_language_query: str) -> Dict[str, Any]:
-        """Enhanced query parsing with LLM"""
+    def _parse_query_uncached(self, natural_language_query: str) -> Dict[str, Any]:
+        """Single LLM round trip for query parsing; raises on API or JSON errors"""
         prompt = f"""
         You are an expert at extracting search parameters from natural language queries for candidate search.
         
@@ -574,50 +550,39 @@ class AdvancedCandidateSystem:
         Return only valid JSON:
         """
         
-        try:
-            chat_completion = self.groq_client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model=self.llm_model,
-                temperature=0.2,
-                max_tokens=512,
-                response_format={"type": "json_object"}
-            )
-            
-            response = chat_completion.choices[0].message.content
-            parsed_query = json.loads(response)
-            
-            # Expand key terms with synonyms
-            key_terms = parsed_query.get('key_terms', [])
-            all_terms = set(key_terms)
-            
-            # Add all other extracted terms
-            for field in ['skills', 'locations', 'companies', 'institutions', 'roles']:
-                all_terms.update(parsed_query.get(field, []))
-            
-            # Expand with synonyms
-            expanded_terms = self.expand_query_terms(list(all_terms))
-            parsed_query['expanded_terms'] = list(expanded_terms)
-            
-            return parsed_query
+        chat_completion = self.llm.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=self.llm_model,
+            temperature=0.2,
+            max_tokens=512,
+            response_format={"type": "json_object"}
+        )
         
-        except Exception as e:
-            logger.error(f"Error parsing query with LLM: {e}")
-            return {
-                "skills": [],
-                "locations": [],
-                "companies": [],
-                "institutions": [],
-                "roles": [],
-                "key_terms": natural_language_query.split(),
-                "expanded_terms": natural_language_query.split()
-            }
+        response = chat_completion.choices[0].message.content
+        parsed_query = json.loads(response)
+        
+        # Expand key terms with synonyms
+        key_terms = parsed_query.get('key_terms', [])
+        all_terms = set(key_terms)
+        
+        # Add all other extracted terms
+        for field in ['skills', 'locations', 'companies', 'institutions', 'roles']:
+            all_terms.update(parsed_query.get(field, []))
+        
+        # Expand with synonyms
+        expanded_terms = self.expand_query_terms(list(all_terms))
+        parsed_query['expanded_terms'] = list(expanded_terms)
+        
+        return parsed_query
     
-    def search_candidates_advanced(self, natural_language_query: str, top_k: int = 50) -> List[Dict[str, Any]]:
-        """Advanced candidate search with comprehensive ranking"""
+    def search_candidates_advanced(self, natural_language_query: str, top_k: int = 50,
+                                   query_params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Advanced candidate search with comprehensive ranking; pass ``query_params`` to reuse an existing parse"""
         logger.info(f"Starting advanced search for: {natural_language_query}")
         
         # Parse query
-        query_params = self.parse_query_with_llm(natural_language_query)
+        if query_params is None:
+            query_params = self.parse_query_with_llm(natural_language_query)
         logger.info(f"Parsed query parameters: {query_params}")
         
         # Check if location filter should be applied
@@ -626,116 +591,69 @@ class AdvancedCandidateSystem:
             location_filter = query_params['locations'][0]  # Use the first location mentioned
             logger.info(f"Applying location filter: {location_filter}")
         
-        # Get all candidates (with location filter if specified)
-        all_candidates = self.extract_all_candidates_comprehensive(location_filter)
-        logger.info(f"Total candidates in database after location filter: {len(all_candidates)}")
+        # Resolve candidates and their statistics from the resident index (with location filter if specified)
+        stats = self.get_corpus_statistics(location_filter)
+        candidate_ids = stats.candidate_ids
+        logger.info(f"Total candidates in index after location filter: {len(candidate_ids)}")
         
-        if not all_candidates:
+        if not candidate_ids:
             return []
         
         # Get expanded query terms
         query_terms = set(query_params.get('expanded_terms', []))
         
+        processed_terms = self.process_query_terms(query_terms)
+        
         # Calculate multiple scoring components
-        tfidf_scores = self.calculate_tf_idf_scores(all_candidates, query_terms)
-        bm25_scores = self.calculate_bm25_scores(all_candidates, query_terms)
-        similarity_scores = self.calculate_semantic_similarity_scores(all_candidates, natural_language_query)
-        exact_match_scores = self.calculate_exact_match_bonus(all_candidates, query_terms)
+        engine = self.get_scoring_engine(stats)
+        tfidf_scores = self.calculate_tf_idf_scores(engine, processed_terms)
+        bm25_scores = self.calculate_bm25_scores(engine, processed_terms)
+        similarity_scores = self.calculate_semantic_similarity_scores(self.get_similarity_index(stats), natural_language_query)
+        exact_match_scores = self.calculate_exact_match_bonus(engine, query_terms)
         
         # Normalize scores to 0-1 range
-        def normalize_scores(scores: Dict[str, float]) -> Dict[str, float]:
-            if not scores:
-                return scores
-            
-            max_score = max(scores.values()) if scores.values() else 1
-            min_score = min(scores.values()) if scores.values() else 0
-            
-            if max_score == min_score:
-                return {k: 1.0 for k in scores.keys()}
-            
-            return {
-                k: (v - min_score) / (max_score - min_score) 
-                for k, v in scores.items()
-            }
-        
-        normalized_tfidf = normalize_scores(tfidf_scores)
-        normalized_bm25 = normalize_scores(bm25_scores)
-        normalized_similarity = normalize_scores(similarity_scores)
-        normalized_exact = normalize_scores(exact_match_scores)
+        normalized_tfidf = min_max_normalize(tfidf_scores)
+        normalized_bm25 = min_max_normalize(bm25_scores)
+        normalized_similarity = min_max_normalize(similarity_scores)
+        normalized_exact = min_max_normalize(exact_match_scores)
+        
+        # Weighted combination of multiple ranking signals, for all candidates at once
+        composite_scores = (
+            0.35 * normalized_bm25 +        # BM25 (primary relevance)
+            0.25 * normalized_tfidf +       # TF-IDF (term importance)
+            0.25 * normalized_similarity +  # Semantic similarity
+            0.15 * normalized_exact         # Exact match bonus
+        )
         
-        # Calculate composite scores with industry-standard weights
-        composite_scores = {}
+        # Bounded top-k selection; same order as a full descending sort
+        ranked_positions = select_top_k(composite_scores, top_k)
         
-        for candidate in all_candidates:
-            candidate_id = candidate['candidate_id']
-            
-            # Weighted combination of multiple ranking signals
-            composite_score = (
-                0.35 * normalized_bm25.get(candidate_id, 0) +      # BM25 (primary relevance)
-                0.25 * normalized_tfidf.get(candidate_id, 0) +     # TF-IDF (term importance)
-                0.25 * normalized_similarity.get(candidate_id, 0) + # Semantic similarity
-                0.15 * normalized_exact.get(candidate_id, 0)       # Exact match bonus
-            )
-            
-            composite_scores[candidate_id] = composite_score
-            candidate['relevance_score'] = composite_score
+        # Copy indexed documents so per-query scores never leak into the index
+        ranked_candidates = []
+        for position in ranked_positions:
+            candidate_id = candidate_ids[position]
+            candidate = dict(stats.documents[candidate_id])
+            candidate['relevance_score'] = float(composite_scores[position])
             
             # Add detailed scoring breakdown for transparency
             candidate['score_breakdown'] = {
-                'bm25': normalized_bm25.get(candidate_id, 0),
-                'tfidf': normalized_tfidf.get(candidate_id, 0),
-                'similarity': normalized_similarity.get(candidate_id, 0),
-                'exact_match': normalized_exact.get(candidate_id, 0),
-                'composite': composite_score
+                'bm25': float(normalized_bm25[position]),
+                'tfidf': float(normalized_tfidf[position]),
+                'similarity': float(normalized_similarity[position]),
+                'exact_match': float(normalized_exact[position]),
+                'composite': float(composite_scores[position])
             }
+            ranked_candidates.append(candidate)
         
-        # Sort by composite score and return top candidates
-        ranked_candidates = sorted(
-            all_candidates, 
-            key=lambda x: x['relevance_score'], 
-            reverse=True
-        )
-        
-        logger.info(f"Returning top {min(top_k, len(ranked_candidates))} candidates")
-        return ranked_candidates[:top_k]
+        logger.info(f"Returning top {len(ranked_candidates)} candidates")
+        return ranked_candidates
     
     def get_candidate_by_id(self, candidate_id: str) -> Optional[Dict[str, Any]]:
         """Get a candidate by ID with all details"""
         logger.info(f"Fetching candidate with ID: {candidate_id}")
         
         with self.driver.session(database=self.neo4j_database) as session:
-            query = """
-                MATCH (c:Candidate {candidate_id: $candidate_id})
-                OPTIONAL MATCH (c)-[:HAS_SKILL]->(s:Skill)
-                OPTIONAL MATCH (c)-[:HAS_EXPERIENCE_WITH]->(t:Technology)
-                OPTIONAL MATCH (c)-[:WORKED_AT]->(co:Company)
-                OPTIONAL MATCH (c)-[:WORKED_ON]->(p:Project)
-                OPTIONAL MATCH (c)-[:PUBLISHED]->(pub:Publication)
-                OPTIONAL MATCH (c)-[:ACHIEVED]->(a:Achievement)
-                OPTIONAL MATCH (c)-[:COMPLETED]->(course:Course)
-                OPTIONAL MATCH (c)-[:LOCATED_IN]->(l:Location)
-                OPTIONAL MATCH (c)-[edu_rel]->(edu)
-                WHERE (edu:Institution OR edu:University OR edu:College OR edu:School OR edu:Education)
-                
-                RETURN 
-                    c.candidate_id AS candidate_id,
-                    c.name AS name,
-                    c.email AS email,
-                    c.phone AS phone,
-                    c.linkedin AS linkedin,
-                    c.github AS github,
-                    c.description AS description,
-                    c.summary AS summary,
-                    COLLECT(DISTINCT s.name) AS skills,
-                    COLLECT(DISTINCT t.name) AS technologies,
-                    COLLECT(DISTINCT {name: co.name, role: 'company'}) AS companies,
-                    COLLECT(DISTINCT {name: p.name, description: p.description, technologies: p.technologies}) AS projects,
-                    COLLECT(DISTINCT {title: pub.title, description: pub.description, keywords: pub.keywords}) AS publications,
-                    COLLECT(DISTINCT {title: a.title, description: a.description}) AS achievements,
-                    COLLECT(DISTINCT course.name) AS courses,
-                    COLLECT(DISTINCT l.name) AS locations,
-                    COLLECT(DISTINCT edu.name) AS education
-            """
+            query = CANDIDATE_BY_ID_QUERY
             
             result = session.run(query, candidate_id=candidate_id)
             record = result.single()
@@ -744,86 +662,21 @@ class AdvancedCandidateSystem:
                 candidate = dict(record)
                 
                 # Create comprehensive text corpus for the candidate
-                text_corpus = []
-                
-                # Add all textual information
-                if candidate.get('name'):
-                    text_corpus.append(candidate['name'])
-                if candidate.get('description'):
-                    text_corpus.append(candidate['description'])
-                if candidate.get('summary'):
-                    text_corpus.append(candidate['summary'])
-                
-                # Add skills and technologies
-                all_skills = (candidate.get('skills', []) or []) + (candidate.get('technologies', []) or [])
-                text_corpus.extend(all_skills)
-                
-                # Add company information
-                for company in (candidate.get('companies', []) or []):
-                    if isinstance(company, dict) and company.get('name'):
-                        text_corpus.append(company['name'])
-                    elif isinstance(company, str):
-                        text_corpus.append(company)
-                
-                # Add project information
-                for project in (candidate.get('projects', []) or []):
-                    if isinstance(project, dict):
-                        if project.get('name'):
-                            text_corpus.append(project['name'])
-                        if project.get('description'):
-                            text_corpus.append(project['description'])
-                        if project.get('technologies'):
-                            if isinstance(project['technologies'], list):
-                                text_corpus.extend(project['technologies'])
-                            else:
-                                text_corpus.append(str(project['technologies']))
-                
-                # Add publication information
-                for pub in (candidate.get('publications', []) or []):
-                    if isinstance(pub, dict):
-                        if pub.get('title'):
-                            text_corpus.append(pub['title'])
-                        if pub.get('description'):
-                            text_corpus.append(pub['description'])
-                        if pub.get('keywords'):
-                            text_corpus.append(pub['keywords'])
-                
-                # Add achievement information
-                for achievement in (candidate.get('achievements', []) or []):
-                    if isinstance(achievement, dict):
-                        if achievement.get('title'):
-                            text_corpus.append(achievement['title'])
-                        if achievement.get('description'):
-                            text_corpus.append(achievement['description'])
-                
-                # Add courses and education
-                text_corpus.extend(candidate.get('courses', []) or [])
-                text_corpus.extend(candidate.get('education', []) or [])
-                text_corpus.extend(candidate.get('locations', []) or [])
-                
-                # Store processed text corpus
-                candidate['text_corpus'] = ' '.join(filter(None, text_corpus))
-                candidate['processed_tokens'] = self.preprocess_text(candidate['text_corpus'])
+                self.add_text_corpus(candidate)
                 
                 return candidate
             
             return None
     
     def load_candidates_data(self):
-        """Load candidates data from JSON file"""
+        """Memory-map the candidates JSON file and index candidates by OID"""
         global candidates_data
         try:
-            with open('full_candidate.json', 'r') as file:
-                data = json.load(file)
-                # Convert to dictionary with OID as key for faster lookup
-                if isinstance(data, list):
-                    candidates_data = {candidate['_id']['$oid']: candidate for candidate in data}
-                else:
-                    candidates_data = {data['_id']['$oid']: data}
-                logger.info(f"Loaded {len(candidates_data)} candidates")
+            candidates_data = CandidateStore('full_candidate.json')
+            logger.info(f"Loaded {len(candidates_data)} candidates")
         except FileNotFoundError:
             raise HTTPException(status_code=500, detail="Candidates data file not found")
-        except json.JSONDecodeError:
+        except (ValueError, KeyError):
             raise HTTPException(status_code=500, detail="Invalid JSON in candidates data file")
     
     def extract_candidate_summary(self, candidate: Dict) -> str:
@@ -863,9 +716,21 @@ class AdvancedCandidateSystem:
     
     def analyze_single_candidate(self, candidate: Dict, focus: str = "general") -> List[Dict[str, Any]]:
         """Analyze a single candidate and return standardized parameter evaluations"""
+        # comparison_focus is optional in the request, so an explicit null means the default
+        focus = focus or "general"
         
         candidate_summary = self.extract_candidate_summary(candidate)
         
+        # Unchanged candidate data with the same focus/model/prompt reuses the stored evaluation
+        oid = (candidate.get('_id') or {}).get('$oid', '')
+        cache_key = EvaluationCache.make_key(
+            oid, EvaluationCache.summary_hash(candidate_summary), focus,
+            self.evaluation_model, self.evaluation_prompt_version
+        )
+        cached = self.evaluation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         focus_descriptions = {
             "general": "overall suitability for software development roles",
             "technical": "technical skills, project complexity, and technology expertise", 
@@ -918,16 +783,17 @@ class AdvancedCandidateSystem:
         """
         
         try:
-            chat_completion = self.groq_client.chat.completions.create(
+            chat_completion = self.llm.create(
                 messages=[
                     {
                         "role": "user",
                         "content": prompt
                     }
                 ],
-                model="llama-3.1-8b-instant",
+                model=self.evaluation_model,
                 temperature=0.3,
-                max_tokens=1500
+                max_tokens=1500,
+                timeout=COMPARE_LLM_TIMEOUT
             )
             
             response_text = chat_completion.choices[0].message.content.strip()
@@ -943,6 +809,10 @@ class AdvancedCandidateSystem:
                     
                     # Ensure we have exactly 10 parameters
                     if len(parameters) == 10:
+                        # Only real evaluations are cached, never the fallback defaults
+                        self.evaluation_cache.put(
+                            cache_key, oid, focus, self.evaluation_model, self.evaluation_prompt_version, parameters
+                        )
                         return parameters
                     else:
                         raise ValueError("Incorrect number of parameters")
@@ -988,7 +858,7 @@ class AdvancedCandidateSystem:
         """
         
         try:
-            chat_completion = self.groq_client.chat.completions.create(
+            chat_completion = self.llm.create(
                 messages=[
                     {
                         "role": "user", 
@@ -1008,14 +878,41 @@ class AdvancedCandidateSystem:
 # Initialize the system
 candidate_system = AdvancedCandidateSystem()
 
+# Blocking work never runs on the event loop: Neo4j and Groq calls go to the I/O pool,
+# ranking goes to the search pool, whose size caps how many searches score at once
+io_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("IO_WORKERS", "16")), thread_name_prefix="io"
+)
+search_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SEARCH_WORKERS", "4")), thread_name_prefix="search"
+)
+
+async def run_blocking(executor: ThreadPoolExecutor, func, *args, **kwargs):
+    """Run a blocking call on ``executor`` without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
 # API endpoints
 @app.on_event("startup")
 async def startup_event():
-    """Load candidates data on startup"""
+    """Load candidates data and build the search index on startup"""
     candidate_system.load_candidates_data()
+    if candidate_system.load_search_snapshot():
+        # Serve from the local snapshot right away and catch up with the graph in the background
+        candidate_system.start_snapshot_refresh(refresh_now=True)
+        return
+    
+    try:
+        candidate_system.build_search_index()
+    except Exception as e:
+        # The index is built lazily on the first search if the graph is unreachable now
+        logger.error(f"Failed to build search index on startup: {e}")
+    candidate_system.start_snapshot_refresh()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    io_executor.shutdown(wait=False)
+    search_executor.shutdown(wait=False)
     candidate_system.close()
     logger.info("Advanced Candidate System shutdown")
 
@@ -1031,6 +928,8 @@ async def root():
             "quick_compare": "/quick-compare",
             "all_candidates": "/candidates",
             "parameters": "/parameters",
+            "reindex_candidate": "/index/candidates/{candidate_id}",
+            "rebuild_index": "/index/rebuild",
             "health": "/health"
         }
     }
@@ -1038,13 +937,10 @@ async def root():
 @app.get("/candidates")
 async def get_all_candidates():
     """Get all candidate names and OIDs"""
-    candidate_list = []
-    for oid, candidate in candidates_data.items():
-        candidate_list.append({
-            "oid": oid,
-            "name": candidate.get('candidate_name', 'Unknown'),
-            "location": candidate.get('contact_information', {}).get('location', 'N/A')
-        })
+    candidate_list = [
+        {"oid": entry["oid"], "name": entry["name"], "location": entry["location"]}
+        for entry in candidates_data.listing()
+    ]
     return {"candidates": candidate_list, "total": len(candidate_list)}
 
 @app.get("/candidate/{candidate_id}")
@@ -1059,7 +955,7 @@ async def get_candidate_profile(candidate_id: str):
     - Complete candidate profile with all details
     """
     try:
-        candidate = candidate_system.get_candidate_by_id(candidate_id)
+        candidate = await run_blocking(io_executor, candidate_system.get_candidate_by_id, candidate_id)
         if not candidate:
             raise HTTPException(status_code=404, detail="Candidate not found")
         
@@ -1072,6 +968,51 @@ async def get_candidate_profile(candidate_id: str):
         logger.error(f"Error fetching candidate profile: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/index/candidates/{candidate_id}")
+async def reindex_candidate(candidate_id: str):
+    """
+    Update the search index for a single candidate after it was written to the graph
+    
+    Parameters:
+    - candidate_id: The unique ID of the candidate that was added or updated
+    """
+    try:
+        indexed = await run_blocking(io_executor, candidate_system.refresh_candidate_in_index, candidate_id)
+        return {
+            "success": True,
+            "candidate_id": candidate_id,
+            "indexed": indexed,
+            "index_size": len(candidate_system.search_index)
+        }
+    
+    except Exception as e:
+        logger.error(f"Error re-indexing candidate: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/index/candidates/{candidate_id}")
+async def remove_indexed_candidate(candidate_id: str):
+    """Remove a deleted candidate from the search index"""
+    removed = candidate_system.remove_candidate_from_index(candidate_id)
+    if not removed:
+        raise HTTPException(status_code=404, detail="Candidate not found in search index")
+    
+    return {
+        "success": True,
+        "candidate_id": candidate_id,
+        "index_size": len(candidate_system.search_index)
+    }
+
+@app.post("/index/rebuild")
+async def rebuild_search_index():
+    """Rebuild the whole search index from the graph"""
+    try:
+        await run_blocking(io_executor, candidate_system.build_search_index)
+        return {"success": True, "index_size": len(candidate_system.search_index)}
+    
+    except Exception as e:
+        logger.error(f"Error rebuilding search index: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/search", response_model=SearchResponse)
 async def search_candidates(request: SearchRequest):
     """
@@ -1091,13 +1032,16 @@ async def search_candidates(request: SearchRequest):
         
         logger.info(f"Processing API search request: {request.query}")
         
-        # Parse the query with LLM
-        query_params = candidate_system.parse_query_with_llm(request.query)
+        # Parse the query with LLM (once; the search reuses this parse)
+        query_params = await run_blocking(io_executor, candidate_system.parse_query_with_llm, request.query)
         
         # Perform the search
-        candidates = candidate_system.search_candidates_advanced(
+        candidates = await run_blocking(
+            search_executor,
+            candidate_system.search_candidates_advanced,
             request.query,
-            top_k=request.top_k
+            top_k=request.top_k,
+            query_params=query_params
         )
         
         # Prepare the response
@@ -1130,24 +1074,36 @@ async def compare_candidates(request: ComparisonRequest):
     if missing_oids:
         raise HTTPException(status_code=404, detail=f"Candidates not found: {missing_oids}")
     
-    # Analyze each candidate individually
-    candidate_profiles = []
-    
-    for oid in request.candidate_oids:
-        candidate = candidates_data[oid]
+    async def analyze_candidate(oid: str) -> CandidateProfile:
+        # Decoding the fields (and faulting in cold pages of the mapped file) is blocking work
+        candidate = await run_blocking(io_executor, candidates_data.get_fields, oid, COMPARISON_FIELDS)
         candidate_name = candidate.get('candidate_name', 'Unknown')
         
-        # Get AI analysis for this candidate
-        parameters = candidate_system.analyze_single_candidate(candidate, request.comparison_focus)
+        # Get AI analysis for this candidate. A timeout only stops waiting: the worker thread and its
+        # Groq call run on, so the slot is released when the call really finishes, not when we give up
+        await compare_semaphore.acquire()
+        analysis = asyncio.get_running_loop().run_in_executor(
+            io_executor,
+            functools.partial(candidate_system.analyze_single_candidate, candidate, request.comparison_focus)
+        )
+        analysis.add_done_callback(release_compare_slot)
+        try:
+            parameters = await asyncio.wait_for(asyncio.shield(analysis), timeout=COMPARE_LLM_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error(f"AI analysis timed out for candidate {oid}")
+            parameters = candidate_system.create_default_parameters(candidate)
         
-        candidate_profiles.append(CandidateProfile(
+        return CandidateProfile(
             candidate_oid=oid,
             candidate_name=candidate_name,
             parameters=parameters
-        ))
+        )
+    
+    # Analyze all candidates concurrently; profiles keep the requested order
+    candidate_profiles = list(await asyncio.gather(*(analyze_candidate(oid) for oid in request.candidate_oids)))
     
     # Generate overall summary
-    overall_summary = candidate_system.generate_overall_summary(candidate_profiles)
+    overall_summary = await run_blocking(io_executor, candidate_system.generate_overall_summary, candidate_profiles)
     
     # Determine recommendation (highest average score)
     best_candidate = None
@@ -1171,15 +1127,7 @@ async def compare_candidates(request: ComparisonRequest):
 @app.post("/quick-compare")
 async def quick_compare():
     """Interactive endpoint that guides through candidate selection"""
-    candidate_list = []
-    for oid, candidate in candidates_data.items():
-        candidate_list.append({
-            "oid": oid,
-            "name": candidate.get('candidate_name', 'Unknown'),
-            "location": candidate.get('contact_information', {}).get('location', 'N/A'),
-            "experience_count": len(candidate.get('experience', [])),
-            "project_count": len(candidate.get('projects', []))
-        })
+    candidate_list = candidates_data.listing()
     
     return {
         "message": "Select candidates for comparison",
@@ -1215,6 +1163,11 @@ async def health_check():
     return {
         "status": "healthy",
         "candidates_loaded": len(candidates_data),
+        "search_index_candidates": len(candidate_system.search_index),
+        "corpus_stats": candidate_system.corpus_stats.stats(),
+        "query_cache": candidate_system.query_cache.stats(),
+        "evaluation_cache": candidate_system.evaluation_cache.stats(),
+        "llm": candidate_system.llm.stats(),
         "groq_api_configured": bool(os.getenv("GROQ_API_KEY")),
         "standard_parameters_count": len(STANDARD_PARAMETERS)
     }
@@ -0,0 +1,295 @@
+"""
+Benchmark the candidate-extraction Cypher: chained OPTIONAL MATCHes vs per-relationship subqueries.
+
+Loads a synthetic graph (10k candidates by default) into a scratch Neo4j database,
+then reports for each query the intermediate rows and db hits from PROFILE and the
+wall-clock time to stream every candidate, and checks both queries return the same
+data. Synthetic nodes are flagged and deleted afterwards unless --keep is given.
+
+Run it against an empty scratch database, never the production graph, e.g. a
+throwaway container:
+
+    docker run --rm -d --name neo4j-bench -p 7687:7687 -e NEO4J_AUTH=neo4j/benchmark123 neo4j:5
+    python benchmark_candidate_queries.py --uri bolt://localhost:7687 --password benchmark123
+    docker stop neo4j-bench
+
+Before aggregating, the chained query expands each candidate to the product of
+its per-relationship counts (at least one each); the subqueries touch each edge
+once. For the default synthetic graph that is about 77.5M rows against 310k
+edges, which the plan rows reported below should reflect.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List, Dict, Any
+
+from neo4j import GraphDatabase
+
+# Shared query definitions live in ai-server/services; make them importable when run from models/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.candidate_queries import ALL_CANDIDATES_QUERY
+
+# The previous extraction query, kept here as the baseline
+LEGACY_ALL_CANDIDATES_QUERY = """
+    MATCH (c:Candidate)
+    OPTIONAL MATCH (c)-[:HAS_SKILL]->(s:Skill)
+    OPTIONAL MATCH (c)-[:HAS_EXPERIENCE_WITH]->(t:Technology)
+    OPTIONAL MATCH (c)-[:WORKED_AT]->(co:Company)
+    OPTIONAL MATCH (c)-[:WORKED_ON]->(p:Project)
+    OPTIONAL MATCH (c)-[:PUBLISHED]->(pub:Publication)
+    OPTIONAL MATCH (c)-[:ACHIEVED]->(a:Achievement)
+    OPTIONAL MATCH (c)-[:COMPLETED]->(course:Course)
+    OPTIONAL MATCH (c)-[:LOCATED_IN]->(l:Location)
+    OPTIONAL MATCH (c)-[edu_rel]->(edu)
+    WHERE (edu:Institution OR edu:University OR edu:College OR edu:School OR edu:Education)
+
+    WITH c,
+         COLLECT(DISTINCT s.name) AS skills,
+         COLLECT(DISTINCT t.name) AS technologies,
+         COLLECT(DISTINCT {name: co.name, role: 'company'}) AS companies,
+         COLLECT(DISTINCT {name: p.name, description: p.description, technologies: p.technologies}) AS projects,
+         COLLECT(DISTINCT {title: pub.title, description: pub.description, keywords: pub.keywords}) AS publications,
+         COLLECT(DISTINCT {title: a.title, description: a.description}) AS achievements,
+         COLLECT(DISTINCT course.name) AS courses,
+         COLLECT(DISTINCT l.name) AS locations,
+         COLLECT(DISTINCT edu.name) AS education
+
+    RETURN
+        c.candidate_id AS candidate_id,
+        c.name AS name,
+        c.email AS email,
+        c.phone AS phone,
+        c.linkedin AS linkedin,
+        c.github AS github,
+        c.description AS description,
+        c.summary AS summary,
+        skills,
+        technologies,
+        companies,
+        projects,
+        publications,
+        achievements,
+        courses,
+        locations,
+        education
+"""
+
+LOAD_BATCH_QUERY = """
+    UNWIND $rows AS row
+    CREATE (c:Candidate {candidate_id: row.candidate_id, name: row.name, email: row.email,
+                         description: row.description, summary: row.summary, synthetic_benchmark: true})
+    WITH c, row
+    CALL {
+        WITH c, row
+        UNWIND row.skills AS name
+        MERGE (s:Skill {name: name}) ON CREATE SET s.synthetic_benchmark = true
+        CREATE (c)-[:HAS_SKILL]->(s)
+    }
+    CALL {
+        WITH c, row
+        UNWIND row.technologies AS name
+        MERGE (t:Technology {name: name}) ON CREATE SET t.synthetic_benchmark = true
+        CREATE (c)-[:HAS_EXPERIENCE_WITH]->(t)
+    }
+    CALL {
+        WITH c, row
+        UNWIND row.companies AS name
+        MERGE (co:Company {name: name}) ON CREATE SET co.synthetic_benchmark = true
+        CREATE (c)-[:WORKED_AT]->(co)
+    }
+    CALL {
+        WITH c, row
+        UNWIND row.projects AS project
+        CREATE (c)-[:WORKED_ON]->(:Project {name: project.name, description: project.description,
+                                            technologies: project.technologies, synthetic_benchmark: true})
+    }
+    CALL {
+        WITH c, row
+        UNWIND row.publications AS publication
+        CREATE (c)-[:PUBLISHED]->(:Publication {title: publication.title, description: publication.description,
+                                                keywords: publication.keywords, synthetic_benchmark: true})
+    }
+    CALL {
+        WITH c, row
+        UNWIND row.achievements AS achievement
+        CREATE (c)-[:ACHIEVED]->(:Achievement {title: achievement.title, description: achievement.description,
+                                               synthetic_benchmark: true})
+    }
+    CALL {
+        WITH c, row
+        UNWIND row.courses AS name
+        MERGE (course:Course {name: name}) ON CREATE SET course.synthetic_benchmark = true
+        CREATE (c)-[:COMPLETED]->(course)
+    }
+    CALL {
+        WITH c, row
+        UNWIND row.locations AS name
+        MERGE (l:Location {name: name}) ON CREATE SET l.synthetic_benchmark = true
+        CREATE (c)-[:LOCATED_IN]->(l)
+    }
+    CALL {
+        WITH c, row
+        UNWIND row.education AS name
+        MERGE (edu:Institution {name: name}) ON CREATE SET edu.synthetic_benchmark = true
+        CREATE (c)-[:STUDIED_AT]->(edu)
+    }
+"""
+
+WORDS = [
+    'python', 'java', 'react', 'node', 'aws', 'docker', 'kubernetes', 'machine', 'learning', 'data',
+    'science', 'flask', 'django', 'sql', 'mongodb', 'redis', 'angular', 'android', 'kotlin', 'swift',
+    'api', 'cloud', 'devops', 'terraform', 'pandas', 'numpy', 'research', 'platform', 'pipeline', 'service'
+]
+LOCATIONS = [
+    'Mumbai, Maharashtra, India', 'New York, NY, USA', 'Pune, Maharashtra, India',
+    'Bangalore, Karnataka, India', 'Remote, Remote, Remote', 'Sydney, New South Wales, Australia'
+]
+
+
+def synthetic_candidate(index: int, rng: random.Random) -> Dict[str, Any]:
+    def sentence(length: int) -> str:
+        return ' '.join(rng.choices(WORDS, k=length))
+
+    return {
+        'candidate_id': f"bench-{index}",
+        'name': f"Candidate {index}",
+        'email': f"candidate{index}@example.com",
+        'description': sentence(25),
+        'summary': sentence(15),
+        'skills': rng.sample([f"Skill {i}" for i in range(400)], rng.randint(5, 15)),
+        'technologies': rng.sample([f"Tech {i}" for i in range(200)], rng.randint(3, 10)),
+        'companies': rng.sample([f"Company {i}" for i in range(1000)], rng.randint(1, 4)),
+        'projects': [
+            {'name': f"Project {index}-{i}", 'description': sentence(20), 'technologies': rng.sample(WORDS, 3)}
+            for i in range(rng.randint(2, 6))
+        ],
+        'publications': [
+            {'title': f"Paper {index}-{i}", 'description': sentence(20), 'keywords': sentence(3)}
+            for i in range(rng.randint(0, 2))
+        ],
+        'achievements': [
+            {'title': f"Award {index}-{i}", 'description': sentence(10)}
+            for i in range(rng.randint(0, 4))
+        ],
+        'courses': rng.sample([f"Course {i}" for i in range(300)], rng.randint(0, 5)),
+        'locations': [rng.choice(LOCATIONS)],
+        'education': rng.sample([f"University {i}" for i in range(150)], rng.randint(1, 2))
+    }
+
+
+def load_synthetic_graph(session, num_candidates: int, batch_size: int, seed: int):
+    rng = random.Random(seed)
+    for start in range(0, num_candidates, batch_size):
+        rows = [synthetic_candidate(i, rng) for i in range(start, min(start + batch_size, num_candidates))]
+        session.execute_write(lambda tx: tx.run(LOAD_BATCH_QUERY, rows=rows).consume())
+        print(f"Loaded {start + len(rows)}/{num_candidates} synthetic candidates")
+
+
+def delete_synthetic_graph(session):
+    while True:
+        deleted = session.run(
+            "MATCH (n) WHERE n.synthetic_benchmark = true WITH n LIMIT 10000 DETACH DELETE n RETURN count(n) AS deleted"
+        ).single()['deleted']
+        if not deleted:
+            break
+
+
+def plan_totals(plan: Dict[str, Any]) -> Dict[str, int]:
+    """Sum rows and db hits over a PROFILE plan tree, and track the largest operator"""
+    args = plan.get('args', {})
+    rows = plan.get('rows', args.get('Rows', 0)) or 0
+    db_hits = plan.get('dbHits', args.get('DbHits', 0)) or 0
+    totals = {'rows': rows, 'db_hits': db_hits, 'peak_rows': rows}
+    for child in plan.get('children', []):
+        child_totals = plan_totals(child)
+        totals['rows'] += child_totals['rows']
+        totals['db_hits'] += child_totals['db_hits']
+        totals['peak_rows'] = max(totals['peak_rows'], child_totals['peak_rows'])
+    return totals
+
+
+def profile_query(session, query: str) -> Dict[str, int]:
+    result = session.run("PROFILE " + query)
+    returned = sum(1 for _ in result)
+    totals = plan_totals(result.consume().profile)
+    totals['returned'] = returned
+    return totals
+
+
+def time_query(session, query: str, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in session.run(query):
+            pass
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def canonical_rows(session, query: str) -> Dict[str, Any]:
+    """Query output keyed by candidate ID, with list order made irrelevant"""
+    rows = {}
+    for record in session.run(query):
+        candidate = dict(record)
+        rows[candidate['candidate_id']] = {
+            key: sorted(repr(sorted(item.items()) if isinstance(item, dict) else item) for item in value)
+            if isinstance(value, list) else value
+            for key, value in candidate.items()
+        }
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uri', default=os.getenv("NEO4J_URI", "bolt://localhost:7687"))
+    parser.add_argument('--username', default=os.getenv("NEO4J_USERNAME", "neo4j"))
+    parser.add_argument('--password', default=os.getenv("NEO4J_PASSWORD"))
+    parser.add_argument('--database', default=os.getenv("NEO4J_DATABASE", "neo4j"))
+    parser.add_argument('--candidates', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keep', action='store_true', help="keep the synthetic graph afterwards")
+    parser.add_argument('--allow-existing', action='store_true',
+                        help="run even if the database already holds non-synthetic candidates")
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(args.uri, auth=(args.username, args.password))
+    try:
+        with driver.session(database=args.database) as session:
+            existing = session.run(
+                "MATCH (c:Candidate) WHERE c.synthetic_benchmark IS NULL RETURN count(c) AS existing"
+            ).single()['existing']
+            if existing and not args.allow_existing:
+                print(f"Refusing to run: database holds {existing} real candidates. Use a scratch database.")
+                return
+
+            delete_synthetic_graph(session)
+            load_synthetic_graph(session, args.candidates, args.batch_size, args.seed)
+
+            queries = [("chained OPTIONAL MATCH", LEGACY_ALL_CANDIDATES_QUERY), ("CALL subqueries", ALL_CANDIDATES_QUERY)]
+            print(f"\n{'query':<24}{'returned':>10}{'plan rows':>14}{'peak rows':>12}{'db hits':>14}{'median s':>10}")
+            for name, query in queries:
+                totals = profile_query(session, query)
+                median = statistics.median(time_query(session, query, args.repeat))
+                print(
+                    f"{name:<24}{totals['returned']:>10}{totals['rows']:>14}{totals['peak_rows']:>12}"
+                    f"{totals['db_hits']:>14}{median:>10.2f}"
+                )
+
+            legacy_rows = canonical_rows(session, LEGACY_ALL_CANDIDATES_QUERY)
+            new_rows = canonical_rows(session, ALL_CANDIDATES_QUERY)
+            mismatched = [cid for cid in legacy_rows if legacy_rows[cid] != new_rows.get(cid)]
+            print(f"\nCandidates with different results: {len(mismatched) + len(set(new_rows) - set(legacy_rows))}")
+
+            if not args.keep:
+                delete_synthetic_graph(session)
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,13 @@ from typing import List, Dict, Any, Tuple
 import re
 import math
 from collections import Counter, defaultdict
-from difflib import SequenceMatcher
+import sys
 import numpy as np
 
+# Shared scoring helpers live in ai-server/services; make them importable when run from models/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.trigram_index import bounded_sequence_ratio
+
 # Load environment variables
 load_dotenv()
 
@@ -42,6 +46,10 @@ class EnhancedCandidateRanker:
             # Programming languages
             'java': 1.1, 'go': 1.2, 'rust': 1.3, 'typescript': 1.2,
         }
+        
+        # Sequence similarity may be underestimated by at most this much when cheap
+        # upper bounds show it cannot beat the word overlap; 0.0 keeps scores exact
+        self.similarity_max_error = float(os.getenv("SIMILARITY_MAX_ERROR", "0.0"))
 
     def calculate_text_similarity(self, text1: str, text2: str) -> float:
         """Calculate similarity between two text strings using multiple methods"""
@@ -59,9 +67,6 @@ class EnhancedCandidateRanker:
         if text2_lower in text1_lower or text1_lower in text2_lower:
             return 0.8
         
-        # Sequence matcher for fuzzy matching
-        seq_similarity = SequenceMatcher(None, text1_lower, text2_lower).ratio()
-        
         # Word overlap
         words1 = set(re.findall(r'\b\w+\b', text1_lower))
         words2 = set(re.findall(r'\b\w+\b', text2_lower))
@@ -71,6 +76,11 @@ class EnhancedCandidateRanker:
         else:
             word_overlap = 0.0
         
+        # Sequence matcher for fuzzy matching, skipped when it cannot beat the word overlap
+        seq_similarity = bounded_sequence_ratio(
+            text1_lower, text2_lower, floor=word_overlap, max_error=self.similarity_max_error
+        )
+        
         # Return the maximum of sequence similarity and word overlap
         return max(seq_similarity, word_overlap)
 
@@ -3,10 +3,14 @@ from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import json
 import os
+import sys
 from groq import Groq
 from dotenv import load_dotenv
 import uvicorn
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.candidate_store import CandidateStore
+
 # Load environment variables
 load_dotenv()
 
@@ -31,9 +35,12 @@ class ComparisonResponse(BaseModel):
     overall_summary: str
     recommendation: Optional[str] = None
 
-# Global variable to store candidates data
+# Global variable to store candidates data (a memory-mapped CandidateStore once loaded)
 candidates_data = {}
 
+# Candidate fields used to build the comparison summary
+COMPARISON_FIELDS = ['_id', 'candidate_name', 'contact_information', 'education', 'experience', 'projects', 'skills']
+
 # Standardized parameters for consistent comparison
 STANDARD_PARAMETERS = [
     "Technical Skills Depth",
@@ -49,20 +56,14 @@ STANDARD_PARAMETERS = [
 ]
 
 def load_candidates_data():
-    """Load candidates data from JSON file"""
+    """Memory-map the candidates JSON file and index candidates by OID"""
     global candidates_data
     try:
-        with open('full_candidate.json', 'r') as file:
-            data = json.load(file)
-            # Convert to dictionary with OID as key for faster lookup
-            if isinstance(data, list):
-                candidates_data = {candidate['_id']['$oid']: candidate for candidate in data}
-            else:
-                candidates_data = {data['_id']['$oid']: data}
-            print(f"Loaded {len(candidates_data)} candidates")
+        candidates_data = CandidateStore('full_candidate.json')
+        print(f"Loaded {len(candidates_data)} candidates")
     except FileNotFoundError:
         raise HTTPException(status_code=500, detail="Candidates data file not found")
-    except json.JSONDecodeError:
+    except (ValueError, KeyError):
         raise HTTPException(status_code=500, detail="Invalid JSON in candidates data file")
 
 def extract_candidate_summary(candidate: Dict) -> str:
@@ -256,13 +257,10 @@ async def root():
 @app.get("/candidates")
 async def get_all_candidates():
     """Get all candidate names and OIDs"""
-    candidate_list = []
-    for oid, candidate in candidates_data.items():
-        candidate_list.append({
-            "oid": oid,
-            "name": candidate.get('candidate_name', 'Unknown'),
-            "location": candidate.get('contact_information', {}).get('location', 'N/A')
-        })
+    candidate_list = [
+        {"oid": entry["oid"], "name": entry["name"], "location": entry["location"]}
+        for entry in candidates_data.listing()
+    ]
     return {"candidates": candidate_list, "total": len(candidate_list)}
 
 @app.get("/candidate/{oid}")
@@ -291,7 +289,7 @@ async def compare_candidates(request: ComparisonRequest):
     candidate_profiles = []
     
     for oid in request.candidate_oids:
-        candidate = candidates_data[oid]
+        candidate = candidates_data.get_fields(oid, COMPARISON_FIELDS)
         candidate_name = candidate.get('candidate_name', 'Unknown')
         
         # Get AI analysis for this candidate
@@ -328,15 +326,7 @@ async def compare_candidates(request: ComparisonRequest):
 @app.post("/quick-compare")
 async def quick_compare():
     """Interactive endpoint that guides through candidate selection"""
-    candidate_list = []
-    for oid, candidate in candidates_data.items():
-        candidate_list.append({
-            "oid": oid,
-            "name": candidate.get('candidate_name', 'Unknown'),
-            "location": candidate.get('contact_information', {}).get('location', 'N/A'),
-            "experience_count": len(candidate.get('experience', [])),
-            "project_count": len(candidate.get('projects', []))
-        })
+    candidate_list = candidates_data.listing()
     
     return {
         "message": "Select candidates for comparison",
@@ -1,7 +1,138 @@
 from neo4j import GraphDatabase
+from neo4j.exceptions import Neo4jError, DriverError, TransientError, ServiceUnavailable, SessionExpired
+from concurrent.futures import ThreadPoolExecutor
+import argparse
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import re
+import os
+import random
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.ingest_checkpoint import IngestCheckpoint
+
+# Technical skill lists in a resume and the Skill.category they are stored under
+TECHNICAL_SKILL_CATEGORIES = [
+    ('programming_languages', 'Programming'),
+    ('frameworks_libraries', 'Framework'),
+    ('databases', 'Database'),
+    ('tools_software', 'Tool'),
+    ('cloud_platforms', 'Cloud'),
+    ('data_science', 'DataScience'),
+    ('other_technical', 'Technical'),
+]
+
+# Shared nodes (skills, technologies, companies, ...) are written first, deduplicated
+# and in name order, by a single writer. Properties on them keep the value of the
+# last candidate in the file, as they did with one statement per item.
+SHARED_NODE_QUERIES = [
+    ('locations', """
+        UNWIND $rows AS row
+        MERGE (l:Location {name: row.name})
+        SET l.city = row.city,
+            l.state = row.state,
+            l.country = row.country
+    """),
+    ('institutions', """
+        UNWIND $rows AS row
+        MERGE (i:Institution {name: row.name})
+    """),
+    ('companies', """
+        UNWIND $rows AS row
+        MERGE (co:Company {name: row.name})
+    """),
+    ('technologies', """
+        UNWIND $rows AS row
+        MERGE (t:Technology {name: row.name})
+    """),
+    ('projects', """
+        UNWIND $rows AS row
+        MERGE (p:Project {name: row.name})
+        SET p.description = row.description
+    """),
+    ('skills', """
+        UNWIND $rows AS row
+        MERGE (s:Skill {name: row.name})
+        SET s.category = row.category
+    """),
+]
+
+# Per-candidate statements, each run once per batch over a list of parameter rows.
+# They only MATCH shared nodes, so concurrent batches never race to create them;
+# rows are sorted by the shared node they touch (the listed fields) so that
+# concurrent transactions take relationship locks in the same order.
+CANDIDATE_WRITE_QUERIES = [
+    ('candidates', ('candidate_id',), """
+        UNWIND $rows AS row
+        MERGE (c:Candidate {candidate_id: row.candidate_id})
+        SET c.name = row.name,
+            c.email = row.email,
+            c.phone = row.phone,
+            c.linkedin = row.linkedin,
+            c.github = row.github,
+            c.description = row.description
+    """),
+    ('locations', ('location',), """
+        UNWIND $rows AS row
+        MATCH (l:Location {name: row.location})
+        MATCH (c:Candidate {candidate_id: row.candidate_id})
+        MERGE (c)-[:LOCATED_IN]->(l)
+    """),
+    ('education', ('institution',), """
+        UNWIND $rows AS row
+        MATCH (i:Institution {name: row.institution})
+        MATCH (c:Candidate {candidate_id: row.candidate_id})
+        MERGE (c)-[r:STUDIED_AT]->(i)
+        SET r.degree = row.degree,
+            r.duration = row.duration,
+            r.gpa = row.gpa
+    """),
+    ('experience', ('company',), """
+        UNWIND $rows AS row
+        MATCH (co:Company {name: row.company})
+        MATCH (c:Candidate {candidate_id: row.candidate_id})
+        MERGE (c)-[r:WORKED_AT]->(co)
+        SET r.position = row.position,
+            r.duration = row.duration,
+            r.description = row.description
+    """),
+    ('work_technologies', ('tech',), """
+        UNWIND $rows AS row
+        MATCH (t:Technology {name: row.tech})
+        MATCH (c:Candidate {candidate_id: row.candidate_id})
+        MERGE (c)-[:HAS_EXPERIENCE_WITH {context: 'work', company: row.company}]->(t)
+    """),
+    ('projects', ('project_name',), """
+        UNWIND $rows AS row
+        MATCH (p:Project {name: row.project_name})
+        MATCH (c:Candidate {candidate_id: row.candidate_id})
+        MERGE (c)-[r:WORKED_ON]->(p)
+        SET r.duration = row.duration,
+            r.achievements = row.achievements
+    """),
+    ('project_technologies', ('project_name', 'tech'), """
+        UNWIND $rows AS row
+        MATCH (t:Technology {name: row.tech})
+        MATCH (p:Project {name: row.project_name})
+        MATCH (c:Candidate {candidate_id: row.candidate_id})
+        MERGE (p)-[:USES_TECH]->(t)
+        MERGE (c)-[:HAS_EXPERIENCE_WITH {context: 'project', project: row.project_name}]->(t)
+    """),
+    ('skills', ('skill_name',), """
+        UNWIND $rows AS row
+        MATCH (s:Skill {name: row.skill_name})
+        MATCH (c:Candidate {candidate_id: row.candidate_id})
+        MERGE (c)-[:HAS_SKILL]->(s)
+    """),
+]
+
+# Errors worth retrying a batch for: deadlocks and other transient server errors,
+# and lost connections
+RETRYABLE_ERRORS = (TransientError, ServiceUnavailable, SessionExpired)
 
 class Neo4jCandidateDatabase:
     def __init__(self):
@@ -11,6 +142,19 @@ class Neo4jCandidateDatabase:
         self.database = "neo4j"
         self.driver = GraphDatabase.driver(self.uri, auth=(self.username, self.password))
         
+        # Search service to notify after candidate writes (e.g. http://localhost:8000); loads of more
+        # candidates than the notify limit ask it for one rebuild instead of per-candidate updates
+        self.search_index_url = os.getenv("SEARCH_INDEX_URL")
+        self.search_index_notify_limit = int(os.getenv("SEARCH_INDEX_NOTIFY_LIMIT", "20"))
+        
+        # Candidates written per transaction by the bulk loader
+        self.batch_size = int(os.getenv("NEO4J_BATCH_SIZE", "500"))
+        
+        # Parallel ingestion: worker sessions, and retries with exponential backoff per batch
+        self.ingest_workers = int(os.getenv("NEO4J_INGEST_WORKERS", "4"))
+        self.write_retries = int(os.getenv("NEO4J_WRITE_RETRIES", "5"))
+        self.retry_backoff_seconds = float(os.getenv("NEO4J_RETRY_BACKOFF_SECONDS", "0.5"))
+        
         # Location mapping for standardizing locations
         self.location_mapping = {
             'mumbai': 'Mumbai, Maharashtra, India',
@@ -92,6 +236,37 @@ class Neo4jCandidateDatabase:
     def clear_database(self):
         with self.driver.session(database=self.database) as session:
             session.run("MATCH (n) DETACH DELETE n")
+        self._notify_search_index("/index/rebuild")
+
+    def _notify_search_index(self, path: str) -> bool:
+        """POST to the search service so its index follows graph writes, if configured; False if that failed"""
+        if not self.search_index_url:
+            return True
+        
+        url = self.search_index_url.rstrip('/') + path
+        try:
+            request = urllib.request.Request(url, method="POST")
+            urllib.request.urlopen(request, timeout=5).close()
+            return True
+        except Exception as e:
+            print(f"Warning: could not notify search index at {url}: {e}")
+            return False
+
+    def notify_candidate_written(self, candidate_id: str) -> bool:
+        """Tell the search service that a candidate was added or updated"""
+        return self._notify_search_index(f"/index/candidates/{urllib.parse.quote(candidate_id, safe='')}")
+
+    def notify_candidates_written(self, candidate_ids: List[str]):
+        """Tell the search service about a load: per candidate for a few, as one rebuild for many"""
+        if not self.search_index_url or not candidate_ids:
+            return
+        if len(candidate_ids) > self.search_index_notify_limit:
+            self._notify_search_index("/index/rebuild")
+            return
+        for candidate_id in candidate_ids:
+            # An unreachable service would time out on every call, so stop at the first failure
+            if not self.notify_candidate_written(candidate_id):
+                break
 
     def create_constraints(self):
         with self.driver.session(database=self.database) as session:
@@ -104,13 +279,167 @@ class Neo4jCandidateDatabase:
             session.run("CREATE CONSTRAINT institution_name IF NOT EXISTS FOR (i:Institution) REQUIRE i.name IS UNIQUE")
             session.run("CREATE CONSTRAINT technology_name IF NOT EXISTS FOR (t:Technology) REQUIRE t.name IS UNIQUE")
 
-    def parse_and_load_candidates(self, json_file_path: str):
+    def parse_and_load_candidates(self, json_file_path: str, batch_size: int = None, workers: int = None,
+                                  checkpoint_path: str = None, resume: bool = True):
+        """Load a JSON array of candidates; progress is checkpointed so an interrupted run resumes"""
         with open(json_file_path, 'r', encoding='utf-8') as file:
             candidates_data = json.load(file)
         
+        checkpoint = IngestCheckpoint(checkpoint_path or f"{json_file_path}.checkpoint")
+        try:
+            if not resume:
+                checkpoint.reset()
+            written_ids, failed_ids = self.load_candidates(candidates_data, batch_size, workers, checkpoint)
+        finally:
+            checkpoint.close()
+        
+        if failed_ids:
+            print(f"Warning: {len(failed_ids)} candidates could not be written; run again to resume from {checkpoint.path}")
+        else:
+            # Everything is in the graph, so the next run starts from scratch
+            os.remove(checkpoint.path)
+        
+        # Writes are committed per batch; update only these candidates in the search index
+        self.notify_candidates_written(written_ids)
+    
+    def load_candidates(self, candidates: List[Dict[str, Any]], batch_size: int = None, workers: int = None,
+                        checkpoint: IngestCheckpoint = None) -> Tuple[List[str], List[str]]:
+        """
+        Write candidates with a pool of worker sessions; returns (written IDs, failed IDs).
+        
+        Shared nodes are merged first by one session, ``batch_size`` nodes
+        per transaction. Candidates are then
+        partitioned by ID across the workers (so repeats of an ID stay in file
+        order) and written in batches, one explicit transaction per batch.
+        Candidates already in ``checkpoint`` are skipped and each committed
+        batch is added to it.
+        """
+        batch_size = batch_size or self.batch_size
+        workers = max(1, workers or self.ingest_workers)
+        
+        all_rows = self._empty_rows()
+        pending = []
+        for candidate in candidates:
+            rows = self._empty_rows()
+            candidate_id = self._collect_candidate_rows(candidate, rows)
+            if not candidate_id:
+                continue
+            for name in all_rows:
+                all_rows[name].extend(rows[name])
+            if checkpoint is None or candidate_id not in checkpoint:
+                pending.append((candidate_id, rows))
+        
+        if not pending:
+            return [], []
+        
+        # Shared nodes for every candidate, including finished ones, so their properties
+        # end up as if the whole file had been loaded in order; one transaction per batch of nodes
         with self.driver.session(database=self.database) as session:
-            for candidate in candidates_data:
-                self._create_candidate_node(session, candidate)
+            for name, node_rows in self._shared_node_rows(all_rows).items():
+                for start in range(0, len(node_rows), batch_size):
+                    self._execute_with_retry(session, self._write_shared_nodes, {name: node_rows[start:start + batch_size]})
+        
+        partitions = [[] for _ in range(workers)]
+        for candidate_id, rows in pending:
+            partitions[hash(candidate_id) % workers].append((candidate_id, rows))
+        
+        written_ids, failed_ids = [], []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._load_partition, partition, batch_size, checkpoint)
+                for partition in partitions if partition
+            ]
+            for future in futures:
+                written, failed = future.result()
+                written_ids.extend(written)
+                failed_ids.extend(failed)
+        
+        print(f"Wrote {len(written_ids)} candidates ({len(candidates) - len(pending)} already done, {len(failed_ids)} failed)")
+        return written_ids, failed_ids
+    
+    def _load_partition(self, partition: List[Tuple[str, Dict[str, List[Dict[str, Any]]]]], batch_size: int,
+                        checkpoint: IngestCheckpoint) -> Tuple[List[str], List[str]]:
+        """Write one worker's candidates batch by batch in its own session"""
+        written_ids, failed_ids = [], []
+        with self.driver.session(database=self.database) as session:
+            for start in range(0, len(partition), batch_size):
+                batch = partition[start:start + batch_size]
+                batch_ids = [candidate_id for candidate_id, _ in batch]
+                rows = self._empty_rows()
+                for _, candidate_rows in batch:
+                    for name in rows:
+                        rows[name].extend(candidate_rows[name])
+                
+                try:
+                    self._execute_with_retry(session, self._write_candidate_rows, rows)
+                except (Neo4jError, DriverError) as e:
+                    # Leave the batch out of the checkpoint so the next run retries it
+                    print(f"Warning: batch of {len(batch)} candidates failed: {e}")
+                    failed_ids.extend(batch_ids)
+                    continue
+                
+                if checkpoint is not None:
+                    checkpoint.mark_done(batch_ids)
+                written_ids.extend(batch_ids)
+        
+        return written_ids, failed_ids
+    
+    def _execute_with_retry(self, session, work, rows: Dict[str, List[Dict[str, Any]]]):
+        """execute_write with extra retries and jittered exponential backoff for transient errors"""
+        for attempt in range(self.write_retries + 1):
+            try:
+                return session.execute_write(work, rows)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.write_retries:
+                    raise
+                delay = self.retry_backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+                print(f"Transient Neo4j error ({type(e).__name__}), retrying batch in {delay:.1f}s")
+                time.sleep(delay)
+    
+    def _empty_rows(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {name: [] for name, _, _ in CANDIDATE_WRITE_QUERIES}
+    
+    @staticmethod
+    def _shared_node_rows(rows: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Distinct shared nodes referenced by ``rows``, later rows overriding properties, sorted by name"""
+        nodes = {name: {} for name, _ in SHARED_NODE_QUERIES}
+        for row in rows['locations']:
+            nodes['locations'][row['location']] = {
+                'name': row['location'], 'city': row['city'], 'state': row['state'], 'country': row['country']
+            }
+        for row in rows['education']:
+            nodes['institutions'][row['institution']] = {'name': row['institution']}
+        for row in rows['experience']:
+            nodes['companies'][row['company']] = {'name': row['company']}
+        for row in rows['work_technologies'] + rows['project_technologies']:
+            nodes['technologies'][row['tech']] = {'name': row['tech']}
+        for row in rows['projects']:
+            nodes['projects'][row['project_name']] = {'name': row['project_name'], 'description': row['description']}
+        for row in rows['skills']:
+            nodes['skills'][row['skill_name']] = {'name': row['skill_name'], 'category': row['category']}
+        
+        return {name: [by_name[key] for key in sorted(by_name, key=str)] for name, by_name in nodes.items()}
+    
+    @staticmethod
+    def _write_shared_nodes(tx, shared_rows: Dict[str, List[Dict[str, Any]]]):
+        for name, query in SHARED_NODE_QUERIES:
+            if shared_rows.get(name):
+                tx.run(query, rows=shared_rows[name]).consume()
+    
+    @staticmethod
+    def _write_candidate_rows(tx, rows: Dict[str, List[Dict[str, Any]]]):
+        """Run each per-candidate statement once over its rows; candidates go first so later statements can MATCH them"""
+        for name, lock_order, query in CANDIDATE_WRITE_QUERIES:
+            if rows[name]:
+                # Stable sort: rows for the same node keep file order, so the last SET still wins
+                ordered = sorted(rows[name], key=lambda row: tuple(str(row[field]) for field in lock_order))
+                tx.run(query, rows=ordered).consume()
+    
+    @classmethod
+    def _write_rows(cls, tx, rows: Dict[str, List[Dict[str, Any]]]):
+        """Write shared nodes and then the candidate data in one transaction"""
+        cls._write_shared_nodes(tx, cls._shared_node_rows(rows))
+        cls._write_candidate_rows(tx, rows)
     
     def _safe_value(self, value):
         """Return value if not None/empty, otherwise return empty string"""
@@ -189,33 +518,30 @@ class Neo4jCandidateDatabase:
             return f"{location_str.strip()}, Unknown State, Unknown Country"
     
     def _create_candidate_node(self, session, candidate: Dict[str, Any]):
-        # Create Candidate node
+        """Write a single candidate in one transaction"""
+        rows = self._empty_rows()
+        candidate_id = self._collect_candidate_rows(candidate, rows)
+        if candidate_id:
+            session.execute_write(self._write_rows, rows)
+        return candidate_id
+    
+    def _collect_candidate_rows(self, candidate: Dict[str, Any], rows: Dict[str, List[Dict[str, Any]]]):
+        """Append one candidate's parameter rows to the per-statement row lists; returns its ID"""
         candidate_id = candidate.get('_id', {}).get('$oid', '')
         if not candidate_id:
             print(f"Warning: Candidate without ID found, skipping...")
-            return
+            return None
             
-        candidate_name = candidate.get('candidate_name', 'Unknown')
-        
-        # Create or update Candidate node
         contact_info = self._safe_dict(candidate.get('contact_information'))
-        
-        session.run("""
-            MERGE (c:Candidate {candidate_id: $candidate_id})
-            SET c.name = $name,
-                c.email = $email,
-                c.phone = $phone,
-                c.linkedin = $linkedin,
-                c.github = $github,
-                c.description = $description
-        """, 
-        candidate_id=candidate_id,
-        name=candidate_name,
-        email=self._safe_value(contact_info.get('email')),
-        phone=self._safe_value(contact_info.get('phone')),
-        linkedin=self._safe_value(contact_info.get('linkedin')),
-        github=self._safe_value(contact_info.get('github')),
-        description=self._safe_value(candidate.get('candidate_description')))
+        rows['candidates'].append({
+            'candidate_id': candidate_id,
+            'name': candidate.get('candidate_name', 'Unknown'),
+            'email': self._safe_value(contact_info.get('email')),
+            'phone': self._safe_value(contact_info.get('phone')),
+            'linkedin': self._safe_value(contact_info.get('linkedin')),
+            'github': self._safe_value(contact_info.get('github')),
+            'description': self._safe_value(candidate.get('candidate_description'))
+        })
         
         # Process location with standardized format
         location = contact_info.get('location')
@@ -224,181 +550,82 @@ class Neo4jCandidateDatabase:
             if standardized_location:
                 # Parse city, state, country from standardized location
                 location_parts = [part.strip() for part in standardized_location.split(',')]
-                city = location_parts[0] if len(location_parts) > 0 else ""
-                state = location_parts[1] if len(location_parts) > 1 else ""
-                country = location_parts[2] if len(location_parts) > 2 else ""
-                
-                session.run("""
-                    MERGE (l:Location {name: $location})
-                    SET l.city = $city,
-                        l.state = $state,
-                        l.country = $country
-                    MERGE (c:Candidate {candidate_id: $candidate_id})
-                    MERGE (c)-[:LOCATED_IN]->(l)
-                """, 
-                location=standardized_location, 
-                city=city,
-                state=state,
-                country=country,
-                candidate_id=candidate_id)
+                rows['locations'].append({
+                    'candidate_id': candidate_id,
+                    'location': standardized_location,
+                    'city': location_parts[0] if len(location_parts) > 0 else "",
+                    'state': location_parts[1] if len(location_parts) > 1 else "",
+                    'country': location_parts[2] if len(location_parts) > 2 else ""
+                })
         
         # Process education
-        education_list = self._safe_list(candidate.get('education'))
-        for edu in education_list:
+        for edu in self._safe_list(candidate.get('education')):
             edu_dict = self._safe_dict(edu)
             institution = edu_dict.get('institution')
             if institution:
-                # Create relationship with safe values
-                session.run("""
-                    MERGE (i:Institution {name: $institution})
-                    MERGE (c:Candidate {candidate_id: $candidate_id})
-                    MERGE (c)-[r:STUDIED_AT]->(i)
-                    SET r.degree = $degree,
-                        r.duration = $duration,
-                        r.gpa = $gpa
-                """, 
-                institution=institution, 
-                candidate_id=candidate_id,
-                degree=self._safe_value(edu_dict.get('degree')),
-                duration=self._safe_value(edu_dict.get('duration')),
-                gpa=self._safe_value(edu_dict.get('gpa_cgpa')))
-        
-        # Process experience
-        experience_list = self._safe_list(candidate.get('experience'))
-        for exp in experience_list:
+                rows['education'].append({
+                    'candidate_id': candidate_id,
+                    'institution': institution,
+                    'degree': self._safe_value(edu_dict.get('degree')),
+                    'duration': self._safe_value(edu_dict.get('duration')),
+                    'gpa': self._safe_value(edu_dict.get('gpa_cgpa'))
+                })
+        
+        # Process experience and the technologies used there
+        for exp in self._safe_list(candidate.get('experience')):
             exp_dict = self._safe_dict(exp)
             company = exp_dict.get('company')
             if company:
-                # Create company and work relationship
-                session.run("""
-                    MERGE (co:Company {name: $company})
-                    MERGE (c:Candidate {candidate_id: $candidate_id})
-                    MERGE (c)-[r:WORKED_AT]->(co)
-                    SET r.position = $position,
-                        r.duration = $duration,
-                        r.description = $description
-                """, 
-                company=company, 
-                candidate_id=candidate_id,
-                position=self._safe_value(exp_dict.get('position')),
-                duration=self._safe_value(exp_dict.get('duration')),
-                description=self._safe_value(exp_dict.get('description')))
-                
-                # Connect technologies used to candidate
-                technologies_used = self._safe_list(exp_dict.get('technologies_used'))
-                for tech in technologies_used:
+                rows['experience'].append({
+                    'candidate_id': candidate_id,
+                    'company': company,
+                    'position': self._safe_value(exp_dict.get('position')),
+                    'duration': self._safe_value(exp_dict.get('duration')),
+                    'description': self._safe_value(exp_dict.get('description'))
+                })
+                for tech in self._safe_list(exp_dict.get('technologies_used')):
                     if tech and str(tech).strip():
-                        tech_clean = str(tech).strip()
-                        session.run("""
-                            MERGE (t:Technology {name: $tech})
-                            MERGE (c:Candidate {candidate_id: $candidate_id})
-                            MERGE (c)-[:HAS_EXPERIENCE_WITH {context: 'work', company: $company}]->(t)
-                        """, 
-                        tech=tech_clean, 
-                        candidate_id=candidate_id,
-                        company=company)
-        
-        # Process projects
-        projects_list = self._safe_list(candidate.get('projects'))
-        for proj in projects_list:
+                        rows['work_technologies'].append({
+                            'candidate_id': candidate_id,
+                            'tech': str(tech).strip(),
+                            'company': company
+                        })
+        
+        # Process projects and their technologies
+        for proj in self._safe_list(candidate.get('projects')):
             proj_dict = self._safe_dict(proj)
             project_name = proj_dict.get('name')
             if project_name:
-                # Create project node first
-                session.run("""
-                    MERGE (p:Project {name: $project_name})
-                    SET p.description = $description
-                """, 
-                project_name=project_name,
-                description=self._safe_value(proj_dict.get('description')))
-                
-                # Create relationship between candidate and project
-                session.run("""
-                    MERGE (c:Candidate {candidate_id: $candidate_id})
-                    MERGE (p:Project {name: $project_name})
-                    MERGE (c)-[r:WORKED_ON]->(p)
-                    SET r.duration = $duration,
-                        r.achievements = $achievements
-                """, 
-                candidate_id=candidate_id,
-                project_name=project_name,
-                duration=self._safe_value(proj_dict.get('duration')),
-                achievements=self._safe_value(proj_dict.get('achievements')))
-                
-                # Connect project technologies
-                project_technologies = self._safe_list(proj_dict.get('technologies'))
-                for tech in project_technologies:
+                rows['projects'].append({
+                    'candidate_id': candidate_id,
+                    'project_name': project_name,
+                    'description': self._safe_value(proj_dict.get('description')),
+                    'duration': self._safe_value(proj_dict.get('duration')),
+                    'achievements': self._safe_value(proj_dict.get('achievements'))
+                })
+                for tech in self._safe_list(proj_dict.get('technologies')):
                     if tech and str(tech).strip():
-                        tech_clean = str(tech).strip()
-                        session.run("""
-                            MERGE (t:Technology {name: $tech})
-                            MERGE (p:Project {name: $project_name})
-                            MERGE (c:Candidate {candidate_id: $candidate_id})
-                            MERGE (p)-[:USES_TECH]->(t)
-                            MERGE (c)-[:HAS_EXPERIENCE_WITH {context: 'project', project: $project_name}]->(t)
-                        """, 
-                        tech=tech_clean, 
-                        project_name=project_name,
-                        candidate_id=candidate_id)
-        
-        # Process skills - Fixed approach to avoid constraint conflicts
+                        rows['project_technologies'].append({
+                            'candidate_id': candidate_id,
+                            'tech': str(tech).strip(),
+                            'project_name': project_name
+                        })
+        
+        # Process skills; Skill nodes are shared, so the last category written wins as before
         skills_dict = self._safe_dict(candidate.get('skills'))
         tech_skills = self._safe_dict(skills_dict.get('technical_skills'))
-        
-        # Helper function to create skill with category
-        def create_skill_with_category(session, skill_name: str, category: str, candidate_id: str):
-            if skill_name and str(skill_name).strip():
-                skill_clean = str(skill_name).strip()
-                session.run("""
-                    MERGE (s:Skill {name: $skill_name})
-                    SET s.category = $category
-                    WITH s
-                    MERGE (c:Candidate {candidate_id: $candidate_id})
-                    MERGE (c)-[:HAS_SKILL]->(s)
-                """, 
-                skill_name=skill_clean, 
-                category=category,
-                candidate_id=candidate_id)
-        
-        # Programming Languages
-        programming_languages = self._safe_list(tech_skills.get('programming_languages'))
-        for lang in programming_languages:
-            create_skill_with_category(session, lang, 'Programming', candidate_id)
-        
-        # Frameworks/Libraries
-        frameworks_libraries = self._safe_list(tech_skills.get('frameworks_libraries'))
-        for framework in frameworks_libraries:
-            create_skill_with_category(session, framework, 'Framework', candidate_id)
-        
-        # Databases
-        databases = self._safe_list(tech_skills.get('databases'))
-        for db in databases:
-            create_skill_with_category(session, db, 'Database', candidate_id)
-        
-        # Tools/Software
-        tools_software = self._safe_list(tech_skills.get('tools_software'))
-        for tool in tools_software:
-            create_skill_with_category(session, tool, 'Tool', candidate_id)
-        
-        # Cloud Platforms
-        cloud_platforms = self._safe_list(tech_skills.get('cloud_platforms'))
-        for cloud in cloud_platforms:
-            create_skill_with_category(session, cloud, 'Cloud', candidate_id)
-        
-        # Data Science
-        data_science = self._safe_list(tech_skills.get('data_science'))
-        for ds in data_science:
-            create_skill_with_category(session, ds, 'DataScience', candidate_id)
-        
-        # Other Technical Skills
-        other_technical = self._safe_list(tech_skills.get('other_technical'))
-        for other in other_technical:
-            create_skill_with_category(session, other, 'Technical', candidate_id)
-        
-        # Soft Skills
-        soft_skills = self._safe_list(skills_dict.get('soft_skills'))
-        for soft in soft_skills:
-            create_skill_with_category(session, soft, 'Soft', candidate_id)
+        skill_lists = [(self._safe_list(tech_skills.get(key)), category) for key, category in TECHNICAL_SKILL_CATEGORIES]
+        skill_lists.append((self._safe_list(skills_dict.get('soft_skills')), 'Soft'))
+        for skills, category in skill_lists:
+            for skill_name in skills:
+                if skill_name and str(skill_name).strip():
+                    rows['skills'].append({
+                        'candidate_id': candidate_id,
+                        'skill_name': str(skill_name).strip(),
+                        'category': category
+                    })
+        
+        return candidate_id
 
     def query_candidates(self, query_text: str) -> List[Dict[str, Any]]:
         """Query candidates based on natural language text"""
@@ -612,22 +839,31 @@ class Neo4jCandidateDatabase:
 
 # Example usage
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load candidates into Neo4j and run example queries")
+    parser.add_argument("json_file", nargs="?", default="candidates1.json")
+    parser.add_argument("--batch-size", type=int, default=None, help="candidates per transaction")
+    parser.add_argument("--workers", type=int, default=None, help="parallel writer sessions")
+    parser.add_argument("--checkpoint", default=None, help="progress file (default: <json_file>.checkpoint)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="clear the database and ignore any checkpoint instead of resuming")
+    args = parser.parse_args()
+    
     db = Neo4jCandidateDatabase()
     
     try:
         print("Initializing database...")
         
-        # Clear existing data (optional)
-        db.clear_database()
-        print("Database cleared.")
+        if args.fresh:
+            db.clear_database()
+            print("Database cleared.")
         
         # Create constraints
         db.create_constraints()
         print("Constraints created.")
         
-        # Load candidates from JSON file
+        # Load candidates from JSON file, resuming an interrupted load unless --fresh
         print("Loading candidates from JSON...")
-        db.parse_and_load_candidates("candidates1.json")
+        db.parse_and_load_candidates(args.json_file, args.batch_size, args.workers, args.checkpoint, resume=not args.fresh)
         print("Candidates loaded successfully!")
         
         # Print statistics
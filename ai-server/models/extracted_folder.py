@@ -1,7 +1,6 @@
 import json
-import PyPDF2
 import io
-from groq import Groq
+from groq import Groq, APIStatusError, APIConnectionError
 import re
 from datetime import datetime
 import os
@@ -10,12 +9,22 @@ import traceback
 import logging
 from typing import Dict, Any, Optional, Tuple, List
 import pytesseract
-from pdf2image import convert_from_bytes
 from PIL import Image
-import fitz  # PyMuPDF for link extraction
+import fitz  # PyMuPDF for text, link extraction and rendering pages for OCR
 import urllib.parse
 from pathlib import Path
 import sys
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Executor, wait, FIRST_COMPLETED
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.llm_client import RateLimitedLLMClient
+from services.extraction_cache import ExtractionCache
+from services.resume_chunker import (
+    count_tokens, compact_resume_text, chunk_resume, merge_extractions, token_budget, usage_counts
+)
 
 # Configure logging
 logging.basicConfig(
@@ -33,79 +42,107 @@ MAX_RETRIES = 5
 TIMEOUT_SECONDS = 30
 MAX_FILE_SIZE_MB = 50
 
-class BatchResumeProcessor:
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.client = self.init_groq_client()
-        self.data_folder = Path("global")
-        self.output_folder = Path("global2")
-        self.processed_count = 0
-        self.failed_count = 0
-        self.skipped_count = 0
-        
-        # Create output directory if it doesn't exist
-        self.output_folder.mkdir(exist_ok=True)
-        
-        if not self.data_folder.exists():
-            logger.error(f"Data folder '{self.data_folder}' does not exist!")
-            raise FileNotFoundError(f"Data folder '{self.data_folder}' does not exist!")
+# Batch pipeline: processes parsing PDFs, threads calling Groq, and queue bounds between stages
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 2)))
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "4"))
+GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = float(os.getenv("GROQ_TOKENS_PER_MINUTE", "30000"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+# Worker processes are spawned, not forked: forking while the LLM and writer threads hold locks can deadlock the child
+PROCESS_CONTEXT = multiprocessing.get_context("spawn")
 
-    def init_groq_client(self) -> Optional[Groq]:
-        """Initialize and validate Groq client with API key"""
-        try:
-            client = Groq(api_key=self.api_key)
-            # Test the API key with a simple request
-            client.models.list()
-            logger.info("✅ Groq client initialized successfully")
-            return client
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Groq client: {str(e)}")
-            return None
+# Page-level OCR: pages with fewer text-layer characters than this are rendered at OCR_DPI and OCR'd
+OCR_MIN_TEXT_CHARS = int(os.getenv("OCR_MIN_TEXT_CHARS", "20"))
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))
 
-    def extract_links_from_pdf(self, pdf_path: Path) -> Dict[str, List[str]]:
-        """Extract hyperlinks from PDF using PyMuPDF"""
-        links = {
-            'linkedin': [],
-            'github': [],
-            'other': []
-        }
-        
-        try:
-            doc = fitz.open(pdf_path)
-            
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                link_list = page.get_links()
+# Content-addressed extraction cache; bump the prompt version whenever the extraction prompt changes.
+# Cached text is tied to the OCR settings that produced it.
+EXTRACTION_MODEL = "llama3-8b-8192"
+EXTRACTION_PROMPT_VERSION = "2"
+TEXT_EXTRACTOR_VERSION = f"1:ocr_dpi={OCR_DPI}:ocr_min_chars={OCR_MIN_TEXT_CHARS}"
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH", "extraction_cache.sqlite3")
+
+# Token budget per request: the model's context window holds the prompt and the reserved output.
+# Resumes that don't fit are split into section-aware chunks, extracted concurrently and merged.
+MODEL_CONTEXT_TOKENS = int(os.getenv("MODEL_CONTEXT_TOKENS", "8192"))
+EXTRACTION_MAX_OUTPUT_TOKENS = int(os.getenv("EXTRACTION_MAX_OUTPUT_TOKENS", "3072"))
+CHUNK_WORKERS = int(os.getenv("CHUNK_WORKERS", "3"))
+
+# Output schema sent with every extraction request, serialised without whitespace to save prompt tokens.
+# extraction_metadata is filled in locally when results are saved, so the model isn't asked for it.
+EXTRACTION_SCHEMA = {
+    "candidate_name": "string|null",
+    "contact_information": {
+        "email": "string|null", "phone": "string|null", "location": "string|null",
+        "linkedin": "string|null", "github": "string|null", "portfolio": "string|null", "other_links": []
+    },
+    "candidate_description": "string|null",
+    "education": [{
+        "degree": "string", "institution": "string", "location": "string|null", "duration": "string|null",
+        "gpa_cgpa": "string|null", "additional_info": "string|null", "coursework": []
+    }],
+    "experience": [{
+        "position": "string", "company": "string", "location": "string|null", "duration": "string|null",
+        "description": "string|null", "type": "string|null", "key_achievements": [], "technologies_used": []
+    }],
+    "projects": [{
+        "name": "string", "description": "string|null", "technologies": [],
+        "links": {"demo": "string|null", "github": "string|null", "other": "string|null"},
+        "achievements": "string|null", "duration": "string|null"
+    }],
+    "skills": {
+        "technical_skills": {
+            "programming_languages": [], "frameworks_libraries": [], "databases": [], "tools_software": [],
+            "cloud_platforms": [], "devops": [], "data_science": [], "other_technical": []
+        },
+        "soft_skills": [],
+        "industry_knowledge": []
+    },
+    "achievements": [{
+        "title": "string", "description": "string|null", "date": "string|null",
+        "organization": "string|null", "prize_amount": "string|null"
+    }],
+    "certifications": [{
+        "name": "string", "issuing_organization": "string|null", "date": "string|null",
+        "expiry_date": "string|null", "credential_id": "string|null"
+    }],
+    "publications": [{
+        "title": "string", "journal_conference": "string|null", "date": "string|null",
+        "authors": [], "description": "string|null"
+    }],
+    "additional_information": {"volunteering": [], "hobbies": [], "awards": [], "other": []}
+}
+EXTRACTION_SCHEMA_JSON = json.dumps(EXTRACTION_SCHEMA, separators=(',', ':'))
+EXTRACTION_SYSTEM_PROMPT = "You are a precise resume parser. Return only a valid JSON object with every schema key present."
+
+class PdfTextExtractor:
+    """Text and hyperlink extraction from resume PDFs; holds no client, so it can run in worker processes"""
+
+    def _add_page_links(self, page, links: Dict[str, List[str]]):
+        """Add the hyperlinks on one PyMuPDF page to ``links`` by category"""
+        for link in page.get_links():
+            if 'uri' in link and link['uri']:
+                url = link['uri'].strip()
                 
-                for link in link_list:
-                    if 'uri' in link and link['uri']:
-                        url = link['uri'].strip()
-                        
-                        # Normalize URL
-                        if not url.startswith(('http://', 'https://')):
-                            if url.startswith('www.'):
-                                url = 'https://' + url
-                            elif not url.startswith('mailto:'):
-                                url = 'https://' + url
-                        
-                        # Categorize URLs
-                        url_lower = url.lower()
-                        if 'linkedin.com' in url_lower:
-                            if url not in links['linkedin']:
-                                links['linkedin'].append(url)
-                        elif 'github.com' in url_lower:
-                            if url not in links['github']:
-                                links['github'].append(url)
-                        elif not url.startswith('mailto:'):
-                            if url not in links['other']:
-                                links['other'].append(url)
-            
-            doc.close()
-            
-        except Exception as e:
-            logger.warning(f"Failed to extract links from {pdf_path.name}: {str(e)}")
-        
-        return links
+                # Normalize URL
+                if not url.startswith(('http://', 'https://')):
+                    if url.startswith('www.'):
+                        url = 'https://' + url
+                    elif not url.startswith('mailto:'):
+                        url = 'https://' + url
+                
+                # Categorize URLs
+                url_lower = url.lower()
+                if 'linkedin.com' in url_lower:
+                    if url not in links['linkedin']:
+                        links['linkedin'].append(url)
+                elif 'github.com' in url_lower:
+                    if url not in links['github']:
+                        links['github'].append(url)
+                elif not url.startswith('mailto:'):
+                    if url not in links['other']:
+                        links['other'].append(url)
 
     def extract_urls_from_text(self, text: str) -> Dict[str, List[str]]:
         """Extract URLs from plain text using regex patterns"""
@@ -164,99 +201,175 @@ class BatchResumeProcessor:
         }
         return merged
 
-    def extract_text_from_pdf(self, pdf_path: Path) -> Tuple[Optional[str], Optional[dict], Dict[str, List[str]]]:
-        """Extract text and links from PDF file"""
+    def extract_text_from_pdf(self, pdf_path: Path, ocr_executor: Optional[Executor] = None) -> Tuple[Optional[str], Optional[dict], Dict[str, List[str]]]:
+        """
+        Extract text and links from a PDF file, opening it once with PyMuPDF.
+        
+        Text and links come from each page's text layer; only pages with
+        (almost) no text layer are rendered at OCR_DPI and OCR'd, on
+        ``ocr_executor`` when given, otherwise inline.
+        """
         metadata = {
             'pages_processed': 0,
             'pages_with_errors': 0,
             'ocr_used': False,
-            'extraction_method': 'PyPDF2',
+            'ocr_pages': 0,
+            'extraction_method': 'PyMuPDF',
             'links_extracted': 0,
             'file_size_mb': round(pdf_path.stat().st_size / 1024 / 1024, 2)
         }
+        extracted_links = {
+            'linkedin': [],
+            'github': [],
+            'other': []
+        }
         
         # Check file size
         if metadata['file_size_mb'] > MAX_FILE_SIZE_MB:
             logger.warning(f"File {pdf_path.name} is too large ({metadata['file_size_mb']}MB)")
             return None, metadata, {}
         
-        # Extract hyperlinks first
-        extracted_links = self.extract_links_from_pdf(pdf_path)
+        try:
+            doc = fitz.open(pdf_path)
+        except Exception as e:
+            logger.error(f"Error reading PDF {pdf_path.name}: {str(e)}")
+            return None, metadata, extracted_links
         
+        page_texts = []
+        ocr_images = {}
         try:
-            # First try with PyPDF2
-            try:
-                with open(pdf_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    
-                    if len(pdf_reader.pages) == 0:
-                        logger.warning(f"PDF file {pdf_path.name} appears to be empty")
-                        return None, metadata, extracted_links
-                    
-                    text = ""
-                    for page_num, page in enumerate(pdf_reader.pages):
-                        try:
-                            page_text = page.extract_text()
-                            if page_text.strip():
-                                text += f"\n--- Page {page_num + 1} ---\n"
-                                text += page_text + "\n"
-                                metadata['pages_processed'] += 1
-                            else:
-                                metadata['pages_with_errors'] += 1
-                        except Exception as e:
-                            logger.warning(f"Could not extract text from page {page_num + 1} of {pdf_path.name}: {str(e)}")
-                            metadata['pages_with_errors'] += 1
-                            continue
-                    
-                    if text.strip():
-                        text_links = self.extract_urls_from_text(text)
-                        extracted_links = self.merge_link_dictionaries(extracted_links, text_links)
-                        metadata['links_extracted'] = sum(len(urls) for urls in extracted_links.values())
-                        return text.strip(), metadata, extracted_links
-                        
-            except Exception as e:
-                logger.warning(f"PyPDF2 extraction failed for {pdf_path.name}: {str(e)}")
+            if doc.page_count == 0:
+                logger.warning(f"PDF file {pdf_path.name} appears to be empty")
+                return None, metadata, extracted_links
             
-            # Fallback to OCR
-            try:
-                logger.info(f"Attempting OCR fallback for {pdf_path.name}...")
-                metadata['extraction_method'] = 'OCR'
-                metadata['ocr_used'] = True
+            for page_num, page in enumerate(doc):
+                try:
+                    self._add_page_links(page, extracted_links)
+                except Exception as e:
+                    logger.warning(f"Could not extract links from page {page_num + 1} of {pdf_path.name}: {str(e)}")
                 
-                with open(pdf_path, 'rb') as file:
-                    images = convert_from_bytes(file.read())
-                    text = ""
-                    
-                    for i, image in enumerate(images):
-                        try:
-                            page_text = pytesseract.image_to_string(image)
-                            if page_text.strip():
-                                text += f"\n--- Page {i + 1} ---\n"
-                                text += page_text + "\n"
-                                metadata['pages_processed'] += 1
-                            else:
-                                metadata['pages_with_errors'] += 1
-                        except Exception as e:
-                            logger.warning(f"OCR failed for page {i + 1} of {pdf_path.name}: {str(e)}")
-                            metadata['pages_with_errors'] += 1
-                            continue
-                    
-                    if text.strip():
-                        text_links = self.extract_urls_from_text(text)
-                        extracted_links = self.merge_link_dictionaries(extracted_links, text_links)
-                        metadata['links_extracted'] = sum(len(urls) for urls in extracted_links.values())
-                        return text.strip(), metadata, extracted_links
-                    else:
-                        logger.error(f"OCR failed to extract any text from {pdf_path.name}")
-                        return None, metadata, extracted_links
-                        
-            except Exception as e:
-                logger.error(f"OCR extraction failed for {pdf_path.name}: {str(e)}")
-                return None, metadata, extracted_links
+                try:
+                    page_text = page.get_text("text")
+                except Exception as e:
+                    logger.warning(f"Could not extract text from page {page_num + 1} of {pdf_path.name}: {str(e)}")
+                    page_text = ""
+                page_texts.append(page_text)
                 
-        except Exception as e:
-            logger.error(f"Error reading PDF {pdf_path.name}: {str(e)}")
+                # No usable text layer (e.g. a scanned page): render just this page for OCR
+                if len(page_text.strip()) < OCR_MIN_TEXT_CHARS:
+                    try:
+                        ocr_images[page_num] = page.get_pixmap(dpi=OCR_DPI).tobytes("png")
+                    except Exception as e:
+                        logger.warning(f"Could not render page {page_num + 1} of {pdf_path.name} for OCR: {str(e)}")
+        finally:
+            doc.close()
+        
+        if ocr_images:
+            logger.info(f"Running OCR on {len(ocr_images)}/{len(page_texts)} pages of {pdf_path.name}...")
+            metadata['ocr_used'] = True
+            metadata['ocr_pages'] = len(ocr_images)
+            metadata['extraction_method'] = 'OCR' if len(ocr_images) == len(page_texts) else 'PyMuPDF+OCR'
+            for page_num, ocr_text in self._ocr_pages(ocr_images, ocr_executor, pdf_path.name).items():
+                if len(ocr_text.strip()) > len(page_texts[page_num].strip()):
+                    page_texts[page_num] = ocr_text
+        
+        text = ""
+        for page_num, page_text in enumerate(page_texts):
+            if page_text.strip():
+                text += f"\n--- Page {page_num + 1} ---\n"
+                text += page_text + "\n"
+                metadata['pages_processed'] += 1
+            else:
+                metadata['pages_with_errors'] += 1
+        
+        if not text.strip():
+            logger.error(f"Could not extract any text from {pdf_path.name}")
             return None, metadata, extracted_links
+        
+        text_links = self.extract_urls_from_text(text)
+        extracted_links = self.merge_link_dictionaries(extracted_links, text_links)
+        metadata['links_extracted'] = sum(len(urls) for urls in extracted_links.values())
+        return text.strip(), metadata, extracted_links
+
+    def _ocr_pages(self, images: Dict[int, bytes], executor: Optional[Executor], filename: str) -> Dict[int, str]:
+        """OCR text of rendered pages by page index; pages that fail are left out"""
+        texts = {}
+        if executor is None:
+            for page_num, image in images.items():
+                try:
+                    texts[page_num] = _ocr_image(image)
+                except Exception as e:
+                    logger.warning(f"OCR failed for page {page_num + 1} of {filename}: {str(e)}")
+            return texts
+        
+        futures = {page_num: executor.submit(_ocr_image, image) for page_num, image in images.items()}
+        for page_num, future in futures.items():
+            try:
+                texts[page_num] = future.result()
+            except Exception as e:
+                logger.warning(f"OCR failed for page {page_num + 1} of {filename}: {str(e)}")
+        return texts
+
+def _ocr_image(image: bytes) -> str:
+    """OCR one rendered page (PNG bytes); module level so it can run in a process pool"""
+    return pytesseract.image_to_string(Image.open(io.BytesIO(image)))
+
+def _extract_pdf_text(pdf_path: Path) -> Tuple[Optional[str], Optional[dict], Dict[str, List[str]]]:
+    """Process pool entry point for the PDF parsing stage"""
+    return PdfTextExtractor().extract_text_from_pdf(pdf_path)
+
+class BatchResumeProcessor:
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.client = self.init_groq_client()
+        self.data_folder = Path("global")
+        self.output_folder = Path("global2")
+        self.processed_count = 0
+        self.failed_count = 0
+        self.skipped_count = 0
+        self.deduplicated_count = 0
+        self.cached_count = 0
+        self.text_extractor = PdfTextExtractor()
+        self.cache = ExtractionCache(EXTRACTION_CACHE_PATH)
+        # Resume tokens that fit in one request beside the prompt template and the reserved output
+        self.text_token_budget = token_budget(
+            MODEL_CONTEXT_TOKENS,
+            EXTRACTION_MAX_OUTPUT_TOKENS,
+            count_tokens(EXTRACTION_SYSTEM_PROMPT) + count_tokens(self.create_extraction_prompt("", {}, (0, 2)))
+        )
+        self._usage_lock = threading.Lock()
+        self.input_tokens = 0
+        self.output_tokens = 0
+        # Process pool for OCR of scanned pages in process_single_pdf, started on first use and
+        # stopped by close(); the batch pipeline already spreads files over its own process pool
+        self.ocr_executor = None
+        
+        # Shared by every Groq call, so concurrent LLM workers stay under the API rate limits
+        self.llm = RateLimitedLLMClient(
+            self.client,
+            requests_per_minute=GROQ_REQUESTS_PER_MINUTE,
+            tokens_per_minute=GROQ_TOKENS_PER_MINUTE,
+            max_retries=MAX_RETRIES
+        ) if self.client else None
+        
+        # Create output directory if it doesn't exist
+        self.output_folder.mkdir(exist_ok=True)
+        
+        if not self.data_folder.exists():
+            logger.error(f"Data folder '{self.data_folder}' does not exist!")
+            raise FileNotFoundError(f"Data folder '{self.data_folder}' does not exist!")
+
+    def init_groq_client(self) -> Optional[Groq]:
+        """Initialize and validate Groq client with API key"""
+        try:
+            client = Groq(api_key=self.api_key)
+            # Test the API key with a simple request
+            client.models.list()
+            logger.info("✅ Groq client initialized successfully")
+            return client
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize Groq client: {str(e)}")
+            return None
 
     def clean_json_response(self, response_text: str) -> str:
         """Enhanced JSON response cleaning"""
@@ -280,188 +393,76 @@ class BatchResumeProcessor:
         
         return response_text
 
-    def create_extraction_prompt(self, resume_text: str, extracted_links: Dict[str, List[str]]) -> str:
-        """Create extraction prompt with link information"""
+    def create_extraction_prompt(self, resume_text: str, extracted_links: Dict[str, List[str]], part: Optional[Tuple[int, int]] = None) -> str:
+        """Create extraction prompt with link information; ``part`` is (index, count) for a chunk of a long resume"""
         link_info = ""
-        if extracted_links['linkedin']:
+        if extracted_links.get('linkedin'):
             link_info += f"\nLinkedIn URLs found: {', '.join(extracted_links['linkedin'])}"
-        if extracted_links['github']:
+        if extracted_links.get('github'):
             link_info += f"\nGitHub URLs found: {', '.join(extracted_links['github'])}"
-        if extracted_links['other']:
-            link_info += f"\nOther URLs found: {', '.join(extracted_links['other'][:5])}..."
-        
-        return f"""You are an expert resume parser that can handle all resume formats. Extract information from the resume text and return ONLY a valid JSON object.
-
-RESUME TEXT:
-{resume_text}
-
-EXTRACTED HYPERLINKS:
-{link_info if link_info else "No hyperlinks found"}
-
-INSTRUCTIONS:
-1. Return ONLY valid JSON - no explanations, no markdown, no additional text
-2. Use the exact schema structure provided below
-3. If information is not available, use null or empty arrays/strings
-4. Be extremely thorough in extracting all available information
-5. Handle all resume formats (chronological, functional, combination, etc.)
-6. Extract skills from all sections, not just dedicated skills sections
-7. Normalize dates to YYYY-MM or YYYY-MM-DD format when possible
-8. Extract key achievements from experience descriptions
-9. Handle abbreviations and acronyms appropriately (e.g., "B.S." -> "Bachelor of Science")
-10. **IMPORTANT**: Use the extracted hyperlinks above to populate LinkedIn and GitHub fields accurately
-11. Prioritize extracted hyperlinks over any URLs found in the text
-
-JSON SCHEMA (return exactly this structure):
-{{
-    "candidate_name": "string or null",
-    "contact_information": {{
-        "email": "string or null",
-        "phone": "string or null", 
-        "location": "string or null",
-        "linkedin": "string or null",
-        "github": "string or null",
-        "portfolio": "string or null",
-        "other_links": []
-    }},
-    "candidate_description": "string or null",
-    "education": [
-        {{
-            "degree": "string",
-            "institution": "string", 
-            "location": "string or null",
-            "duration": "string or null",
-            "gpa_cgpa": "string or null",
-            "additional_info": "string or null",
-            "coursework": []
-        }}
-    ],
-    "experience": [
-        {{
-            "position": "string",
-            "company": "string",
-            "location": "string or null", 
-            "duration": "string or null",
-            "description": "string or null",
-            "type": "string or null",
-            "key_achievements": [],
-            "technologies_used": []
-        }}
-    ],
-    "projects": [
-        {{
-            "name": "string",
-            "description": "string or null",
-            "technologies": [],
-            "links": {{
-                "demo": "string or null",
-                "github": "string or null", 
-                "other": "string or null"
-            }},
-            "achievements": "string or null",
-            "duration": "string or null"
-        }}
-    ],
-    "skills": {{
-        "technical_skills": {{
-            "programming_languages": [],
-            "frameworks_libraries": [],
-            "databases": [],
-            "tools_software": [],
-            "cloud_platforms": [],
-            "devops": [],
-            "data_science": [],
-            "other_technical": []
-        }},
-        "soft_skills": [],
-        "industry_knowledge": []
-    }},
-    "achievements": [
-        {{
-            "title": "string",
-            "description": "string or null",
-            "date": "string or null", 
-            "organization": "string or null",
-            "prize_amount": "string or null"
-        }}
-    ],
-    "certifications": [
-        {{
-            "name": "string",
-            "issuing_organization": "string or null",
-            "date": "string or null",
-            "expiry_date": "string or null",
-            "credential_id": "string or null"
-        }}
-    ],
-    "publications": [
-        {{
-            "title": "string",
-            "journal_conference": "string or null", 
-            "date": "string or null",
-            "authors": [],
-            "description": "string or null"
-        }}
-    ],
-    "additional_information": {{
-        "volunteering": [],
-        "hobbies": [],
-        "awards": [],
-        "other": []
-    }},
-    "extraction_metadata": {{
-        "extraction_date": "string",
-        "model_used": "string",
-        "extraction_method": "string",
-        "pages_processed": "number",
-        "ocr_used": "boolean",
-        "links_extracted": "number"
-    }}
-}}
-
-Return ONLY the JSON object, nothing else. Ensure all fields are included even if empty."""
-
-    def extract_resume_data_with_retry(self, resume_text: str, extracted_links: Dict[str, List[str]], filename: str, max_retries: int = MAX_RETRIES) -> Optional[Dict[Any, Any]]:
-        """Enhanced data extraction with retry mechanism"""
-        if not resume_text or not isinstance(resume_text, str):
-            logger.error(f"Invalid resume text provided for {filename}")
-            return None
+        if extracted_links.get('other'):
+            link_info += f"\nOther URLs found: {', '.join(extracted_links['other'][:5])}"
+        
+        part_info = ""
+        if part is not None:
+            part_info = (f"\nThis is part {part[0] + 1} of {part[1]} of a longer resume. Extract only what appears "
+                         f"in this part; use null or empty arrays for everything else.")
+        
+        return f"""Extract the resume below into ONE valid JSON object matching SCHEMA.{part_info}
+Rules: JSON only, no markdown or explanations. Include every schema key; use null or [] when absent. Extract skills from every section, not just a skills section. Dates as YYYY-MM or YYYY-MM-DD when possible. Expand abbreviations (e.g. "B.S." -> "Bachelor of Science"). Put key achievements of each role in key_achievements. Prefer the extracted hyperlinks for linkedin and github.
+SCHEMA:
+{EXTRACTION_SCHEMA_JSON}
+HYPERLINKS:{link_info if link_info else " none"}
+RESUME:
+{resume_text}"""
+
+    def _request_extraction(self, resume_text: str, extracted_links: Dict[str, List[str]], label: str,
+                            usage: Dict[str, int], part: Optional[Tuple[int, int]] = None,
+                            max_retries: int = MAX_RETRIES) -> Optional[Dict[Any, Any]]:
+        """One extraction request (retried on unusable responses), adding the reported token usage to ``usage``"""
+        prompt = self.create_extraction_prompt(resume_text, extracted_links, part)
         
         for attempt in range(max_retries):
             try:
-                logger.info(f"Processing {filename} - Attempt {attempt + 1}/{max_retries}")
+                logger.info(f"Processing {label} - Attempt {attempt + 1}/{max_retries}")
                 
-                prompt = self.create_extraction_prompt(resume_text, extracted_links)
-                
-                chat_completion = self.client.chat.completions.create(
+                chat_completion = self.llm.create(
                     messages=[
                         {
                             "role": "system",
-                            "content": "You are a precise resume parser that returns only valid JSON objects. Never include explanations or markdown. Ensure all fields from the schema are present. Pay special attention to LinkedIn and GitHub URLs provided in the extracted hyperlinks section."
+                            "content": EXTRACTION_SYSTEM_PROMPT
                         },
                         {
                             "role": "user", 
                             "content": prompt
                         }
                     ],
-                    model="llama3-8b-8192",
+                    model=EXTRACTION_MODEL,
                     temperature=0.1,
-                    max_tokens=8192,
+                    max_tokens=EXTRACTION_MAX_OUTPUT_TOKENS,
                     top_p=0.9,
                     stream=False,
                     response_format={"type": "json_object"}
                 )
                 
+                input_tokens, output_tokens = usage_counts(chat_completion)
+                with self._usage_lock:
+                    usage['llm_requests'] += 1
+                    usage['input_tokens'] += input_tokens
+                    usage['output_tokens'] += output_tokens
+                    self.input_tokens += input_tokens
+                    self.output_tokens += output_tokens
+                
                 response_text = chat_completion.choices[0].message.content
                 
                 if not response_text or response_text.strip() == "":
-                    logger.warning(f"Empty response for {filename} - Attempt {attempt + 1}")
-                    time.sleep(2 ** attempt)
+                    logger.warning(f"Empty response for {label} - Attempt {attempt + 1}")
                     continue
                 
                 cleaned_response = self.clean_json_response(response_text)
                 
                 if not cleaned_response:
-                    logger.warning(f"Could not find JSON in response for {filename} - Attempt {attempt + 1}")
+                    logger.warning(f"Could not find JSON in response for {label} - Attempt {attempt + 1}")
                     continue
                 
                 try:
@@ -470,30 +471,84 @@ Return ONLY the JSON object, nothing else. Ensure all fields are included even i
                     if not isinstance(extracted_data, dict):
                         raise ValueError("Response is not a JSON object")
                     
-                    if 'candidate_name' not in extracted_data or 'experience' not in extracted_data:
+                    # A chunk may legitimately hold neither the name nor any experience
+                    if part is None and ('candidate_name' not in extracted_data or 'experience' not in extracted_data):
                         raise ValueError("Missing required fields in response")
                     
-                    extracted_data = self.post_process_links(extracted_data, extracted_links)
-                    logger.info(f"Successfully extracted data for {filename} on attempt {attempt + 1}")
                     return extracted_data
                     
                 except json.JSONDecodeError as e:
-                    logger.warning(f"JSON parsing failed for {filename} - Attempt {attempt + 1}: {str(e)}")
+                    logger.warning(f"JSON parsing failed for {label} - Attempt {attempt + 1}: {str(e)}")
                     if attempt == max_retries - 1:
-                        logger.error(f"Final attempt failed for {filename}. Raw response:")
+                        logger.error(f"Final attempt failed for {label}. Raw response:")
                         logger.error(cleaned_response[:1000] + "..." if len(cleaned_response) > 1000 else cleaned_response)
-                    time.sleep(2 ** attempt)
                     continue
-                    
+            
+            except (APIStatusError, APIConnectionError):
+                # The shared client already retried rate limits and transient failures
+                raise
             except Exception as e:
-                logger.error(f"API call failed for {filename} - Attempt {attempt + 1}: {str(e)}")
+                logger.error(f"Extraction failed for {label} - Attempt {attempt + 1}: {str(e)}")
                 if attempt == max_retries - 1:
-                    logger.error(f"All attempts failed for {filename}")
-                time.sleep(2 ** attempt)
+                    logger.error(f"All attempts failed for {label}")
                 continue
         
         return None
 
+    def extract_resume_data_with_retry(self, resume_text: str, extracted_links: Dict[str, List[str]], filename: str,
+                                       max_retries: int = MAX_RETRIES, usage: Optional[Dict[str, int]] = None) -> Optional[Dict[Any, Any]]:
+        """
+        Extract structured data from resume text with the LLM.
+        
+        The text is compacted first; a resume that still doesn't fit the
+        request budget is split into section-aware chunks that are extracted
+        concurrently and merged in resume order. Token counts for the file
+        are added to ``usage`` when given.
+        """
+        if not resume_text or not isinstance(resume_text, str):
+            logger.error(f"Invalid resume text provided for {filename}")
+            return None
+        
+        if usage is None:
+            usage = {}
+        for key in ('llm_requests', 'input_tokens', 'output_tokens'):
+            usage.setdefault(key, 0)
+        
+        compacted = compact_resume_text(resume_text)
+        usage['resume_tokens'] = count_tokens(resume_text)
+        usage['compacted_tokens'] = count_tokens(compacted)
+        chunks = chunk_resume(compacted, self.text_token_budget)
+        usage['chunks'] = len(chunks)
+        
+        try:
+            if len(chunks) == 1:
+                extracted_data = self._request_extraction(chunks[0], extracted_links, filename, usage, max_retries=max_retries)
+            else:
+                logger.info(f"✂️  {filename} is ~{usage['compacted_tokens']} tokens, extracting in {len(chunks)} chunks")
+                with ThreadPoolExecutor(max_workers=min(CHUNK_WORKERS, len(chunks))) as executor:
+                    futures = [
+                        executor.submit(self._request_extraction, chunk, extracted_links,
+                                        f"{filename} [part {index + 1}/{len(chunks)}]", usage, (index, len(chunks)), max_retries)
+                        for index, chunk in enumerate(chunks)
+                    ]
+                    parts = [future.result() for future in futures]
+                if any(part is None for part in parts):
+                    logger.error(f"Could not extract every part of {filename}")
+                    return None
+                extracted_data = merge_extractions(parts)
+        except (APIStatusError, APIConnectionError) as e:
+            logger.error(f"API call failed for {filename}: {str(e)}")
+            return None
+        
+        logger.info(f"🔢 {filename}: {usage['input_tokens']} input / {usage['output_tokens']} output tokens "
+                    f"in {usage['llm_requests']} request(s)")
+        if not extracted_data:
+            return None
+        
+        extracted_data = self.post_process_links(extracted_data, extracted_links)
+        logger.info(f"Successfully extracted data for {filename}")
+        return extracted_data
+
     def post_process_links(self, extracted_data: Dict[Any, Any], extracted_links: Dict[str, List[str]]) -> Dict[Any, Any]:
         """Post-process extracted data to ensure links are properly populated"""
         try:
@@ -532,23 +587,91 @@ Return ONLY the JSON object, nothing else. Ensure all fields are included even i
         
         return True
 
+    def output_path_for(self, pdf_path: Path) -> Path:
+        return self.output_folder / (pdf_path.stem + "_extracted.json")
+
+    def save_extracted_data(self, pdf_path: Path, extracted_data: Optional[Dict[Any, Any]], metadata: dict) -> bool:
+        """Validate and save the data extracted from one file, updating the counters"""
+        output_path = self.output_path_for(pdf_path)
+        
+        if extracted_data and self.validate_extracted_data(extracted_data):
+            # Add extraction metadata
+            extracted_data["extraction_metadata"] = {
+                "extraction_date": datetime.now().isoformat(),
+                "model_used": EXTRACTION_MODEL,
+                "source_file": pdf_path.name,
+                **metadata
+            }
+            
+            # Save to JSON file
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(extracted_data, f, indent=2, ensure_ascii=False)
+            
+            # Log success with key info
+            contact_info = extracted_data.get('contact_information', {})
+            candidate_name = extracted_data.get('candidate_name', 'Unknown')
+            linkedin = contact_info.get('linkedin', 'Not found')
+            github = contact_info.get('github', 'Not found')
+            
+            logger.info(f"✅ Successfully processed: {pdf_path.name}")
+            logger.info(f"   👤 Candidate: {candidate_name}")
+            logger.info(f"   🔗 LinkedIn: {linkedin}")
+            logger.info(f"   🐙 GitHub: {github}")
+            logger.info(f"   💾 Saved to: {output_path.name}")
+            
+            self.processed_count += 1
+            return True
+        
+        logger.error(f"❌ Failed to extract valid data from {pdf_path.name}")
+        self.failed_count += 1
+        return False
+
+    def save_results(self, sha256: str, pdf_paths: List[Path], extracted_data: Optional[Dict[Any, Any]],
+                     metadata: dict, from_cache: bool = False) -> bool:
+        """Save one extraction for every file with this content; new valid extractions are cached"""
+        if not from_cache and extracted_data and self.validate_extracted_data(extracted_data):
+            self.cache.put_extraction(sha256, EXTRACTION_MODEL, EXTRACTION_PROMPT_VERSION, extracted_data)
+        
+        saved = True
+        for pdf_path in pdf_paths:
+            data = dict(extracted_data) if extracted_data else extracted_data
+            saved = self.save_extracted_data(pdf_path, data, {**(metadata or {}), "content_sha256": sha256}) and saved
+        return saved
+
+    def cached_text_metadata(self, sha256: str) -> dict:
+        """Page metadata of the cached text for a file's content, if any"""
+        cached_text = self.cache.get_text(sha256, TEXT_EXTRACTOR_VERSION)
+        return cached_text[1] if cached_text else {}
+
     def process_single_pdf(self, pdf_path: Path) -> bool:
         """Process a single PDF file"""
         try:
             logger.info(f"🔄 Processing: {pdf_path.name}")
             
-            # Generate output filename
-            output_filename = pdf_path.stem + "_extracted.json"
-            output_path = self.output_folder / output_filename
-            
             # Skip if already processed
-            if output_path.exists():
+            if self.output_path_for(pdf_path).exists():
                 logger.info(f"⏭️  Skipping {pdf_path.name} - already processed")
                 self.skipped_count += 1
                 return True
             
-            # Extract text and links
-            resume_text, metadata, extracted_links = self.extract_text_from_pdf(pdf_path)
+            # Same content seen before (under any filename): reuse its extraction
+            sha256 = self.cache.file_sha256(pdf_path)
+            cached = self.cache.get_extraction(sha256, EXTRACTION_MODEL, EXTRACTION_PROMPT_VERSION)
+            if cached is not None:
+                logger.info(f"♻️  Reusing cached extraction for {pdf_path.name}")
+                self.cached_count += 1
+                return self.save_results(sha256, [pdf_path], cached, self.cached_text_metadata(sha256), from_cache=True)
+            
+            # Extract text and links, unless cached
+            cached_text = self.cache.get_text(sha256, TEXT_EXTRACTOR_VERSION)
+            if cached_text is not None:
+                resume_text, metadata, extracted_links = cached_text
+            else:
+                if self.ocr_executor is None:
+                    self.ocr_executor = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=PROCESS_CONTEXT)
+                resume_text, metadata, extracted_links = self.text_extractor.extract_text_from_pdf(pdf_path, self.ocr_executor)
+                if resume_text:
+                    self.cache.put_text(sha256, TEXT_EXTRACTOR_VERSION, resume_text, metadata, extracted_links)
             
             if not resume_text:
                 logger.error(f"❌ Could not extract text from {pdf_path.name}")
@@ -556,39 +679,9 @@ Return ONLY the JSON object, nothing else. Ensure all fields are included even i
                 return False
             
             # Process with AI
-            extracted_data = self.extract_resume_data_with_retry(resume_text, extracted_links, pdf_path.name)
-            
-            if extracted_data and self.validate_extracted_data(extracted_data):
-                # Add extraction metadata
-                extracted_data["extraction_metadata"] = {
-                    "extraction_date": datetime.now().isoformat(),
-                    "model_used": "llama3-8b-8192",
-                    "source_file": pdf_path.name,
-                    **metadata
-                }
-                
-                # Save to JSON file
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    json.dump(extracted_data, f, indent=2, ensure_ascii=False)
-                
-                # Log success with key info
-                contact_info = extracted_data.get('contact_information', {})
-                candidate_name = extracted_data.get('candidate_name', 'Unknown')
-                linkedin = contact_info.get('linkedin', 'Not found')
-                github = contact_info.get('github', 'Not found')
-                
-                logger.info(f"✅ Successfully processed: {pdf_path.name}")
-                logger.info(f"   👤 Candidate: {candidate_name}")
-                logger.info(f"   🔗 LinkedIn: {linkedin}")
-                logger.info(f"   🐙 GitHub: {github}")
-                logger.info(f"   💾 Saved to: {output_filename}")
-                
-                self.processed_count += 1
-                return True
-            else:
-                logger.error(f"❌ Failed to extract valid data from {pdf_path.name}")
-                self.failed_count += 1
-                return False
+            usage = {}
+            extracted_data = self.extract_resume_data_with_retry(resume_text, extracted_links, pdf_path.name, usage=usage)
+            return self.save_results(sha256, [pdf_path], extracted_data, {**metadata, "token_usage": usage})
                 
         except Exception as e:
             logger.error(f"❌ Error processing {pdf_path.name}: {str(e)}")
@@ -596,6 +689,146 @@ Return ONLY the JSON object, nothing else. Ensure all fields are included even i
             self.failed_count += 1
             return False
 
+    def group_by_content(self, pdf_files: List[Path]) -> Dict[str, List[Path]]:
+        """Files grouped by the SHA-256 of their bytes, so each distinct resume is processed once"""
+        groups = {}
+        for pdf_path in pdf_files:
+            try:
+                groups.setdefault(self.cache.file_sha256(pdf_path), []).append(pdf_path)
+            except OSError as e:
+                logger.error(f"❌ Could not read {pdf_path.name}: {str(e)}")
+                self.failed_count += 1
+        
+        for paths in groups.values():
+            if len(paths) > 1:
+                logger.info(f"🔁 {len(paths)} files share the same content: {', '.join(path.name for path in paths)}")
+                self.deduplicated_count += len(paths) - 1
+        return groups
+
+    def run_pipeline(self, pdf_files: List[Path]):
+        """
+        Process files in three overlapping stages connected by bounded queues.
+        
+        Files are first grouped by content hash. For each distinct resume a
+        cached extraction goes straight to the writer and cached text straight
+        to the LLM stage; otherwise a process pool parses the PDF (text layer,
+        OCR for scanned pages). LLM worker threads call Groq under the shared
+        rate limiter, and a single writer thread validates and saves results
+        for every file with that content and updates the counters. The next
+        files are parsed while the LLM works on earlier ones; when the LLM
+        stage falls behind, the full queue stops new parsing work being
+        submitted.
+        """
+        groups = self.group_by_content(pdf_files)
+        llm_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        write_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        
+        def llm_worker():
+            while True:
+                item = llm_queue.get()
+                if item is None:
+                    return
+                sha256, pdf_paths, resume_text, metadata, extracted_links = item
+                usage = {}
+                try:
+                    extracted_data = self.extract_resume_data_with_retry(resume_text, extracted_links, pdf_paths[0].name, usage=usage)
+                except Exception as e:
+                    logger.error(f"❌ Error processing {pdf_paths[0].name}: {str(e)}")
+                    extracted_data = None
+                write_queue.put((sha256, pdf_paths, extracted_data, {**metadata, "token_usage": usage}, None, False))
+        
+        def writer():
+            while True:
+                item = write_queue.get()
+                if item is None:
+                    return
+                sha256, pdf_paths, extracted_data, metadata, error, from_cache = item
+                if error:
+                    logger.error(error)
+                    self.failed_count += len(pdf_paths)
+                    continue
+                try:
+                    self.save_results(sha256, pdf_paths, extracted_data, metadata, from_cache)
+                except Exception as e:
+                    logger.error(f"❌ Error saving {pdf_paths[0].name}: {str(e)}")
+                    self.failed_count += len(pdf_paths)
+        
+        llm_threads = [threading.Thread(target=llm_worker, name=f"llm-{i}", daemon=True) for i in range(LLM_WORKERS)]
+        writer_thread = threading.Thread(target=writer, name="writer", daemon=True)
+        for thread in llm_threads + [writer_thread]:
+            thread.start()
+        
+        try:
+            with ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=PROCESS_CONTEXT) as pool:
+                remaining = iter(groups.items())
+                in_flight = {}
+                parsed = 0
+                exhausted = False
+                
+                while in_flight or not exhausted:
+                    # Keep every parsing process busy with one file queued behind it
+                    while not exhausted and len(in_flight) < EXTRACT_WORKERS * 2:
+                        entry = next(remaining, None)
+                        if entry is None:
+                            exhausted = True
+                            break
+                        sha256, pdf_paths = entry
+                        
+                        cached = self.cache.get_extraction(sha256, EXTRACTION_MODEL, EXTRACTION_PROMPT_VERSION)
+                        if cached is not None:
+                            logger.info(f"♻️  Reusing cached extraction for {pdf_paths[0].name}")
+                            self.cached_count += 1
+                            write_queue.put((sha256, pdf_paths, cached, self.cached_text_metadata(sha256), None, True))
+                            continue
+                        
+                        cached_text = self.cache.get_text(sha256, TEXT_EXTRACTOR_VERSION)
+                        if cached_text is not None:
+                            llm_queue.put((sha256, pdf_paths) + tuple(cached_text))
+                            continue
+                        
+                        in_flight[pool.submit(_extract_pdf_text, pdf_paths[0])] = (sha256, pdf_paths)
+                    if not in_flight:
+                        continue
+                    
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        sha256, pdf_paths = in_flight.pop(future)
+                        name = pdf_paths[0].name
+                        parsed += 1
+                        logger.info(f"📄 Parsed {parsed}: {name}")
+                        try:
+                            resume_text, metadata, extracted_links = future.result()
+                        except Exception as e:
+                            write_queue.put((sha256, pdf_paths, None, None, f"❌ Error processing {name}: {str(e)}", False))
+                            continue
+                        
+                        if not resume_text:
+                            write_queue.put((sha256, pdf_paths, None, None, f"❌ Could not extract text from {name}", False))
+                        else:
+                            self.cache.put_text(sha256, TEXT_EXTRACTOR_VERSION, resume_text, metadata, extracted_links)
+                            # Blocks while the LLM stage is behind
+                            llm_queue.put((sha256, pdf_paths, resume_text, metadata, extracted_links))
+        finally:
+            for _ in llm_threads:
+                llm_queue.put(None)
+            for thread in llm_threads:
+                thread.join()
+            write_queue.put(None)
+            writer_thread.join()
+
+    def close(self):
+        """Stop the OCR worker processes, if any were started, and close the cache"""
+        if self.ocr_executor is not None:
+            self.ocr_executor.shutdown()
+            self.ocr_executor = None
+        self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def process_all_pdfs(self):
         """Process all PDF files in the data folder"""
         pdf_files = list(self.data_folder.glob("*.pdf"))
@@ -610,12 +843,16 @@ Return ONLY the JSON object, nothing else. Ensure all fields are included even i
         
         start_time = time.time()
         
-        for i, pdf_path in enumerate(pdf_files, 1):
-            logger.info(f"\n📄 File {i}/{len(pdf_files)}: {pdf_path.name}")
-            self.process_single_pdf(pdf_path)
-            
-            # Small delay to avoid rate limiting
-            time.sleep(1)
+        pending = []
+        for pdf_path in pdf_files:
+            if self.output_path_for(pdf_path).exists():
+                logger.info(f"⏭️  Skipping {pdf_path.name} - already processed")
+                self.skipped_count += 1
+            else:
+                pending.append(pdf_path)
+        
+        if pending:
+            self.run_pipeline(pending)
         
         end_time = time.time()
         total_time = end_time - start_time
@@ -626,7 +863,10 @@ Return ONLY the JSON object, nothing else. Ensure all fields are included even i
         logger.info("="*60)
         logger.info(f"✅ Successfully processed: {self.processed_count}")
         logger.info(f"⏭️  Skipped (already exists): {self.skipped_count}")
+        logger.info(f"🔁 Duplicate content: {self.deduplicated_count}")
+        logger.info(f"♻️  Reused cached extractions: {self.cached_count}")
         logger.info(f"❌ Failed: {self.failed_count}")
+        logger.info(f"🔢 LLM tokens: {self.input_tokens} input / {self.output_tokens} output")
         logger.info(f"📄 Total files: {len(pdf_files)}")
         logger.info(f"⏱️  Total time: {total_time:.2f} seconds")
         logger.info(f"⚡ Average time per file: {total_time/len(pdf_files):.2f} seconds")
@@ -646,15 +886,14 @@ def main():
             sys.exit(1)
     
     try:
-        # Initialize processor
-        processor = BatchResumeProcessor(api_key)
-        
-        if not processor.client:
-            print("❌ Failed to initialize Groq client!")
-            sys.exit(1)
-        
-        # Process all PDFs
-        processor.process_all_pdfs()
+        # Initialize processor; closing it stops any OCR worker processes
+        with BatchResumeProcessor(api_key) as processor:
+            if not processor.client:
+                print("❌ Failed to initialize Groq client!")
+                sys.exit(1)
+            
+            # Process all PDFs
+            processor.process_all_pdfs()
         
     except KeyboardInterrupt:
         print("\n⏹️  Processing interrupted by user")
@@ -9,6 +9,32 @@ from collections import Counter
 import time
 import google.generativeai as genai
 import base64
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.github_crawler import AsyncGitHubClient, GitHubResponseCache
+from services.github_graphql import GitHubGraphQLBackend
+from services.github_summary import summarize_project, top_projects, extract_github_username, needs_ai_analysis
+from services.github_watermarks import RepoWatermarkStore, refresh_repo_details, repo_watermark
+from services.repo_analysis import GeminiRepoAnalyzer, RepoAnalysisCache, KEY_FILES, repository_context
+
+# Concurrent repository crawling: in-flight request limit, conditional-request cache, and the
+# number of remaining API calls below which requests are spread out until the rate limit resets
+GITHUB_MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", "8"))
+GITHUB_CACHE_PATH = os.getenv("GITHUB_CACHE_PATH", "github_cache.sqlite3")
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "50"))
+# "graphql" fetches the top projects' details in two queries instead of ~70 REST calls
+GITHUB_BACKEND = os.getenv("GITHUB_BACKEND", "graphql")
+# Per-repository watermarks: projects that haven't been pushed to reuse their stored details
+GITHUB_WATERMARK_PATH = os.getenv("GITHUB_WATERMARK_PATH", "github_watermarks.sqlite3")
+GITHUB_REFRESH_MAX_AGE_HOURS = float(os.getenv("GITHUB_REFRESH_MAX_AGE_HOURS", "168"))
+# Gemini project analyses: cached per head commit, several projects per prompt, shared request budget
+GEMINI_ANALYSIS_CACHE_PATH = os.getenv("GEMINI_ANALYSIS_CACHE_PATH", "gemini_analysis.sqlite3")
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "15"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_BATCH_SIZE = int(os.getenv("GEMINI_BATCH_SIZE", "5"))
 
 # Set page config
 st.set_page_config(
@@ -17,6 +43,18 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource
+def get_repo_analyzer(gemini_key):
+    """One analyzer per Gemini key, shared by every session so they stay under the same rate limit"""
+    genai.configure(api_key=gemini_key)
+    return GeminiRepoAnalyzer(
+        genai.GenerativeModel('gemini-2.0-flash-exp'),
+        cache=RepoAnalysisCache(GEMINI_ANALYSIS_CACHE_PATH),
+        requests_per_minute=GEMINI_REQUESTS_PER_MINUTE,
+        max_concurrency=GEMINI_MAX_CONCURRENCY,
+        batch_size=GEMINI_BATCH_SIZE
+    )
+
 class GitHubDataFetcher:
     def __init__(self, token, gemini_key=None):
         self.token = token
@@ -26,18 +64,24 @@ class GitHubDataFetcher:
             'Accept': 'application/vnd.github.v3+json'
         }
         self.base_url = 'https://api.github.com'
+        # One pooled, keep-alive session for every synchronous call
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.response_cache = GitHubResponseCache(GITHUB_CACHE_PATH)
+        self.watermarks = RepoWatermarkStore(GITHUB_WATERMARK_PATH)
         
         # Initialize Gemini if key provided
         if gemini_key:
-            genai.configure(api_key=gemini_key)
-            self.gemini_model = genai.GenerativeModel('gemini-2.0-flash-exp')
+            self.repo_analyzer = get_repo_analyzer(gemini_key)
+            self.gemini_model = self.repo_analyzer.model
         else:
+            self.repo_analyzer = None
             self.gemini_model = None
     
     def make_request(self, url, params=None):
         """Make API request with error handling"""
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, params=params)
             if response.status_code == 200:
                 return response.json()
             elif response.status_code == 404:
@@ -151,7 +195,7 @@ class GitHubDataFetcher:
         url = f"{self.base_url}/repos/{username}/{repo_name}/topics"
         headers = {**self.headers, 'Accept': 'application/vnd.github.mercy-preview+json'}
         try:
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers)
             if response.status_code == 200:
                 return response.json().get('names', [])
         except:
@@ -168,83 +212,88 @@ class GitHubDataFetcher:
         url = f"{self.base_url}/repos/{username}/{repo_name}/contents/{file_path}"
         return self.make_request(url)
     
-    def analyze_repo_with_gemini(self, username, repo_name, repo_data):
-        """Analyze repository using Gemini AI"""
-        if not self.gemini_model:
+    async def _crawl_repo_details(self, username, repo_names=None, repos=None):
+        async with AsyncGitHubClient(
+            self.token,
+            cache=self.response_cache,
+            max_concurrency=GITHUB_MAX_CONCURRENCY,
+            reserve=GITHUB_RATE_LIMIT_RESERVE
+        ) as client:
+            source = GitHubGraphQLBackend(client) if GITHUB_BACKEND == "graphql" and self.token else client
+            if repos is not None:
+                return await refresh_repo_details(source, self.watermarks, username, repos,
+                                                  GITHUB_REFRESH_MAX_AGE_HOURS * 3600)
+            return await source.fetch_many_repo_details(username, repo_names)
+    
+    def fetch_repo_details(self, username, repo_names):
+        """Get README, contributors, releases, topics, languages, commits and issues of several repositories concurrently"""
+        return asyncio.run(self._crawl_repo_details(username, list(repo_names)))
+    
+    def refresh_repo_details(self, username, repos):
+        """Like fetch_repo_details for listed repositories, but reuses stored details of those not pushed to since"""
+        return asyncio.run(self._crawl_repo_details(username, repos=list(repos)))
+    
+    def analysis_context(self, username, repo_data, details=None):
+        """Repository details, file structure and key configuration files to analyze, as prompt text"""
+        repo_name = repo_data['name']
+        topics = details['topics'] if details is not None else self.get_repo_topics(username, repo_name)
+        
+        # Get file structure
+        tree = self.get_repo_tree(username, repo_name, repo_data.get('default_branch') or 'main')
+        file_structure = []
+        paths = set()
+        if tree and 'tree' in tree:
+            paths = {item['path'] for item in tree['tree']}
+            for item in tree['tree'][:20]:  # First 20 files
+                if item['type'] == 'blob':
+                    file_structure.append(item['path'])
+        
+        # Get key files content, only those the tree shows at the root
+        file_contents = {}
+        for file in KEY_FILES:
+            if tree and file not in paths:
+                continue
+            content = self.get_file_content(username, repo_name, file)
+            if content and content.get('content'):
+                try:
+                    decoded = base64.b64decode(content['content']).decode('utf-8')
+                    file_contents[file] = decoded[:500]  # First 500 chars
+                except:
+                    pass
+        
+        return repository_context(repo_data, topics, file_structure, file_contents)
+    
+    def analyze_repos(self, username, repos, repo_details):
+        """Gemini analyses of several repositories keyed by name: cached per head commit, batched, rate limited"""
+        if not self.repo_analyzer:
+            return {repo['name']: "Gemini AI not configured" for repo in repos}
+        
+        items = [
+            (
+                f"{username}/{repo['name']}",
+                repo_watermark(repo, repo_details[repo['name']])['head_sha'],
+                lambda repo=repo: self.analysis_context(username, repo, repo_details[repo['name']])
+            )
+            for repo in repos
+        ]
+        analyses = self.repo_analyzer.analyze_many(items)
+        return {repo['name']: analyses[f"{username}/{repo['name']}"] for repo in repos}
+    
+    def analyze_repo_with_gemini(self, username, repo_name, repo_data, details=None):
+        """Analyze repository using Gemini AI; ``details`` (if crawled) key the cache on its head commit"""
+        if not self.repo_analyzer:
             return "Gemini AI not configured"
         
-        try:
-            # Gather repository information
-            repo_info = {
-                'name': repo_data.get('name', ''),
-                'description': repo_data.get('description', ''),
-                'language': repo_data.get('language', ''),
-                'topics': self.get_repo_topics(username, repo_name),
-                'size': repo_data.get('size', 0),
-                'stars': repo_data.get('stargazers_count', 0),
-                'forks': repo_data.get('forks_count', 0)
-            }
-            
-            # Get file structure
-            tree = self.get_repo_tree(username, repo_name)
-            file_structure = []
-            if tree and 'tree' in tree:
-                for item in tree['tree'][:20]:  # First 20 files
-                    if item['type'] == 'blob':
-                        file_structure.append(item['path'])
-            
-            # Get key files content
-            key_files = ['package.json', 'requirements.txt', 'pom.xml', 'build.gradle', 'Cargo.toml', 'go.mod']
-            file_contents = {}
-            for file in key_files:
-                content = self.get_file_content(username, repo_name, file)
-                if content and content.get('content'):
-                    try:
-                        decoded = base64.b64decode(content['content']).decode('utf-8')
-                        file_contents[file] = decoded[:500]  # First 500 chars
-                    except:
-                        pass
-            
-            # Create prompt for Gemini
-            prompt = f"""
-            Analyze this GitHub repository and provide a comprehensive summary:
-            
-            **Repository Details:**
-            - Name: {repo_info['name']}
-            - Description: {repo_info['description'] or 'No description'}
-            - Primary Language: {repo_info['language'] or 'Not specified'}
-            - Topics: {', '.join(repo_info['topics']) if repo_info['topics'] else 'None'}
-            - Size: {repo_info['size']} KB
-            - Stars: {repo_info['stars']}, Forks: {repo_info['forks']}
-            
-            **File Structure (sample):**
-            {chr(10).join(file_structure[:15])}
-            
-            **Key Configuration Files:**
-            {json.dumps(file_contents, indent=2) if file_contents else 'None found'}
-            
-            Please provide:
-            1. **Project Purpose**: What this project does (2-3 sentences)
-            2. **Technology Stack**: Technologies, frameworks, and tools used
-            3. **Project Category**: Type of project (web app, library, tool, etc.)
-            4. **Key Features**: Main functionality and capabilities
-            5. **Development Status**: Assessment of project maturity and activity
-            6. **Use Cases**: Who would use this and why
-            
-            Keep the response concise but informative, suitable for a developer portfolio summary.
-            """
-            
-            response = self.gemini_model.generate_content(prompt)
-            return response.text
-            
-        except Exception as e:
-            return f"AI Analysis failed: {str(e)}"
+        if details is None:
+            analyses = self.repo_analyzer.analyze_many(
+                [(f"{username}/{repo_name}", None, lambda: self.analysis_context(username, repo_data))]
+            )
+            return analyses[f"{username}/{repo_name}"]
+        return self.analyze_repos(username, [repo_data], {repo_name: details})[repo_name]
 
 def extract_username_from_url(url_or_username):
     """Extract username from GitHub URL or return username as is"""
-    if url_or_username.startswith('https://github.com/'):
-        return url_or_username.split('/')[-1]
-    return url_or_username
+    return extract_github_username(url_or_username) or url_or_username
 
 def display_user_profile(user_info):
     """Display user profile information"""
@@ -278,127 +327,18 @@ def display_user_profile(user_info):
         with col2_3:
             st.metric("Public Repos", user_info['public_repos'])
 
-def generate_project_summary(fetcher, username, repo):
-    """Generate comprehensive summary for a project"""
+def generate_project_summary(fetcher, username, repo, details=None, analysis=None):
+    """Generate comprehensive summary for a project; ``details`` and ``analysis`` are used if fetched already"""
     repo_name = repo['name']
     
     # Get additional repository data
-    readme = fetcher.get_repo_readme(username, repo_name)
-    contributors = fetcher.get_repo_contributors(username, repo_name)
-    releases = fetcher.get_repo_releases(username, repo_name)
-    topics = fetcher.get_repo_topics(username, repo_name)
-    languages = fetcher.get_repo_languages(username, repo_name)
-    commits = fetcher.get_repo_commits(username, repo_name, per_page=30)
-    issues = fetcher.get_repo_issues(username, repo_name)
-    
-    # Calculate project metrics
-    total_contributors = len(contributors) if contributors else 0
-    total_releases = len(releases) if releases else 0
-    open_issues = len([i for i in issues if i.get('state') == 'open']) if issues else 0
-    closed_issues = len([i for i in issues if i.get('state') == 'closed']) if issues else 0
-    
-    # Get primary language and percentage
-    primary_language = repo.get('language', 'Not specified')
-    language_info = ""
-    if languages:
-        total_bytes = sum(languages.values())
-        if total_bytes > 0:
-            lang_percentages = [(lang, (bytes_count / total_bytes) * 100) 
-                              for lang, bytes_count in languages.items()]
-            lang_percentages.sort(key=lambda x: x[1], reverse=True)
-            top_3_langs = lang_percentages[:3]
-            language_info = ", ".join([f"{lang} ({perc:.1f}%)" for lang, perc in top_3_langs])
-    
-    # Get recent activity
-    recent_commits = len(commits) if commits else 0
-    last_commit = None
-    if commits:
-        last_commit = commits[0]['commit']['author']['date'][:10]
-    
-    # Get latest release info
-    latest_release = None
-    if releases:
-        latest_release = releases[0]['tag_name']
+    if details is None:
+        details = fetcher.fetch_repo_details(username, [repo_name])[repo_name]
     
-    # README excerpt
-    readme_excerpt = ""
-    ai_analysis = ""
-    
-    if readme and readme.get('content'):
-        try:
-            decoded_content = base64.b64decode(readme['content']).decode('utf-8')
-            # Extract first meaningful paragraph (skip title and empty lines)
-            lines = decoded_content.split('\n')
-            for line in lines:
-                clean_line = line.strip()
-                if clean_line and not clean_line.startswith('#') and len(clean_line) > 50:
-                    readme_excerpt = clean_line[:200] + "..." if len(clean_line) > 200 else clean_line
-                    break
-        except:
-            readme_excerpt = "Unable to parse README"
-    
-    # If no README or poor README, use AI analysis
-    if not readme_excerpt or len(readme_excerpt) < 50:
-        if fetcher.gemini_model:
-            ai_analysis = fetcher.analyze_repo_with_gemini(username, repo_name, repo)
-            if ai_analysis and "AI Analysis failed" not in ai_analysis:
-                readme_excerpt = "AI-Generated Summary Available"
-    
-    # Calculate project health score
-    health_score = 0
-    if repo['stargazers_count'] > 0: health_score += 10
-    if repo['forks_count'] > 0: health_score += 10
-    if total_contributors > 1: health_score += 15
-    if recent_commits > 0: health_score += 20
-    if repo.get('description'): health_score += 10
-    if readme or ai_analysis: health_score += 15
-    if latest_release: health_score += 10
-    if topics: health_score += 10
-    
-    # Project category based on topics and language
-    category = "General"
-    if topics:
-        web_topics = ['web', 'frontend', 'backend', 'react', 'vue', 'angular', 'html', 'css']
-        mobile_topics = ['mobile', 'android', 'ios', 'react-native', 'flutter']
-        data_topics = ['data-science', 'machine-learning', 'ai', 'analytics', 'python']
-        dev_topics = ['cli', 'tool', 'devops', 'automation', 'library']
-        
-        if any(topic in web_topics for topic in topics):
-            category = "Web Development"
-        elif any(topic in mobile_topics for topic in topics):
-            category = "Mobile Development"
-        elif any(topic in data_topics for topic in topics):
-            category = "Data Science/AI"
-        elif any(topic in dev_topics for topic in topics):
-            category = "Developer Tools"
-    
-    return {
-        'name': repo_name,
-        'description': repo.get('description', 'No description available'),
-        'primary_language': primary_language,
-        'language_breakdown': language_info,
-        'stars': repo['stargazers_count'],
-        'forks': repo['forks_count'],
-        'watchers': repo['watchers_count'],
-        'contributors': total_contributors,
-        'releases': total_releases,
-        'latest_release': latest_release,
-        'open_issues': open_issues,
-        'closed_issues': closed_issues,
-        'recent_commits': recent_commits,
-        'last_commit': last_commit,
-        'topics': topics,
-        'category': category,
-        'readme_excerpt': readme_excerpt,
-        'ai_analysis': ai_analysis,
-        'health_score': health_score,
-        'created_at': repo['created_at'][:10],
-        'updated_at': repo['updated_at'][:10],
-        'size_kb': repo.get('size', 0),
-        'default_branch': repo.get('default_branch', 'main'),
-        'is_fork': repo.get('fork', False),
-        'html_url': repo['html_url']
-    }
+    analyze = None
+    if fetcher.gemini_model:
+        analyze = (lambda: analysis) if analysis is not None else lambda: fetcher.analyze_repo_with_gemini(username, repo_name, repo, details)
+    return summarize_project(repo, details, analyze)
 
 def display_top_projects_summary(fetcher, username, repos):
     """Display comprehensive summary of top 10 projects"""
@@ -409,18 +349,7 @@ def display_top_projects_summary(fetcher, username, repos):
     st.header("🏆 Top 10 Projects Summary")
     
     # Sort repositories by a combination of stars and activity
-    def calculate_project_score(repo):
-        stars = repo['stargazers_count']
-        forks = repo['forks_count']
-        watchers = repo['watchers_count']
-        # Recent activity bonus (updated within last year)
-        from datetime import datetime, timedelta
-        updated = datetime.strptime(repo['updated_at'], '%Y-%m-%dT%H:%M:%SZ')
-        recent_bonus = 10 if updated > datetime.now() - timedelta(days=365) else 0
-        
-        return (stars * 3) + (forks * 2) + watchers + recent_bonus
-    
-    top_repos = sorted(repos, key=calculate_project_score, reverse=True)[:10]
+    top_repos = top_projects(repos, 10)
     
     # Generate summaries for top projects
     project_summaries = []
@@ -428,14 +357,24 @@ def display_top_projects_summary(fetcher, username, repos):
     progress_bar = st.progress(0)
     status_text = st.empty()
     
+    # Crawl every endpoint of the top projects at once; the client paces itself against the rate limit
+    status_text.text(f"Fetching data for {len(top_repos)} projects...")
+    repo_details = fetcher.refresh_repo_details(username, top_repos)
+    
+    # Analyze every project without a usable README at once: cached ones are free, the rest share batched prompts
+    analyses = {}
+    if fetcher.gemini_model:
+        to_analyze = [repo for repo in top_repos if needs_ai_analysis(repo_details[repo['name']])]
+        if to_analyze:
+            status_text.text(f"Analyzing {len(to_analyze)} projects with Gemini...")
+            analyses = fetcher.analyze_repos(username, to_analyze, repo_details)
+    
     for i, repo in enumerate(top_repos):
         status_text.text(f"Analyzing project {i+1}/10: {repo['name']}")
         progress_bar.progress((i + 1) / len(top_repos))
         
-        summary = generate_project_summary(fetcher, username, repo)
+        summary = generate_project_summary(fetcher, username, repo, repo_details[repo['name']], analyses.get(repo['name']))
         project_summaries.append(summary)
-        
-        time.sleep(0.2)  # Rate limiting
     
     progress_bar.empty()
     status_text.empty()
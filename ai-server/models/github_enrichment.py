@@ -0,0 +1,253 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.github_crawler import AsyncGitHubClient, GitHubResponseCache, GITHUB_API_URL
+from services.github_graphql import GitHubGraphQLBackend
+from services.github_summary import extract_github_username, top_projects, summarize_project, build_candidate_record
+from services.github_watermarks import RepoWatermarkStore, refresh_repo_details
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Candidates enriched at once, and the shared limit on GitHub requests in flight across them
+GITHUB_ENRICH_WORKERS = int(os.getenv("GITHUB_ENRICH_WORKERS", "4"))
+GITHUB_MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", "8"))
+GITHUB_CACHE_PATH = os.getenv("GITHUB_CACHE_PATH", "github_cache.sqlite3")
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "50"))
+# "graphql" fetches a profile in a few queries instead of ~70 REST calls; it needs a token. Unset, it is
+# used against the public API and "rest" against any other API URL, such as a REST-only local mock
+GITHUB_BACKEND = os.getenv("GITHUB_BACKEND")
+# Per-repository watermarks; on refresh, repositories that haven't moved reuse their stored details
+GITHUB_WATERMARK_PATH = os.getenv("GITHUB_WATERMARK_PATH", "github_watermarks.sqlite3")
+GITHUB_REFRESH_MAX_AGE_HOURS = float(os.getenv("GITHUB_REFRESH_MAX_AGE_HOURS", "168"))
+TOP_PROJECTS = 10
+
+_CANDIDATE_NUMBER = re.compile(r'candidate_(\d+)\.json$')
+
+
+def load_candidate_github_urls(candidate_dir: Path) -> List[Tuple[str, Optional[str]]]:
+    """(candidate number, contact_information.github) for every candidate_<n>.json, in number order"""
+    candidates = []
+    for path in candidate_dir.glob("candidate_*.json"):
+        match = _CANDIDATE_NUMBER.search(path.name)
+        if not match:
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read {path.name}: {e}")
+            continue
+        contact = data.get('contact_information') or {}
+        candidates.append((match.group(1), contact.get('github')))
+    return sorted(candidates, key=lambda candidate: int(candidate[0]))
+
+
+def write_record(path: Path, record: Dict[str, Any]):
+    """Write atomically, so an interrupted run never leaves a partial record to be skipped later"""
+    temp_path = path.with_suffix('.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+class GitHubEnrichmentJob:
+    """
+    Headless batch enrichment of candidates with their GitHub profiles.
+
+    Reads ``contact_information.github`` from every ``candidate_<n>.json``,
+    crawls the profile, repositories, followers and the top projects'
+    details, and writes ``github_candidate_<n>.json`` as soon as each
+    candidate is done. Up to ``workers`` candidates are enriched at once over
+    one shared, rate-limit-aware client; candidates sharing a GitHub account
+    are crawled once. Existing records are skipped, so an interrupted run
+    resumes where it stopped; with ``refresh`` they are rebuilt instead, and
+    only the top projects whose ``pushed_at`` or head SHA moved since the
+    last crawl are fetched again. ``overwrite`` refetches everything.
+    """
+
+    def __init__(self, candidate_dir: Path, output_dir: Path, token: Optional[str], workers: int = GITHUB_ENRICH_WORKERS,
+                 api_url: str = GITHUB_API_URL, cache_path: str = GITHUB_CACHE_PATH, overwrite: bool = False,
+                 backend: Optional[str] = GITHUB_BACKEND, refresh: bool = False,
+                 watermark_path: str = GITHUB_WATERMARK_PATH):
+        if backend is None:
+            backend = "graphql" if api_url.rstrip("/") == GITHUB_API_URL else "rest"
+        if backend == "graphql" and not token:
+            logger.warning("The GraphQL API needs a token, using the REST backend")
+            backend = "rest"
+        self.backend = backend
+        self.candidate_dir = candidate_dir
+        self.output_dir = output_dir
+        self.token = token
+        self.workers = workers
+        self.api_url = api_url
+        self.cache_path = cache_path
+        self.overwrite = overwrite
+        self.refresh = refresh
+        self.watermark_path = watermark_path
+        self.max_age = 0 if overwrite else GITHUB_REFRESH_MAX_AGE_HOURS * 3600
+        self.watermarks: Optional[RepoWatermarkStore] = None
+
+        self.enriched_count = 0
+        self.skipped_count = 0
+        self.no_github_count = 0
+        self.not_found_count = 0
+        self.failed_count = 0
+        self._profiles: Dict[str, asyncio.Task] = {}
+
+    def output_path_for(self, number: str) -> Path:
+        return self.output_dir / f"github_candidate_{number}.json"
+
+    async def crawl_profile(self, source, username: str) -> Optional[Dict[str, Any]]:
+        """The candidate_github record for ``username``, or None if the account doesn't exist; raises if it can't be fetched"""
+        user = await source.fetch_user(username)
+        if user is None:
+            return None
+        user_info, repos, followers, following = user
+        login = user_info.get('login', username)
+
+        top_repos = top_projects(repos, TOP_PROJECTS)
+        details = await refresh_repo_details(source, self.watermarks, login, top_repos, self.max_age)
+        summaries = [summarize_project(repo, details[repo['name']]) for repo in top_repos]
+        languages = {name: repo_details['languages'] for name, repo_details in details.items()}
+        return build_candidate_record(user_info, repos, summaries, languages, followers, following)
+
+    def profile(self, source, username: str) -> asyncio.Task:
+        """One crawl per GitHub account, shared by every candidate that links to it"""
+        key = username.lower()
+        if key not in self._profiles:
+            self._profiles[key] = asyncio.ensure_future(self.crawl_profile(source, username))
+        return self._profiles[key]
+
+    async def enrich_candidate(self, source, semaphore: asyncio.Semaphore, number: str, github_url: str):
+        username = extract_github_username(github_url)
+        if not username:
+            logger.warning(f"candidate_{number}: no GitHub username in {github_url!r}")
+            self.no_github_count += 1
+            return
+
+        async with semaphore:
+            started = time.time()
+            try:
+                record = await self.profile(source, username)
+            except Exception as e:
+                logger.error(f"❌ candidate_{number} ({username}): {e}")
+                self.failed_count += 1
+                return
+
+        if record is None:
+            logger.warning(f"candidate_{number}: GitHub user {username} not found")
+            self.not_found_count += 1
+            return
+
+        record = {
+            **record,
+            "metadata": {
+                "source_url": github_url,
+                "generated_at": datetime.now().isoformat()
+            }
+        }
+        write_record(self.output_path_for(number), record)
+        self.enriched_count += 1
+        logger.info(f"✅ candidate_{number}: @{username}, {len(record['repositories'])} projects "
+                    f"in {time.time() - started:.1f}s")
+
+    async def run_async(self):
+        candidates = load_candidate_github_urls(self.candidate_dir)
+        pending = []
+        for number, github_url in candidates:
+            if not github_url:
+                self.no_github_count += 1
+            elif not (self.overwrite or self.refresh) and self.output_path_for(number).exists():
+                self.skipped_count += 1
+            else:
+                pending.append((number, github_url))
+
+        logger.info(f"🚀 {len(candidates)} candidates: {len(pending)} to enrich, {self.skipped_count} already done, "
+                    f"{self.no_github_count} without GitHub")
+        if not pending:
+            return
+
+        cache = GitHubResponseCache(self.cache_path)
+        self.watermarks = RepoWatermarkStore(self.watermark_path)
+        semaphore = asyncio.Semaphore(self.workers)
+        try:
+            async with AsyncGitHubClient(
+                self.token,
+                cache=cache,
+                max_concurrency=GITHUB_MAX_CONCURRENCY,
+                reserve=GITHUB_RATE_LIMIT_RESERVE,
+                base_url=self.api_url
+            ) as client:
+                # Both backends offer fetch_user and fetch_many_repo_details with the same result shapes
+                source = GitHubGraphQLBackend(client) if self.backend == "graphql" else client
+                await asyncio.gather(*[
+                    self.enrich_candidate(source, semaphore, number, github_url) for number, github_url in pending
+                ])
+                logger.info(f"🐙 GitHub API: {client.stats()}")
+                logger.info(f"♻️  Repository watermarks: {self.watermarks.stats()}")
+        finally:
+            cache.close()
+            self.watermarks.close()
+
+    def run(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        start_time = time.time()
+        asyncio.run(self.run_async())
+
+        logger.info("=" * 60)
+        logger.info(f"✅ Enriched: {self.enriched_count}")
+        logger.info(f"⏭️  Skipped (already exists): {self.skipped_count}")
+        logger.info(f"➖ No GitHub URL: {self.no_github_count}")
+        logger.info(f"🔍 GitHub user not found: {self.not_found_count}")
+        logger.info(f"❌ Failed: {self.failed_count}")
+        logger.info(f"⏱️  Total time: {time.time() - start_time:.2f} seconds")
+        logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enrich candidates with their GitHub profiles")
+    parser.add_argument("--candidates", default="candidate_data", help="directory of candidate_<n>.json files")
+    parser.add_argument("--output", default="candidate_github", help="directory for github_candidate_<n>.json records")
+    parser.add_argument("--workers", type=int, default=GITHUB_ENRICH_WORKERS, help="candidates enriched at once")
+    parser.add_argument("--api-url", default=os.getenv("GITHUB_API_URL", GITHUB_API_URL),
+                        help="GitHub REST API base URL, e.g. a local mock")
+    parser.add_argument("--cache", default=GITHUB_CACHE_PATH, help="conditional request cache file")
+    parser.add_argument("--overwrite", action="store_true", help="re-enrich candidates that already have a record")
+    parser.add_argument("--refresh", action="store_true",
+                        help="rebuild existing records, refetching only repositories that changed since the last crawl")
+    parser.add_argument("--watermarks", default=GITHUB_WATERMARK_PATH, help="per-repository watermark store file")
+    parser.add_argument("--backend", choices=["graphql", "rest"], default=GITHUB_BACKEND,
+                        help="GitHub API used for fetching (graphql needs GITHUB_TOKEN); "
+                             "defaults to graphql for the public API and rest for any other --api-url")
+    args = parser.parse_args()
+
+    token = os.environ.get("GITHUB_TOKEN")
+    if not token:
+        logger.warning("GITHUB_TOKEN is not set; unauthenticated requests are limited to 60 per hour")
+
+    GitHubEnrichmentJob(
+        Path(args.candidates),
+        Path(args.output),
+        token,
+        workers=args.workers,
+        api_url=args.api_url,
+        cache_path=args.cache,
+        overwrite=args.overwrite,
+        backend=args.backend,
+        refresh=args.refresh,
+        watermark_path=args.watermarks
+    ).run()
@@ -0,0 +1,100 @@
+# Cypher for extracting candidates with all of their related data.
+#
+# Each relationship type is collected in its own CALL {} subquery, so the server
+# touches every edge once and keeps one row per candidate. A chain of OPTIONAL
+# MATCHes followed by one aggregation instead produces skills x technologies x
+# companies x ... rows per candidate before COLLECT(DISTINCT ...) drops them.
+#
+# The subqueries use OPTIONAL MATCH so the collected values match the chained
+# form, e.g. a candidate without companies still yields [{name: null, role: 'company'}].
+
+_LOCATIONS_SUBQUERY = """
+    CALL {
+        WITH c
+        OPTIONAL MATCH (c)-[:LOCATED_IN]->(l:Location)
+        RETURN COLLECT(DISTINCT l.name) AS locations
+    }
+"""
+
+_DETAIL_SUBQUERIES = """
+    CALL {
+        WITH c
+        OPTIONAL MATCH (c)-[:HAS_SKILL]->(s:Skill)
+        RETURN COLLECT(DISTINCT s.name) AS skills
+    }
+    CALL {
+        WITH c
+        OPTIONAL MATCH (c)-[:HAS_EXPERIENCE_WITH]->(t:Technology)
+        RETURN COLLECT(DISTINCT t.name) AS technologies
+    }
+    CALL {
+        WITH c
+        OPTIONAL MATCH (c)-[:WORKED_AT]->(co:Company)
+        RETURN COLLECT(DISTINCT {name: co.name, role: 'company'}) AS companies
+    }
+    CALL {
+        WITH c
+        OPTIONAL MATCH (c)-[:WORKED_ON]->(p:Project)
+        RETURN COLLECT(DISTINCT {name: p.name, description: p.description, technologies: p.technologies}) AS projects
+    }
+    CALL {
+        WITH c
+        OPTIONAL MATCH (c)-[:PUBLISHED]->(pub:Publication)
+        RETURN COLLECT(DISTINCT {title: pub.title, description: pub.description, keywords: pub.keywords}) AS publications
+    }
+    CALL {
+        WITH c
+        OPTIONAL MATCH (c)-[:ACHIEVED]->(a:Achievement)
+        RETURN COLLECT(DISTINCT {title: a.title, description: a.description}) AS achievements
+    }
+    CALL {
+        WITH c
+        OPTIONAL MATCH (c)-[:COMPLETED]->(course:Course)
+        RETURN COLLECT(DISTINCT course.name) AS courses
+    }
+    CALL {
+        WITH c
+        OPTIONAL MATCH (c)-[edu_rel]->(edu)
+        WHERE (edu:Institution OR edu:University OR edu:College OR edu:School OR edu:Education)
+        RETURN COLLECT(DISTINCT edu.name) AS education
+    }
+"""
+
+_RETURN_FIELDS = """
+    RETURN
+        c.candidate_id AS candidate_id,
+        c.name AS name,
+        c.email AS email,
+        c.phone AS phone,
+        c.linkedin AS linkedin,
+        c.github AS github,
+        c.description AS description,
+        c.summary AS summary,
+        skills,
+        technologies,
+        companies,
+        projects,
+        publications,
+        achievements,
+        courses,
+        locations,
+        education
+"""
+
+# Every candidate with all related data
+ALL_CANDIDATES_QUERY = """
+    MATCH (c:Candidate)
+""" + _LOCATIONS_SUBQUERY + _DETAIL_SUBQUERIES + _RETURN_FIELDS
+
+# Candidates located in $location_filter (case-insensitive substring); like before,
+# ``locations`` only lists the matching locations
+CANDIDATES_BY_LOCATION_QUERY = """
+    MATCH (c:Candidate)-[:LOCATED_IN]->(l:Location)
+    WHERE toLower(l.name) CONTAINS toLower($location_filter)
+    WITH c, COLLECT(DISTINCT l.name) AS locations
+""" + _DETAIL_SUBQUERIES + _RETURN_FIELDS
+
+# A single candidate by $candidate_id
+CANDIDATE_BY_ID_QUERY = """
+    MATCH (c:Candidate {candidate_id: $candidate_id})
+""" + _LOCATIONS_SUBQUERY + _DETAIL_SUBQUERIES + _RETURN_FIELDS
@@ -0,0 +1,200 @@
+import json
+import logging
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterator, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# JSON strings (with escapes) or structural brackets; everything else is skipped by the scanner
+_JSON_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[\[\]{}]', re.DOTALL)
+_JSON_WHITESPACE = b' \t\r\n'
+_INDEX_FORMAT_VERSION = 1
+
+
+class CandidateStore:
+    """
+    Read-only, memory-mapped view of a candidates JSON export (e.g. ``full_candidate.json``).
+
+    Instead of ``json.load``-ing every candidate with its large embedded
+    LinkedIn/GitHub blobs, the file is memory mapped and scanned once for the
+    byte range of each candidate, keyed by OID. Candidates are parsed on
+    demand; ``get_fields`` locates the top-level fields with the same scanner
+    and decodes only the requested ones (never the blobs), keeping them in a
+    small LRU cache, so resident memory does not grow with the file. The offset index
+    is saved next to the file and reused while the file is unchanged.
+
+    Behaves like a read-only ``{oid: candidate}`` dict.
+    """
+
+    def __init__(self, path: str, cache_size: int = 256):
+        self.path = path
+        self.index_path = f"{path}.idx.json"
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, Tuple[str, ...]], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        with open(path, 'rb') as file:
+            # mmap cannot map an empty file
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else None
+
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._listing: List[Dict[str, Any]] = []
+        if not self._load_index():
+            self._build_index()
+            self._save_index()
+
+    def _file_signature(self) -> Dict[str, int]:
+        stat = os.stat(self.path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _load_index(self) -> bool:
+        """Reuse the saved offset index if it was built from the current file"""
+        try:
+            with open(self.index_path, 'r') as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return False
+
+        if saved.get("version") != _INDEX_FORMAT_VERSION or saved.get("file") != self._file_signature():
+            return False
+
+        self._listing = saved["candidates"]
+        self._offsets = {entry["oid"]: (entry["start"], entry["end"]) for entry in self._listing}
+        logger.info(f"Loaded offset index for {len(self._offsets)} candidates from {self.index_path}")
+        return True
+
+    def _save_index(self):
+        temporary_path = f"{self.index_path}.tmp"
+        try:
+            with open(temporary_path, 'w') as file:
+                json.dump({
+                    "version": _INDEX_FORMAT_VERSION,
+                    "file": self._file_signature(),
+                    "candidates": self._listing
+                }, file)
+            os.replace(temporary_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Could not save candidate offset index {self.index_path}: {e}")
+
+    def _element_ranges(self) -> Iterator[Tuple[int, int]]:
+        """Byte ranges of the top-level candidate objects (array elements, or the single top-level object)"""
+        if self._mmap is None:
+            return
+
+        depth = 0
+        top_level = None
+        start = 0
+        for match in _JSON_TOKEN.finditer(self._mmap):
+            token = match.group()
+            if token[0] == 0x22:  # '"'
+                continue
+            if token in (b'{', b'['):
+                if depth == 0:
+                    top_level = token
+                    if token == b'{':
+                        start = match.start()
+                elif depth == 1 and top_level == b'[' and token == b'{':
+                    start = match.start()
+                depth += 1
+            else:
+                depth -= 1
+                if token == b'}' and ((depth == 0 and top_level == b'{') or (depth == 1 and top_level == b'[')):
+                    yield start, match.end()
+
+    def _build_index(self):
+        """Scan the file once, parsing one candidate at a time to record its OID and list fields"""
+        for start, end in self._element_ranges():
+            candidate = json.loads(self._mmap[start:end])
+            oid = candidate['_id']['$oid']
+            self._offsets[oid] = (start, end)
+            self._listing.append({
+                "oid": oid,
+                "start": start,
+                "end": end,
+                "name": candidate.get('candidate_name', 'Unknown'),
+                "location": candidate.get('contact_information', {}).get('location', 'N/A'),
+                "experience_count": len(candidate.get('experience', [])),
+                "project_count": len(candidate.get('projects', []))
+            })
+        logger.info(f"Indexed {len(self._offsets)} candidates in {self.path}")
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, oid: object) -> bool:
+        return oid in self._offsets
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._offsets)
+
+    def __getitem__(self, oid: str) -> Dict[str, Any]:
+        """The full candidate document, parsed from the mapped file"""
+        start, end = self._offsets[oid]
+        return json.loads(self._mmap[start:end])
+
+    def _skip_whitespace(self, position: int, end: int) -> int:
+        while position < end and self._mmap[position] in _JSON_WHITESPACE:
+            position += 1
+        return position
+
+    def _field_spans(self, start: int, end: int) -> Dict[str, Tuple[int, int]]:
+        """Byte range of each top-level field value of the candidate object at ``start``..``end``"""
+        keys: List[Tuple[str, int, int]] = []
+        depth = 0
+        for match in _JSON_TOKEN.finditer(self._mmap, start, end):
+            token = match.group()
+            if token[0] != 0x22:  # '"'
+                depth += 1 if token in (b'{', b'[') else -1
+                continue
+            if depth != 1:
+                continue
+            # A string directly inside the candidate object is a key when a ':' follows it
+            colon = self._skip_whitespace(match.end(), end)
+            if self._mmap[colon:colon + 1] == b':':
+                keys.append((json.loads(token), match.start(), self._skip_whitespace(colon + 1, end)))
+
+        spans = {}
+        for position, (field, _, value_start) in enumerate(keys):
+            # A value runs up to the next key, or to the object's closing brace, minus the separator
+            value_end = keys[position + 1][1] if position + 1 < len(keys) else end - 1
+            while value_end > value_start and self._mmap[value_end - 1] in _JSON_WHITESPACE + b',':
+                value_end -= 1
+            spans[field] = (value_start, value_end)
+        return spans
+
+    def get_fields(self, oid: str, fields: Sequence[str]) -> Dict[str, Any]:
+        """Only ``fields`` of a candidate, cached; raises KeyError for unknown OIDs"""
+        cache_key = (oid, tuple(fields))
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+
+        start, end = self._offsets[oid]
+        spans = self._field_spans(start, end)
+        projected = {
+            field: json.loads(self._mmap[spans[field][0]:spans[field][1]]) for field in fields if field in spans
+        }
+
+        with self._lock:
+            self._cache[cache_key] = projected
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return projected
+
+    def listing(self) -> List[Dict[str, Any]]:
+        """Name, location and experience/project counts of every candidate, without parsing the file"""
+        return [
+            {key: value for key, value in entry.items() if key not in ("start", "end")}
+            for entry in self._listing
+        ]
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
@@ -0,0 +1,246 @@
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from services.search_index import InvertedIndex
+
+logger = logging.getLogger(__name__)
+
+# (candidate, location filter) -> the candidate's document within that location scope
+ScopeDocument = Callable[[Dict[str, Any], str], Dict[str, Any]]
+
+
+def _scoped_entry(index: InvertedIndex, candidate_id: str, location_filter: Optional[str],
+                  scope_document: Optional[ScopeDocument]) -> Tuple[Dict[str, Any], Dict[str, int], int]:
+    """(document, term frequencies, length) of an indexed candidate within a location scope"""
+    candidate = index.documents[candidate_id]
+    if location_filter and scope_document is not None:
+        scoped = scope_document(candidate, location_filter)
+        if scoped is not candidate:
+            tokens = scoped.get('processed_tokens') or []
+            return scoped, dict(Counter(tokens)), len(tokens)
+    return candidate, index.term_frequencies[candidate_id], index.doc_lengths[candidate_id]
+
+
+class CorpusStatistics:
+    """
+    Snapshot of the scoring statistics for one set of candidates at one index version.
+
+    Holds the document frequency table, average document length, per-document
+    term frequency maps and the matching postings, so BM25, TF-IDF and any
+    other scorer share a single pass over the corpus instead of each
+    recomputing it per query. ``apply_changes`` derives the snapshot for a
+    later index version by patching only the candidates that changed.
+
+    Within a location scope, ``scope_document`` may narrow each candidate's
+    document (e.g. to its matching locations); the snapshot's documents,
+    term frequencies and lengths are then those of the narrowed documents.
+    """
+
+    def __init__(self, version: int, candidate_ids: List[str], documents: Dict[str, Dict[str, Any]],
+                 postings: Dict[str, Dict[str, int]], term_frequencies: Dict[str, Dict[str, int]],
+                 doc_lengths: Dict[str, int], document_frequencies: Optional[Dict[str, int]] = None,
+                 total_length: Optional[int] = None):
+        self.version = version
+        self.candidate_ids = candidate_ids
+        self.documents = documents
+        self.postings = postings
+        self.term_frequencies = term_frequencies
+        self.doc_lengths = doc_lengths
+        self.total_docs = len(candidate_ids)
+        if document_frequencies is None:
+            document_frequencies = {term: len(term_postings) for term, term_postings in postings.items()}
+        self.document_frequencies = document_frequencies
+        self.total_length = sum(doc_lengths.values()) if total_length is None else total_length
+        self.avg_doc_length = self.total_length / self.total_docs if self.total_docs else 0
+        self.created_at = time.monotonic()
+
+        # Vectorized scorer over this snapshot, built lazily on first query
+        self.scoring_engine = None
+        # Trigram fuzzy-similarity index over this snapshot, built lazily on first query
+        self.similarity_index = None
+
+    @classmethod
+    def from_index(cls, index: InvertedIndex, candidate_ids: Optional[List[str]] = None,
+                   location_filter: Optional[str] = None,
+                   scope_document: Optional[ScopeDocument] = None) -> "CorpusStatistics":
+        """
+        Take statistics over the whole index, or over ``candidate_ids`` only.
+
+        ``candidate_ids`` are the candidates in ``location_filter``'s scope, if
+        one is given. Must be called while holding ``index.lock`` so the
+        snapshot is consistent.
+        """
+        if candidate_ids is None:
+            # The index updates posting lists in place, so they are copied; term frequency maps are replaced whole
+            return cls(
+                version=index.version,
+                candidate_ids=list(index.documents.keys()),
+                documents=dict(index.documents),
+                postings={term: dict(term_postings) for term, term_postings in index.postings.items()},
+                term_frequencies=dict(index.term_frequencies),
+                doc_lengths=dict(index.doc_lengths)
+            )
+
+        documents = {}
+        postings: Dict[str, Dict[str, int]] = {}
+        term_frequencies = {}
+        doc_lengths = {}
+        for candidate_id in candidate_ids:
+            documents[candidate_id], term_frequencies[candidate_id], doc_lengths[candidate_id] = _scoped_entry(
+                index, candidate_id, location_filter, scope_document
+            )
+            for term, term_freq in term_frequencies[candidate_id].items():
+                postings.setdefault(term, {})[candidate_id] = term_freq
+
+        return cls(
+            version=index.version,
+            candidate_ids=list(candidate_ids),
+            documents=documents,
+            postings=postings,
+            term_frequencies=term_frequencies,
+            doc_lengths=doc_lengths
+        )
+
+    def apply_changes(self, index: InvertedIndex, changed_ids: List[str], location_filter: Optional[str] = None,
+                      scope_document: Optional[ScopeDocument] = None) -> "CorpusStatistics":
+        """
+        Statistics at ``index.version`` from this snapshot and the candidates changed since.
+
+        Only the changed candidates' postings, document frequencies and
+        lengths are touched; the result equals ``from_index`` for the same
+        scope. Must be called while holding ``index.lock``.
+        """
+        documents = dict(self.documents)
+        postings = dict(self.postings)
+        document_frequencies = dict(self.document_frequencies)
+        term_frequencies = dict(self.term_frequencies)
+        doc_lengths = dict(self.doc_lengths)
+        total_length = self.total_length
+
+        for candidate_id in changed_ids:
+            for term in term_frequencies.pop(candidate_id, {}):
+                remaining = {cid: tf for cid, tf in postings[term].items() if cid != candidate_id}
+                if remaining:
+                    postings[term] = remaining
+                    document_frequencies[term] = len(remaining)
+                else:
+                    del postings[term]
+                    del document_frequencies[term]
+            total_length -= doc_lengths.pop(candidate_id, 0)
+            documents.pop(candidate_id, None)
+
+            candidate = index.documents.get(candidate_id)
+            if candidate is None or not index.matches_location(candidate, location_filter):
+                continue
+            documents[candidate_id], term_frequencies[candidate_id], doc_lengths[candidate_id] = _scoped_entry(
+                index, candidate_id, location_filter, scope_document
+            )
+            for term, term_freq in term_frequencies[candidate_id].items():
+                postings[term] = {**postings.get(term, {}), candidate_id: term_freq}
+                document_frequencies[term] = len(postings[term])
+            total_length += doc_lengths[candidate_id]
+
+        # Index order, as from_index would list them
+        candidate_ids = [candidate_id for candidate_id in index.documents if candidate_id in documents]
+        return CorpusStatistics(
+            version=index.version,
+            candidate_ids=candidate_ids,
+            documents=documents,
+            postings=postings,
+            term_frequencies=term_frequencies,
+            doc_lengths=doc_lengths,
+            document_frequencies=document_frequencies,
+            total_length=total_length
+        )
+
+    def document_frequency(self, term: str) -> int:
+        return self.document_frequencies.get(term, 0)
+
+    def get_postings(self, term: str) -> Dict[str, int]:
+        """Return ``{candidate_id: term frequency}`` for a processed term within this scope"""
+        return self.postings.get(term, {})
+
+
+class CorpusStatisticsCache:
+    """
+    Per-scope cache of CorpusStatistics keyed on the location filter.
+
+    Entries are reused until the index version changes, i.e. only when the
+    candidate set changes; least recently used scopes are evicted first.
+    After incremental updates a stale entry is patched with the changed
+    candidates (``apply_changes``) rather than recomputed; only a build, a
+    clear or a change log overflow forces a full pass.
+
+    Each new snapshot still costs a rebuild of its scoring engine and
+    similarity index on the next query, so a stale entry younger than
+    ``refresh_interval`` seconds keeps being served: a burst of writes costs
+    one refresh per interval per scope, and searches may lag writes by up
+    to that long. ``refresh_interval=0`` always serves the latest version.
+    ``scope_document`` is passed on to location-scoped snapshots.
+    """
+
+    def __init__(self, index: InvertedIndex, max_scopes: int = 32, refresh_interval: float = 0.0,
+                 scope_document: Optional[ScopeDocument] = None):
+        self.index = index
+        self.scope_document = scope_document
+        self.max_scopes = max_scopes
+        self.refresh_interval = refresh_interval
+        self._entries: "OrderedDict[Optional[str], CorpusStatistics]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.patched = 0
+
+    def get(self, location_filter: Optional[str] = None) -> CorpusStatistics:
+        """Return statistics for all candidates, or those matching ``location_filter``"""
+        scope_key = location_filter.lower() if location_filter else None
+
+        with self._lock:
+            previous = self._entries.get(scope_key)
+            if previous is not None and previous.version == self.index.version:
+                self._entries.move_to_end(scope_key)
+                self.hits += 1
+                return previous
+            if previous is not None and time.monotonic() - previous.created_at < self.refresh_interval:
+                self._entries.move_to_end(scope_key)
+                self.stale_hits += 1
+                return previous
+
+        with self.index.lock:
+            changed_ids = self.index.changes_since(previous.version) if previous is not None else None
+            if changed_ids is not None and len(changed_ids) <= max(previous.total_docs, 1):
+                stats = previous.apply_changes(self.index, changed_ids, location_filter, self.scope_document)
+            else:
+                changed_ids = None
+                candidate_ids = self.index.candidate_ids(location_filter) if location_filter else None
+                stats = CorpusStatistics.from_index(self.index, candidate_ids, location_filter, self.scope_document)
+
+        with self._lock:
+            if changed_ids is not None:
+                self.patched += 1
+            else:
+                self.misses += 1
+            self._entries[scope_key] = stats
+            self._entries.move_to_end(scope_key)
+            while len(self._entries) > self.max_scopes:
+                self._entries.popitem(last=False)
+
+        if changed_ids is not None:
+            logger.info(f"Patched corpus statistics for scope {scope_key!r} with {len(changed_ids)} changed candidates "
+                        f"at index version {stats.version}")
+        else:
+            logger.info(f"Computed corpus statistics for scope {scope_key!r} at index version {stats.version}")
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"scopes": len(self._entries), "hits": self.hits, "stale_hits": self.stale_hits,
+                    "patched": self.patched, "misses": self.misses, "refresh_interval": self.refresh_interval}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
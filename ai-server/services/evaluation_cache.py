@@ -0,0 +1,107 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EvaluationCache:
+    """
+    Persistent SQLite cache of per-candidate parameter evaluations.
+
+    Entries are content addressed on (candidate OID, hash of the candidate
+    summary sent to the LLM, comparison focus, model, prompt version). When a
+    candidate's data changes its summary hash changes, so the old evaluation
+    is never served again; storing the new one also drops the candidate's
+    stale rows. The file holds at most ``max_entries`` rows, evicting the
+    least recently used.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS evaluations ("
+            "key TEXT PRIMARY KEY, oid TEXT, focus TEXT, model TEXT, prompt_version TEXT, "
+            "value TEXT, created_at REAL, last_used REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS evaluations_oid ON evaluations (oid)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS evaluations_last_used ON evaluations (last_used)")
+        self._db.commit()
+
+    @staticmethod
+    def summary_hash(summary: str) -> str:
+        return hashlib.sha256(summary.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_key(oid: str, summary_hash: str, focus: str, model: str, prompt_version: str) -> str:
+        return hashlib.sha256(
+            '\x00'.join([oid, summary_hash, focus, model, prompt_version]).encode('utf-8')
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached evaluation for ``key``, or None"""
+        with self._lock:
+            try:
+                row = self._db.execute("SELECT value FROM evaluations WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self._db.execute("UPDATE evaluations SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Evaluation cache read failed: {e}")
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, oid: str, focus: str, model: str, prompt_version: str,
+            parameters: List[Dict[str, Any]]):
+        """Store an evaluation, replacing the candidate's outdated ones for the same focus/model/prompt"""
+        now = time.time()
+        with self._lock:
+            try:
+                self._db.execute(
+                    "DELETE FROM evaluations WHERE oid = ? AND focus = ? AND model = ? AND prompt_version = ? AND key != ?",
+                    (oid, focus, model, prompt_version, key)
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO evaluations "
+                    "(key, oid, focus, model, prompt_version, value, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, oid, focus, model, prompt_version, json.dumps(parameters), now, now)
+                )
+                self._db.execute(
+                    "DELETE FROM evaluations WHERE key IN ("
+                    "SELECT key FROM evaluations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Evaluation cache write failed: {e}")
+
+    def invalidate(self, oid: str) -> int:
+        """Drop every cached evaluation of a candidate, returning how many were removed"""
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM evaluations WHERE oid = ?", (oid,))
+            self._db.commit()
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+            return {"entries": entries, "hits": self.hits, "misses": self.misses, "path": self.path}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
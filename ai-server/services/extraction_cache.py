@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionCache:
+    """
+    Content-addressed SQLite cache of resume extraction results.
+
+    Entries are keyed on the SHA-256 of the PDF bytes, so a resume uploaded
+    again under another name is recognised. There are two independent layers:
+
+    - text: extracted text, page metadata and links, per text extractor version
+    - extraction: the LLM's structured JSON, per model and prompt version
+
+    Changing the prompt or model therefore only misses the extraction layer;
+    the text (including any OCR) is reused.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.text_hits = 0
+        self.text_misses = 0
+        self.extraction_hits = 0
+        self.extraction_misses = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS texts ("
+            "sha256 TEXT, extractor_version TEXT, text TEXT, metadata TEXT, links TEXT, created_at REAL, "
+            "PRIMARY KEY (sha256, extractor_version))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            "sha256 TEXT, model TEXT, prompt_version TEXT, value TEXT, created_at REAL, "
+            "PRIMARY KEY (sha256, model, prompt_version))"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def file_sha256(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get_text(self, sha256: str, extractor_version: str) -> Optional[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """Cached (text, metadata, links) for a file's content, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT text, metadata, links FROM texts WHERE sha256 = ? AND extractor_version = ?",
+                (sha256, extractor_version)
+            ).fetchone()
+            if row is None:
+                self.text_misses += 1
+                return None
+            self.text_hits += 1
+        return row[0], json.loads(row[1]), json.loads(row[2])
+
+    def put_text(self, sha256: str, extractor_version: str, text: str, metadata: Dict[str, Any], links: Dict[str, Any]):
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO texts VALUES (?, ?, ?, ?, ?, ?)",
+                    (sha256, extractor_version, text, json.dumps(metadata), json.dumps(links), time.time())
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not cache extracted text for {sha256}: {e}")
+
+    def get_extraction(self, sha256: str, model: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+        """Cached LLM extraction for a file's content, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM extractions WHERE sha256 = ? AND model = ? AND prompt_version = ?",
+                (sha256, model, prompt_version)
+            ).fetchone()
+            if row is None:
+                self.extraction_misses += 1
+                return None
+            self.extraction_hits += 1
+        return json.loads(row[0])
+
+    def put_extraction(self, sha256: str, model: str, prompt_version: str, value: Dict[str, Any]):
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?, ?)",
+                    (sha256, model, prompt_version, json.dumps(value, ensure_ascii=False), time.time())
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not cache extraction for {sha256}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            texts = self._db.execute("SELECT COUNT(*) FROM texts").fetchone()[0]
+            extractions = self._db.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+            return {
+                "texts": texts,
+                "extractions": extractions,
+                "text_hits": self.text_hits,
+                "text_misses": self.text_misses,
+                "extraction_hits": self.extraction_hits,
+                "extraction_misses": self.extraction_misses,
+                "path": self.path
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,387 @@
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = "https://api.github.com"
+TOPICS_ACCEPT = "application/vnd.github.mercy-preview+json"
+
+_LAST_PAGE = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+# 204/409 are empty repositories, 404 a missing resource; any other status without a body is a failure
+EMPTY_STATUSES = (204, 404, 409)
+
+
+def answered(status: int) -> bool:
+    """Whether a ``get_response`` status is an answer (possibly empty) rather than a failed request"""
+    return status == 200 or status in EMPTY_STATUSES
+
+
+class GitHubResponseCache:
+    """
+    Persistent SQLite cache of GitHub API responses for conditional requests.
+
+    Each GET (URL, query and Accept header) keeps the last 200 response body
+    with its ETag, Last-Modified and Link headers. The crawler sends those
+    back as ``If-None-Match`` / ``If-Modified-Since``; a 304 answer is served
+    from here and does not count against the API rate limit.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, link TEXT, body TEXT, fetched_at REAL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]], accept: str) -> str:
+        query = "&".join(f"{key}={params[key]}" for key in sorted(params)) if params else ""
+        return f"{accept} {url}?{query}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached entry (etag, last_modified, link, body) for ``key``, or None"""
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT etag, last_modified, link, body FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"GitHub response cache read failed: {e}")
+                return None
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "link": row[2], "body": json.loads(row[3])}
+
+    def put(self, key: str, etag: Optional[str], last_modified: Optional[str], link: Optional[str], body: Any):
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, etag, last_modified, link, json.dumps(body), time.time())
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"GitHub response cache write failed: {e}")
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"entries": entries, "hits": self.hits, "misses": self.misses, "path": self.path}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class AsyncGitHubClient:
+    """
+    Concurrent GitHub REST client on a pooled keep-alive HTTP client.
+
+    At most ``max_concurrency`` requests are in flight. Every GET is made
+    conditional on the cached ETag, so unchanged resources come back as
+    free 304s. ``X-RateLimit-Remaining`` and ``X-RateLimit-Reset`` are
+    tracked from every response, separately for REST and GraphQL: once
+    fewer than ``reserve`` calls are left, requests without an ETag to
+    revalidate are spread evenly over the time to the reset, and when none
+    are left they wait for it.
+    Secondary rate limits (403/429 with ``Retry-After``) are waited out and
+    retried.
+    """
+
+    def __init__(self, token: Optional[str], cache: Optional[GitHubResponseCache] = None,
+                 max_concurrency: int = 8, reserve: int = 50, max_retries: int = 3, timeout: float = 20.0,
+                 base_url: str = GITHUB_API_URL):
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if token:
+            headers["Authorization"] = f"token {token}"
+        self.cache = cache
+        self.reserve = reserve
+        self.max_retries = max_retries
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pace_lock = asyncio.Lock()
+        self._next_request_at: Dict[str, float] = {}
+
+        # Remaining calls and reset time per rate limit resource ("core" for REST, "graphql", ...)
+        self.rate_limits: Dict[str, Dict[str, float]] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.client.aclose()
+
+    @property
+    def rate_limit_remaining(self) -> Optional[int]:
+        """Remaining REST calls, if a response has reported them"""
+        limit = self.rate_limits.get("core")
+        return int(limit["remaining"]) if limit else None
+
+    def _update_rate_limit(self, headers):
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            self.rate_limits[headers.get("x-ratelimit-resource") or "core"] = {
+                "remaining": int(remaining),
+                "reset": float(reset)
+            }
+        except ValueError:
+            pass
+
+    async def _pace(self, resource: str = "core"):
+        """Wait as needed so the remaining quota lasts until the rate limit resets"""
+        limit = self.rate_limits.get(resource)
+        if limit is None:
+            return
+        async with self._pace_lock:
+            now = time.time()
+            remaining = limit["remaining"]
+            until_reset = limit["reset"] - now
+            if until_reset <= 0:
+                # The window has reset since this was reported; the limit is unknown until the next response
+                if self.rate_limits.get(resource) is limit:
+                    del self.rate_limits[resource]
+                self._next_request_at.pop(resource, None)
+                return
+            if remaining <= 0:
+                delay = until_reset + 1
+            elif remaining < self.reserve:
+                next_request_at = max(self._next_request_at.get(resource, 0.0), now) + until_reset / remaining
+                self._next_request_at[resource] = next_request_at
+                delay = next_request_at - now
+            else:
+                return
+        # Sleep outside the lock so waiters queued behind an exhausted limit all wake at the reset
+        if delay > 0:
+            logger.warning(f"GitHub {resource} rate limit low ({remaining} left), waiting {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, response, attempt: int, resource: str) -> Optional[float]:
+        """Seconds to wait before retrying a rate limited or failed response, or None if it isn't retryable"""
+        retry_after = response.headers.get("retry-after")
+        limit = self.rate_limits.get(resource)
+        rate_limited = response.status_code == 429 or (
+            response.status_code == 403 and (retry_after or (limit is not None and limit["remaining"] == 0))
+        )
+        if not (rate_limited or response.status_code >= 500) or attempt >= self.max_retries:
+            return None
+        return float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+
+    async def get_response(self, path: str, params: Optional[Dict[str, Any]] = None,
+                           accept: Optional[str] = None) -> Tuple[int, Any, Optional[str]]:
+        """(status, JSON body, Link header) for a GET, revalidated against the response cache"""
+        key = GitHubResponseCache.make_key(path, params, accept or "")
+        cached = self.cache.get(key) if self.cache else None
+        headers = {}
+        if accept:
+            headers["Accept"] = accept
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(self.max_retries + 1):
+            # A revalidation that comes back 304 is free, so it is not held back by the pacing
+            if "If-None-Match" not in headers:
+                await self._pace()
+            try:
+                async with self._semaphore:
+                    response = await self.client.get(path, params=params, headers=headers)
+            except httpx.HTTPError as e:
+                if attempt == self.max_retries:
+                    self.errors += 1
+                    logger.error(f"GitHub request {path} failed: {e}")
+                    return 0, None, None
+                await asyncio.sleep(2 ** attempt)
+                continue
+            self.requests += 1
+            self._update_rate_limit(response.headers)
+
+            if response.status_code == 304 and cached:
+                self.not_modified += 1
+                self.cache.record(True)
+                return 200, cached["body"], cached["link"]
+
+            delay = self._retry_delay(response, attempt, "core")
+            if delay is not None:
+                logger.warning(f"GitHub {response.status_code} for {path}, retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code != 200:
+                if response.status_code not in EMPTY_STATUSES:
+                    self.errors += 1
+                    logger.error(f"GitHub API error {response.status_code} for {path}: {response.text[:200]}")
+                return response.status_code, None, None
+
+            body = response.json()
+            link = response.headers.get("link")
+            if self.cache:
+                self.cache.record(False)
+                self.cache.put(key, response.headers.get("etag"), response.headers.get("last-modified"), link, body)
+            return 200, body, link
+
+        return 0, None, None
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None, accept: Optional[str] = None) -> Any:
+        """JSON body of a GET, or None when missing or failed"""
+        _, body, _ = await self.get_response(path, params, accept)
+        return body
+
+    async def get_pages_response(self, path: str, params: Optional[Dict[str, Any]] = None,
+                                 max_pages: int = 10) -> Tuple[List[Any], bool]:
+        """(every item of a paginated list, whether every page was answered); pages after the first are fetched concurrently"""
+        params = dict(params or {})
+        status, first, link = await self.get_response(path, {**params, "page": 1})
+        if not first:
+            return [], answered(status)
+
+        match = _LAST_PAGE.search(link or "")
+        last_page = min(int(match.group(1)), max_pages) if match else 1
+        rest = await asyncio.gather(*[
+            self.get_response(path, {**params, "page": page}) for page in range(2, last_page + 1)
+        ])
+
+        items = list(first)
+        for _, page, _ in rest:
+            items.extend(page or [])
+        return items, all(answered(status) for status, _, _ in rest)
+
+    async def get_pages(self, path: str, params: Optional[Dict[str, Any]] = None, max_pages: int = 10) -> List[Any]:
+        """Every item of a paginated list; pages after the first are fetched concurrently"""
+        items, _ = await self.get_pages_response(path, params, max_pages)
+        return items
+
+    async def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """``data`` of a GraphQL query (possibly partial, e.g. null for a missing user), or None if it failed"""
+        for attempt in range(self.max_retries + 1):
+            await self._pace("graphql")
+            try:
+                async with self._semaphore:
+                    response = await self.client.post("/graphql", json={"query": query, "variables": variables or {}})
+            except httpx.HTTPError as e:
+                if attempt == self.max_retries:
+                    self.errors += 1
+                    logger.error(f"GitHub GraphQL request failed: {e}")
+                    return None
+                await asyncio.sleep(2 ** attempt)
+                continue
+            self.requests += 1
+            self._update_rate_limit(response.headers)
+
+            delay = self._retry_delay(response, attempt, "graphql")
+            if delay is not None:
+                logger.warning(f"GitHub GraphQL {response.status_code}, retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                continue
+            if response.status_code != 200:
+                self.errors += 1
+                logger.error(f"GitHub GraphQL error {response.status_code}: {response.text[:200]}")
+                return None
+
+            body = response.json()
+            errors = [error for error in body.get("errors") or [] if error.get("type") != "NOT_FOUND"]
+            if errors:
+                logger.warning(f"GitHub GraphQL errors: {[error.get('message') for error in errors]}")
+            if body.get("data") is None:
+                self.errors += 1
+                return None
+            return body["data"]
+
+        return None
+
+    async def fetch_user(self, username: str) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """(profile, repositories, followers, following) of a user, or None if the account doesn't exist"""
+        status, user_info, _ = await self.get_response(f"/users/{username}")
+        if status == 404:
+            return None
+        if not user_info:
+            raise RuntimeError(f"GitHub request for user {username} failed ({status or 'no response'})")
+        login = user_info.get("login", username)
+        repos, followers, following = await asyncio.gather(
+            self.get_pages(f"/users/{login}/repos", {"per_page": 100, "sort": "updated"}),
+            self.get(f"/users/{login}/followers"),
+            self.get(f"/users/{login}/following")
+        )
+        return user_info, repos, followers or [], following or []
+
+    async def fetch_repo_details(self, owner: str, repo_name: str, commit_pages: int = 5) -> Dict[str, Any]:
+        """
+        README, contributors, releases, topics, languages, commits and issues of a repository, fetched concurrently.
+
+        If any of them failed (rather than being missing or empty), the result has ``incomplete`` set.
+        """
+        base = f"/repos/{owner}/{repo_name}"
+        (commits, commits_answered), *responses = await asyncio.gather(
+            self.get_pages_response(f"{base}/commits", {"per_page": 30}, max_pages=commit_pages),
+            self.get_response(f"{base}/readme"),
+            self.get_response(f"{base}/contributors"),
+            self.get_response(f"{base}/releases"),
+            self.get_response(f"{base}/topics", accept=TOPICS_ACCEPT),
+            self.get_response(f"{base}/languages"),
+            self.get_response(f"{base}/issues", {"state": "all", "per_page": 100})
+        )
+        readme, contributors, releases, topics, languages, issues = [body for _, body, _ in responses]
+        details = {
+            "readme": readme,
+            "contributors": contributors or [],
+            "releases": releases or [],
+            "topics": (topics or {}).get("names", []),
+            "languages": languages,
+            "commits": commits,
+            "issues": issues or []
+        }
+        if not (commits_answered and all(answered(status) for status, _, _ in responses)):
+            details["incomplete"] = True
+        return details
+
+    async def fetch_many_repo_details(self, owner: str, repo_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """``fetch_repo_details`` for several repositories at once, keyed by repository name"""
+        details = await asyncio.gather(*[self.fetch_repo_details(owner, name) for name in repo_names])
+        return dict(zip(repo_names, details))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "rate_limit_remaining": self.rate_limit_remaining,
+            "rate_limits": {resource: dict(limit) for resource, limit in self.rate_limits.items()},
+            "cache": self.cache.stats() if self.cache else None
+        }
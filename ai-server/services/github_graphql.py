@@ -0,0 +1,229 @@
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from services.github_crawler import AsyncGitHubClient, answered
+
+logger = logging.getLogger(__name__)
+
+# Same caps as the REST backend's pages: 30 contributors and releases, 5 pages of 30 commits, 100 issues
+MAX_CONTRIBUTORS = 30
+MAX_COMMITS = 150
+MAX_ISSUES = 100
+
+USER_QUERY = """
+query($login: String!, $cursor: String) {
+  rateLimit { cost remaining resetAt }
+  user(login: $login) {
+    login name bio location company websiteUrl
+    followers(first: 5) { totalCount nodes { login } }
+    following(first: 5) { totalCount nodes { login } }
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER, privacy: PUBLIC,
+                 orderBy: {field: UPDATED_AT, direction: DESC}) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name description url createdAt updatedAt pushedAt stargazerCount forkCount isFork diskUsage
+        primaryLanguage { name }
+        defaultBranchRef { name target { oid } }
+      }
+    }
+  }
+}
+"""
+
+REPO_DETAILS_FRAGMENT = """
+fragment details on Repository {
+  name
+  readme: object(expression: "HEAD:README.md") { ... on Blob { oid text } }
+  readmeLower: object(expression: "HEAD:readme.md") { ... on Blob { oid text } }
+  readmeRst: object(expression: "HEAD:README.rst") { ... on Blob { oid text } }
+  readmePlain: object(expression: "HEAD:README") { ... on Blob { oid text } }
+  rootTree: object(expression: "HEAD:") { ... on Tree { entries { name type } } }
+  docsTree: object(expression: "HEAD:docs") { ... on Tree { entries { name type } } }
+  githubTree: object(expression: "HEAD:.github") { ... on Tree { entries { name type } } }
+  repositoryTopics(first: 20) { nodes { topic { name } } }
+  languages(first: 20, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }
+  releases(first: 30, orderBy: {field: CREATED_AT, direction: DESC}) { nodes { tagName } }
+  openIssues: issues(states: OPEN) { totalCount }
+  closedIssues: issues(states: CLOSED) { totalCount }
+  openPullRequests: pullRequests(states: OPEN) { totalCount }
+  closedPullRequests: pullRequests(states: [CLOSED, MERGED]) { totalCount }
+  defaultBranchRef {
+    target {
+      ... on Commit {
+        history(first: 100) { totalCount nodes { oid authoredDate author { email user { login } } } }
+      }
+    }
+  }
+}
+"""
+
+
+def _repo_listing(node: Dict[str, Any]) -> Dict[str, Any]:
+    """A GraphQL repository node in the shape of a REST repository listing entry"""
+    return {
+        'name': node['name'],
+        'description': node.get('description'),
+        'html_url': node.get('url'),
+        'created_at': node['createdAt'],
+        'updated_at': node['updatedAt'],
+        'pushed_at': node.get('pushedAt'),
+        'stargazers_count': node.get('stargazerCount', 0),
+        'forks_count': node.get('forkCount', 0),
+        # REST's watchers_count is the star count too
+        'watchers_count': node.get('stargazerCount', 0),
+        'language': (node.get('primaryLanguage') or {}).get('name'),
+        'size': node.get('diskUsage') or 0,
+        'default_branch': (node.get('defaultBranchRef') or {}).get('name', 'main'),
+        # Not in REST listings; lets a refresh skip repositories whose head hasn't moved
+        'default_branch_sha': ((node.get('defaultBranchRef') or {}).get('target') or {}).get('oid'),
+        'fork': node.get('isFork', False)
+    }
+
+
+def _other_readme(node: Optional[Dict[str, Any]]) -> bool:
+    """Whether a README none of the fragment's blob lookups matched (e.g. ``Readme.md``, ``docs/README.md``) exists"""
+    if not node:
+        return False
+    for key in ('rootTree', 'docsTree', 'githubTree'):
+        for entry in (node.get(key) or {}).get('entries') or []:
+            if entry.get('type') == 'blob' and entry.get('name', '').lower().startswith('readme'):
+                return True
+    return False
+
+
+def _repo_details(node: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """A GraphQL repository details node in the shape of ``AsyncGitHubClient.fetch_repo_details``"""
+    if not node:
+        # The query returned nothing for this repository, so its details are unknown rather than empty
+        return {'readme': None, 'contributors': [], 'releases': [], 'topics': [], 'languages': None,
+                'commits': [], 'issues': [], 'commit_count': 0, 'open_issue_count': 0, 'closed_issue_count': 0,
+                'incomplete': True}
+
+    readme = None
+    for key in ('readme', 'readmeLower', 'readmeRst', 'readmePlain'):
+        if node.get(key) and node[key].get('text'):
+            readme = {'sha': node[key].get('oid'), 'text': node[key]['text']}
+            break
+
+    history = (((node.get('defaultBranchRef') or {}).get('target') or {}).get('history')) or {}
+    commits, contributors, seen = [], [], set()
+    for commit in history.get('nodes') or []:
+        commits.append({'sha': commit.get('oid'), 'commit': {'author': {'date': commit['authoredDate']}}})
+        author = commit.get('author') or {}
+        identity = ((author.get('user') or {}).get('login') or author.get('email') or '').lower()
+        if identity and identity not in seen:
+            seen.add(identity)
+            contributors.append({'login': identity})
+
+    # REST's issue list includes pull requests
+    open_issues = min(node['openIssues']['totalCount'] + node['openPullRequests']['totalCount'], MAX_ISSUES)
+    closed_issues = node['closedIssues']['totalCount'] + node['closedPullRequests']['totalCount']
+
+    return {
+        'readme': readme,
+        'contributors': contributors[:MAX_CONTRIBUTORS],
+        'releases': [{'tag_name': release['tagName']} for release in node['releases']['nodes']],
+        'topics': [topic['topic']['name'] for topic in node['repositoryTopics']['nodes']],
+        'languages': {edge['node']['name']: edge['size'] for edge in node['languages']['edges']} or None,
+        'commits': commits,
+        'issues': [],
+        'commit_count': min(history.get('totalCount', 0), MAX_COMMITS),
+        'open_issue_count': open_issues,
+        'closed_issue_count': min(closed_issues, MAX_ISSUES - open_issues)
+    }
+
+
+class GitHubGraphQLBackend:
+    """
+    GitHub fetching through a few GraphQL queries instead of per-endpoint REST calls.
+
+    A user's profile, followers and repositories come from one query per 100
+    repositories; the details of several repositories (README, topics,
+    languages, releases, issue and pull request counts, recent commits) are
+    aliased into one query per ``repos_per_query``; a README that is not
+    one of the common root names is fetched over REST. Results are converted
+    to the REST shapes, so ``summarize_project`` and ``build_candidate_record``
+    work unchanged. Contributors are the distinct authors of the last 100
+    commits, as GraphQL has no contributors list. Requires a token.
+    """
+
+    def __init__(self, client: AsyncGitHubClient, repos_per_query: int = 5, max_repo_pages: int = 10):
+        self.client = client
+        self.repos_per_query = repos_per_query
+        self.max_repo_pages = max_repo_pages
+
+    async def fetch_user(self, username: str) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """(profile, repositories, followers, following) of a user, or None if the account doesn't exist"""
+        data = await self.client.graphql(USER_QUERY, {'login': username, 'cursor': None})
+        if data is None:
+            raise RuntimeError(f"GitHub GraphQL query for user {username} failed")
+        if not data.get('user'):
+            return None
+        user = data['user']
+
+        nodes = list(user['repositories']['nodes'])
+        page_info = user['repositories']['pageInfo']
+        pages = 1
+        while page_info['hasNextPage'] and pages < self.max_repo_pages:
+            data = await self.client.graphql(USER_QUERY, {'login': username, 'cursor': page_info['endCursor']})
+            if not data or not data.get('user'):
+                break
+            nodes.extend(data['user']['repositories']['nodes'])
+            page_info = data['user']['repositories']['pageInfo']
+            pages += 1
+
+        user_info = {
+            'login': user['login'],
+            'name': user.get('name'),
+            'bio': user.get('bio'),
+            'location': user.get('location'),
+            'company': user.get('company'),
+            'blog': user.get('websiteUrl') or '',
+            'followers': user['followers']['totalCount'],
+            'following': user['following']['totalCount'],
+            'public_repos': user['repositories']['totalCount']
+        }
+        return (
+            user_info,
+            [_repo_listing(node) for node in nodes],
+            user['followers']['nodes'],
+            user['following']['nodes']
+        )
+
+    async def _fetch_details_batch(self, owner: str, repo_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        variables = {'owner': owner}
+        fields = []
+        for index, name in enumerate(repo_names):
+            variables[f'name{index}'] = name
+            fields.append(f'r{index}: repository(owner: $owner, name: $name{index}) {{ ...details }}')
+        declarations = ', '.join(['$owner: String!'] + [f'$name{index}: String!' for index in range(len(repo_names))])
+        query = f"query({declarations}) {{\n  rateLimit {{ cost remaining resetAt }}\n  " + "\n  ".join(fields) + "\n}\n" + REPO_DETAILS_FRAGMENT
+
+        data = await self.client.graphql(query, variables)
+        if data is None:
+            logger.warning(f"GraphQL details query failed for {owner}, falling back to REST for {len(repo_names)} repos")
+            return await self.client.fetch_many_repo_details(owner, repo_names)
+        if data.get('rateLimit'):
+            logger.debug(f"GitHub GraphQL details for {len(repo_names)} repos cost {data['rateLimit']['cost']}")
+        details = {name: _repo_details(data.get(f'r{index}')) for index, name in enumerate(repo_names)}
+
+        # READMEs under other names or directories are resolved the way REST does, by its /readme endpoint
+        other_readmes = [name for index, name in enumerate(repo_names)
+                         if details[name]['readme'] is None and _other_readme(data.get(f'r{index}'))]
+        responses = await asyncio.gather(*[self.client.get_response(f"/repos/{owner}/{name}/readme") for name in other_readmes])
+        for name, (status, readme, _) in zip(other_readmes, responses):
+            details[name]['readme'] = readme
+            if not answered(status):
+                details[name]['incomplete'] = True
+        return details
+
+    async def fetch_many_repo_details(self, owner: str, repo_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Details of several repositories keyed by name, in the shape of the REST backend's"""
+        batches = [repo_names[start:start + self.repos_per_query] for start in range(0, len(repo_names), self.repos_per_query)]
+        results = await asyncio.gather(*[self._fetch_details_batch(owner, batch) for batch in batches])
+        details = {}
+        for result in results:
+            details.update(result)
+        return details
@@ -0,0 +1,273 @@
+import base64
+import urllib.parse
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Callable
+
+# First path segments of github.com URLs that are not user or organisation names
+_RESERVED_PATHS = {
+    'about', 'apps', 'collections', 'enterprise', 'events', 'explore', 'features', 'issues', 'login',
+    'marketplace', 'new', 'notifications', 'orgs', 'pricing', 'pulls', 'search', 'settings', 'sponsors',
+    'topics', 'trending', 'users'
+}
+
+
+def extract_github_username(url_or_username: Optional[str]) -> Optional[str]:
+    """Username in a GitHub profile or repository URL (or a bare username), or None"""
+    if not url_or_username:
+        return None
+    value = url_or_username.strip()
+    if value.startswith('@'):
+        value = value[1:]
+    if 'github.com' not in value.lower():
+        return value if value and '/' not in value and ' ' not in value else None
+
+    if not value.lower().startswith(('http://', 'https://')):
+        value = 'https://' + value
+    parts = [part for part in urllib.parse.urlparse(value).path.split('/') if part]
+    if not parts:
+        return None
+    if parts[0].lower() == 'orgs' and len(parts) > 1:
+        return parts[1]
+    if parts[0].lower() in _RESERVED_PATHS:
+        return None
+    return parts[0]
+
+
+def calculate_project_score(repo: Dict[str, Any]) -> int:
+    """Ranking of a repository by stars, forks, watchers and whether it was updated within the last year"""
+    stars = repo['stargazers_count']
+    forks = repo['forks_count']
+    watchers = repo['watchers_count']
+    # Recent activity bonus (updated within last year)
+    updated = datetime.strptime(repo['updated_at'], '%Y-%m-%dT%H:%M:%SZ')
+    recent_bonus = 10 if updated > datetime.now() - timedelta(days=365) else 0
+
+    return (stars * 3) + (forks * 2) + watchers + recent_bonus
+
+
+def top_projects(repos: List[Dict[str, Any]], limit: int = 10) -> List[Dict[str, Any]]:
+    return sorted(repos, key=calculate_project_score, reverse=True)[:limit]
+
+
+def language_percentages(languages: Optional[Dict[str, int]]) -> Dict[str, float]:
+    """Share of each language in a repository's bytes, largest first"""
+    if not languages:
+        return {}
+    total_bytes = sum(languages.values())
+    if total_bytes <= 0:
+        return {}
+    percentages = sorted(((lang, bytes_count / total_bytes * 100) for lang, bytes_count in languages.items()),
+                         key=lambda item: item[1], reverse=True)
+    return {lang: round(percentage, 1) for lang, percentage in percentages}
+
+
+def readme_excerpt(readme: Optional[Dict[str, Any]]) -> str:
+    """First meaningful paragraph of a README (skipping the title and empty lines), up to 200 characters"""
+    if not readme or not (readme.get('text') or readme.get('content')):
+        return ""
+    try:
+        decoded_content = readme.get('text') or base64.b64decode(readme['content']).decode('utf-8')
+        lines = decoded_content.split('\n')
+        for line in lines:
+            clean_line = line.strip()
+            if clean_line and not clean_line.startswith('#') and len(clean_line) > 50:
+                return clean_line[:200] + "..." if len(clean_line) > 200 else clean_line
+    except Exception:
+        return "Unable to parse README"
+    return ""
+
+
+def needs_ai_analysis(details: Dict[str, Any]) -> bool:
+    """Whether ``summarize_project`` asks for an AI summary, i.e. the README has no usable excerpt"""
+    return len(readme_excerpt(details.get('readme'))) < 50
+
+
+def summarize_project(repo: Dict[str, Any], details: Dict[str, Any],
+                      analyze: Optional[Callable[[], str]] = None) -> Dict[str, Any]:
+    """
+    Summary of one repository from its listing entry and crawled endpoints.
+
+    ``details`` holds the readme, contributors, releases, topics, languages,
+    commits and issues of the repository; a backend that reports totals
+    instead of full lists adds ``commit_count``, ``open_issue_count`` and
+    ``closed_issue_count``. ``analyze`` is called for an AI summary when the
+    README has no usable excerpt.
+    """
+    repo_name = repo['name']
+    readme = details.get('readme')
+    contributors = details.get('contributors')
+    releases = details.get('releases')
+    topics = details.get('topics')
+    languages = details.get('languages')
+    commits = details.get('commits')
+    issues = details.get('issues')
+
+    # Calculate project metrics
+    total_contributors = len(contributors) if contributors else 0
+    total_releases = len(releases) if releases else 0
+    open_issues = len([i for i in issues if i.get('state') == 'open']) if issues else 0
+    closed_issues = len([i for i in issues if i.get('state') == 'closed']) if issues else 0
+    open_issues = details.get('open_issue_count', open_issues)
+    closed_issues = details.get('closed_issue_count', closed_issues)
+
+    # Get primary language and top 3 languages by share
+    primary_language = repo.get('language', 'Not specified')
+    language_info = ", ".join(f"{lang} ({perc:.1f}%)" for lang, perc in list(language_percentages(languages).items())[:3])
+
+    # Get recent activity
+    recent_commits = details.get('commit_count', len(commits) if commits else 0)
+    last_commit = None
+    if commits:
+        last_commit = commits[0]['commit']['author']['date'][:10]
+
+    # Get latest release info
+    latest_release = None
+    if releases:
+        latest_release = releases[0]['tag_name']
+
+    # README excerpt
+    excerpt = readme_excerpt(readme)
+    ai_analysis = ""
+
+    # If no README or poor README, use AI analysis
+    if not excerpt or len(excerpt) < 50:
+        if analyze is not None:
+            ai_analysis = analyze()
+            if ai_analysis and "AI Analysis failed" not in ai_analysis:
+                excerpt = "AI-Generated Summary Available"
+
+    # Calculate project health score
+    health_score = 0
+    if repo['stargazers_count'] > 0: health_score += 10
+    if repo['forks_count'] > 0: health_score += 10
+    if total_contributors > 1: health_score += 15
+    if recent_commits > 0: health_score += 20
+    if repo.get('description'): health_score += 10
+    if readme or ai_analysis: health_score += 15
+    if latest_release: health_score += 10
+    if topics: health_score += 10
+
+    # Project category based on topics and language
+    category = "General"
+    if topics:
+        web_topics = ['web', 'frontend', 'backend', 'react', 'vue', 'angular', 'html', 'css']
+        mobile_topics = ['mobile', 'android', 'ios', 'react-native', 'flutter']
+        data_topics = ['data-science', 'machine-learning', 'ai', 'analytics', 'python']
+        dev_topics = ['cli', 'tool', 'devops', 'automation', 'library']
+
+        if any(topic in web_topics for topic in topics):
+            category = "Web Development"
+        elif any(topic in mobile_topics for topic in topics):
+            category = "Mobile Development"
+        elif any(topic in data_topics for topic in topics):
+            category = "Data Science/AI"
+        elif any(topic in dev_topics for topic in topics):
+            category = "Developer Tools"
+
+    return {
+        'name': repo_name,
+        'description': repo.get('description', 'No description available'),
+        'primary_language': primary_language,
+        'language_breakdown': language_info,
+        'stars': repo['stargazers_count'],
+        'forks': repo['forks_count'],
+        'watchers': repo['watchers_count'],
+        'contributors': total_contributors,
+        'releases': total_releases,
+        'latest_release': latest_release,
+        'open_issues': open_issues,
+        'closed_issues': closed_issues,
+        'recent_commits': recent_commits,
+        'last_commit': last_commit,
+        'topics': topics,
+        'category': category,
+        'readme_excerpt': excerpt,
+        'ai_analysis': ai_analysis,
+        'health_score': health_score,
+        'created_at': repo['created_at'][:10],
+        'updated_at': repo['updated_at'][:10],
+        'size_kb': repo.get('size', 0),
+        'default_branch': repo.get('default_branch', 'main'),
+        'is_fork': repo.get('fork', False),
+        'html_url': repo['html_url']
+    }
+
+
+def build_candidate_record(user_info: Dict[str, Any], repos: List[Dict[str, Any]], summaries: List[Dict[str, Any]],
+                           languages: Dict[str, Optional[Dict[str, int]]], followers: List[Dict[str, Any]],
+                           following: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    A ``candidate_github`` record in the layout the candidate loader reads.
+
+    ``summaries`` are the top projects' ``summarize_project`` results in rank
+    order and ``languages`` their raw byte counts by repository name.
+    """
+    top_by_stars = sorted(repos, key=lambda repo: repo['stargazers_count'], reverse=True)[:10]
+    return {
+        "user_profile": {
+            "name": user_info.get('name') or user_info.get('login'),
+            "username": f"@{user_info.get('login')}",
+            "bio": user_info.get('bio'),
+            "location": user_info.get('location'),
+            "company": user_info.get('company'),
+            "blog": user_info.get('blog'),
+            "followers": user_info.get('followers', 0),
+            "following": user_info.get('following', 0),
+            "public_repos": user_info.get('public_repos', 0),
+            "top_followers": [user['login'] for user in followers[:5]],
+            "following_users": [user['login'] for user in following[:5]]
+        },
+        "repositories_analysis": {
+            "total_repositories": len(repos),
+            "total_stars": sum(repo['stargazers_count'] for repo in repos),
+            "total_forks": sum(repo['forks_count'] for repo in repos),
+            "total_watchers": sum(repo['watchers_count'] for repo in repos)
+        },
+        "top_repositories_by_stars": [
+            {
+                "name": repo['name'],
+                "stars": repo['stargazers_count'],
+                "forks": repo['forks_count'],
+                "language": repo.get('language') or 'Unknown',
+                "updated": repo['updated_at'][:10],
+                "description": repo.get('description') or 'No description'
+            }
+            for repo in top_by_stars if repo['stargazers_count'] > 0
+        ],
+        "top_10_projects_summary": {
+            "total_stars_top_10": sum(summary['stars'] for summary in summaries),
+            "total_forks_top_10": sum(summary['forks'] for summary in summaries),
+            "total_contributors": sum(summary['contributors'] for summary in summaries),
+            "average_health_score": round(sum(summary['health_score'] for summary in summaries) / len(summaries), 1) if summaries else 0
+        },
+        "repositories": [
+            {
+                "rank": rank,
+                "name": summary['name'],
+                "stars": summary['stars'],
+                "health_score": summary['health_score'],
+                "category": summary['category'],
+                "primary_language": summary['primary_language'],
+                "created": summary['created_at'],
+                "last_updated": summary['updated_at'],
+                "forks": summary['forks'],
+                "watchers": summary['watchers'],
+                "contributors": summary['contributors'],
+                "open_issues": summary['open_issues'],
+                "closed_issues": summary['closed_issues'],
+                "releases": summary['releases'],
+                "latest_release": summary['latest_release'],
+                "description": summary['description'],
+                "readme_excerpt": summary['readme_excerpt'],
+                "topics": summary['topics'],
+                "language_breakdown": language_percentages(languages.get(summary['name'])),
+                "recent_commits": summary['recent_commits'],
+                "last_commit": summary['last_commit'],
+                "repository_size_kb": summary['size_kb'],
+                "default_branch": summary['default_branch'],
+                "type": "Fork" if summary['is_fork'] else "Original Repository",
+                "html_url": summary['html_url']
+            }
+            for rank, summary in enumerate(summaries, 1)
+        ]
+    }
@@ -0,0 +1,139 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def repo_watermark(repo: Dict[str, Any], details: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """pushed_at, default branch head SHA and README SHA of a repository from its listing entry and details"""
+    commits = details.get('commits') or []
+    readme = details.get('readme') or {}
+    return {
+        'pushed_at': repo.get('pushed_at'),
+        'head_sha': repo.get('default_branch_sha') or (commits[0].get('sha') if commits else None),
+        'readme_sha': readme.get('sha')
+    }
+
+
+def watermark_moved(stored: Dict[str, Any], repo: Dict[str, Any]) -> bool:
+    """Whether a fresh listing entry shows changes since ``stored`` was crawled"""
+    if not repo.get('pushed_at') or repo['pushed_at'] != stored.get('pushed_at'):
+        return True
+    # Only the GraphQL listing carries the head SHA; REST relies on pushed_at alone
+    head_sha = repo.get('default_branch_sha')
+    return bool(head_sha and head_sha != stored.get('head_sha'))
+
+
+class RepoWatermarkStore:
+    """
+    Persistent SQLite store of each crawled repository's watermarks and details.
+
+    A repository is keyed by ``owner/name`` and keeps the ``pushed_at``,
+    default branch head SHA and README SHA it had when its details (README,
+    contributors, releases, topics, languages, commits, issues) were
+    fetched, together with those details. On refresh, repositories whose
+    watermark has not moved reuse the stored details.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.unchanged = 0
+        self.refetched = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS repos ("
+            "key TEXT PRIMARY KEY, pushed_at TEXT, head_sha TEXT, readme_sha TEXT, details TEXT, "
+            "refreshed_at REAL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(owner: str, repo_name: str) -> str:
+        return f"{owner}/{repo_name}".lower()
+
+    def get(self, owner: str, repo_name: str) -> Optional[Dict[str, Any]]:
+        """Stored watermark, details and refreshed_at of a repository, or None"""
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT pushed_at, head_sha, readme_sha, details, refreshed_at FROM repos WHERE key = ?",
+                    (self.make_key(owner, repo_name),)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Repository watermark read failed: {e}")
+                return None
+        if row is None:
+            return None
+        return {
+            "pushed_at": row[0],
+            "head_sha": row[1],
+            "readme_sha": row[2],
+            "details": json.loads(row[3]),
+            "refreshed_at": row[4]
+        }
+
+    def put(self, owner: str, repo_name: str, watermark: Dict[str, Optional[str]], details: Dict[str, Any]):
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO repos (key, pushed_at, head_sha, readme_sha, details, refreshed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.make_key(owner, repo_name), watermark.get('pushed_at'), watermark.get('head_sha'),
+                     watermark.get('readme_sha'), json.dumps(details), time.time())
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Repository watermark write failed: {e}")
+
+    def record(self, unchanged: int, refetched: int):
+        with self._lock:
+            self.unchanged += unchanged
+            self.refetched += refetched
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM repos").fetchone()[0]
+            return {"entries": entries, "unchanged": self.unchanged, "refetched": self.refetched, "path": self.path}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+async def refresh_repo_details(source, store: RepoWatermarkStore, owner: str, repos: List[Dict[str, Any]],
+                               max_age: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Details of ``repos`` keyed by name, refetching only those whose watermark moved.
+
+    ``source`` is either backend's ``fetch_many_repo_details``. Stored
+    details older than ``max_age`` seconds are refetched anyway, as issue
+    counts, releases and topics change without a push. Details flagged
+    ``incomplete`` (a request failed) are returned but not stored, so the
+    next refresh fetches them again.
+    """
+    details, stale = {}, []
+    now = time.time()
+    for repo in repos:
+        stored = store.get(owner, repo['name'])
+        if stored and now - stored['refreshed_at'] < max_age and not watermark_moved(stored, repo):
+            details[repo['name']] = stored['details']
+        else:
+            stale.append(repo)
+
+    if stale:
+        fetched = await source.fetch_many_repo_details(owner, [repo['name'] for repo in stale])
+        for repo in stale:
+            repo_details = fetched[repo['name']]
+            if not repo_details.get('incomplete'):
+                store.put(owner, repo['name'], repo_watermark(repo, repo_details), repo_details)
+            details[repo['name']] = repo_details
+
+    store.record(len(repos) - len(stale), len(stale))
+    if repos:
+        logger.debug(f"{owner}: {len(repos) - len(stale)} repos unchanged, {len(stale)} refetched")
+    return details
@@ -0,0 +1,62 @@
+import logging
+import os
+import threading
+from typing import Iterable, Set
+
+logger = logging.getLogger(__name__)
+
+
+class IngestCheckpoint:
+    """
+    Append-only record of the items a batch job has finished, so a re-run can resume.
+
+    Each completed key is one line in the file. Lines are flushed and fsynced
+    as soon as a unit of work commits; a line cut short by a crash is dropped
+    on the next load, so that item is simply processed again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done: Set[str] = set()
+
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                content = file.read()
+            complete = content[:content.rfind(b'\n') + 1]
+            if len(complete) != len(content):
+                # Drop the partial last line before appending to the file
+                with open(path, 'r+b') as file:
+                    file.truncate(len(complete))
+            self._done = {line for line in complete.decode('utf-8').splitlines() if line}
+            logger.info(f"Resuming from checkpoint {path}: {len(self._done)} items already done")
+
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._done
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def mark_done(self, keys: Iterable[str]):
+        """Durably record ``keys`` as completed"""
+        with self._lock:
+            new_keys = [key for key in keys if key not in self._done]
+            if not new_keys:
+                return
+            self._file.write(''.join(f"{key}\n" for key in new_keys))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._done.update(new_keys)
+
+    def reset(self):
+        """Forget all completed items"""
+        with self._lock:
+            self._file.seek(0)
+            self._file.truncate()
+            self._done.clear()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
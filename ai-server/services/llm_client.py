@@ -0,0 +1,182 @@
+import logging
+import random
+import re
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from groq import APIConnectionError, APIStatusError
+
+from services.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in a rate limit header value such as ``"7.66s"``, ``"2m59.56s"``, ``"250ms"`` or ``"12"``"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    units = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+class RateLimitedLLMClient:
+    """
+    Groq chat completions behind one shared request and token budget, with retries.
+
+    Every call first waits for a request and for its estimated tokens (prompt
+    characters / 4 plus ``max_tokens``) from two token buckets sized to the
+    per-minute limits; the estimate is corrected with the reported usage
+    afterwards. The ``x-ratelimit-*`` response headers keep the buckets in
+    line with the server: the token limit sets the refill rate, the remaining
+    tokens cap the local balance, and an exhausted request quota or a
+    ``retry-after`` holds back every caller until the reset. Rate limits,
+    timeouts, connection errors and 5xx responses are retried with jittered
+    exponential backoff; the SDK's own retries are turned off so this class
+    owns the schedule.
+    """
+
+    def __init__(self, client, requests_per_minute: float = 30, tokens_per_minute: float = 6000,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.client = client.with_options(max_retries=0)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.request_bucket = TokenBucket(requests_per_minute / 60, capacity=requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, capacity=tokens_per_minute)
+
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+        self.throttle_wait_seconds = 0.0
+        self.max_throttle_wait_seconds = 0.0
+        self.rate_limit_headers: Dict[str, str] = {}
+
+    @staticmethod
+    def estimate_tokens(kwargs: Dict[str, Any]) -> int:
+        prompt_chars = sum(len(str(message.get('content') or '')) for message in kwargs.get('messages', []))
+        return prompt_chars // 4 + int(kwargs.get('max_tokens') or 1024)
+
+    def _wait_for_budget(self, estimated_tokens: int):
+        with self._lock:
+            self.queue_depth += 1
+        waited = 0.0
+        try:
+            waited = self.request_bucket.acquire(1)
+            waited += self.token_bucket.acquire(estimated_tokens)
+        finally:
+            with self._lock:
+                self.queue_depth -= 1
+                self.throttle_wait_seconds += waited
+                self.max_throttle_wait_seconds = max(self.max_throttle_wait_seconds, waited)
+
+    def _apply_headers(self, headers):
+        """Align the local buckets with the server's view of the rate limits"""
+        if headers is None:
+            return
+        limit_headers = {key.lower(): value for key, value in headers.items() if key.lower().startswith('x-ratelimit-')}
+        if limit_headers:
+            with self._lock:
+                self.rate_limit_headers = limit_headers
+
+        try:
+            token_limit = limit_headers.get('x-ratelimit-limit-tokens')
+            if token_limit and float(token_limit) > 0:
+                self.token_bucket.set_rate(float(token_limit) / 60, capacity=float(token_limit))
+            remaining_tokens = limit_headers.get('x-ratelimit-remaining-tokens')
+            if remaining_tokens is not None:
+                self.token_bucket.limit_available(float(remaining_tokens))
+            remaining_requests = limit_headers.get('x-ratelimit-remaining-requests')
+            if remaining_requests is not None and float(remaining_requests) <= 0:
+                reset = parse_duration(limit_headers.get('x-ratelimit-reset-requests'))
+                if reset:
+                    logger.warning(f"LLM request quota exhausted, pausing for {reset:.1f}s")
+                    self.request_bucket.pause(reset)
+        except ValueError:
+            logger.debug(f"Unparseable rate limit headers: {limit_headers}")
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def create(self, **kwargs):
+        """``chat.completions.create`` with rate limiting and retries; raises once retries are exhausted"""
+        estimated_tokens = self.estimate_tokens(kwargs)
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_budget(estimated_tokens)
+            with self._lock:
+                self.in_flight += 1
+                self.requests += 1
+            try:
+                raw = self.client.chat.completions.with_raw_response.create(**kwargs)
+                self._apply_headers(raw.headers)
+                completion = raw.parse()
+                usage = getattr(completion, 'usage', None)
+                if usage is not None and getattr(usage, 'total_tokens', None):
+                    self.token_bucket.consume(usage.total_tokens - estimated_tokens)
+                return completion
+            except (APIStatusError, APIConnectionError) as e:
+                status_code = getattr(e, 'status_code', None)
+                retryable = isinstance(e, APIConnectionError) or status_code in RETRYABLE_STATUS_CODES
+                response = getattr(e, 'response', None)
+                headers = response.headers if response is not None else None
+                self._apply_headers(headers)
+
+                retry_after = parse_duration(headers.get('retry-after')) if headers is not None else None
+                if status_code == 429:
+                    with self._lock:
+                        self.rate_limited += 1
+                    # Everyone sharing this client is over the limit, not just this caller
+                    self.request_bucket.pause(retry_after if retry_after is not None else self.base_delay)
+
+                if not retryable or attempt == self.max_retries:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+
+                delay = self._retry_delay(attempt, retry_after)
+                with self._lock:
+                    self.retries += 1
+                logger.warning(f"LLM call failed ({status_code or type(e).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "failures": self.failures,
+                "throttle_wait_seconds": round(self.throttle_wait_seconds, 3),
+                "max_throttle_wait_seconds": round(self.max_throttle_wait_seconds, 3),
+                "requests_per_minute": round(self.request_bucket.rate * 60, 1),
+                "tokens_per_minute": round(self.token_bucket.rate * 60, 1),
+                "tokens_available": round(self.token_bucket.available(), 1),
+                "rate_limit_headers": dict(self.rate_limit_headers)
+            }
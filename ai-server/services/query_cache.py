@@ -0,0 +1,154 @@
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_LIST_SEPARATOR = re.compile(r'\s*[,;]\s*')
+# Trailing sentence punctuation and quotes around the whole query carry no meaning for parsing;
+# a leading "." does (".NET developer")
+_TRAILING_PUNCTUATION = '.!?'
+_QUOTES = '"\'`'
+# Part of every key; bump when normalize_query changes so persisted keys of the old form are not reused
+_KEY_FORMAT = "2"
+
+
+def _strip_edges(text: str) -> str:
+    """Drop trailing sentence punctuation and matching quotes around ``text``, repeatedly"""
+    while True:
+        stripped = text.rstrip(_TRAILING_PUNCTUATION).strip()
+        if len(stripped) >= 2 and stripped[0] == stripped[-1] and stripped[0] in _QUOTES:
+            stripped = stripped[1:-1].strip()
+        if stripped == text:
+            return text
+        text = stripped
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a search query for cache lookups.
+
+    Case, Unicode width variants, matching quotes around the query, trailing
+    sentence punctuation and runs of whitespace are normalized; a leading "."
+    is kept, so ".NET developer" stays distinct from "NET developer". Comma
+    and semicolon separators are written as ", ", but the order of words and
+    items is kept: the first location of a parse is used as a filter, so
+    "pune, mumbai" and "mumbai, pune" must not share one.
+    """
+    text = unicodedata.normalize('NFKC', query).casefold()
+    text = _strip_edges(_WHITESPACE.sub(' ', text).strip())
+    return ', '.join(item for item in _LIST_SEPARATOR.split(text) if item)
+
+
+class QueryParseCache:
+    """
+    LRU + TTL cache of LLM query parses keyed on the normalized query.
+
+    The key also includes the model and prompt version, so changing either
+    never serves a parse produced by the other. Entries expire ``ttl_seconds``
+    after they were stored. When ``persist_path`` is set, parses are also
+    written to a SQLite file and memory misses fall back to it, so the cache
+    survives restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0, persist_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if persist_path:
+            try:
+                self._db = sqlite3.connect(persist_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS query_parses (key TEXT PRIMARY KEY, stored_at REAL, value TEXT)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Query cache persistence disabled, could not open {persist_path}: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(query: str, model: str, prompt_version: str) -> str:
+        return f"{model}\x00{prompt_version}\x00{_KEY_FORMAT}\x00{normalize_query(query)}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached parse for ``key``, or None if missing or expired"""
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if now - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT stored_at, value FROM query_parses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[0] < self.ttl_seconds:
+                    value = json.loads(row[1])
+                    self._store(key, row[0], value)
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store a parse in memory and, if enabled, on disk"""
+        stored_at = time.time()
+
+        with self._lock:
+            self._store(key, stored_at, value)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO query_parses (key, stored_at, value) VALUES (?, ?, ?)",
+                        (key, stored_at, json.dumps(value))
+                    )
+                    self._db.execute("DELETE FROM query_parses WHERE stored_at < ?", (stored_at - self.ttl_seconds,))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not persist query parse: {e}")
+
+    def _store(self, key: str, stored_at: float, value: Dict[str, Any]):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM query_parses")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "persistent": self._db is not None
+            }
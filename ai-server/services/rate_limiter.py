@@ -0,0 +1,71 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    The bucket holds up to ``capacity`` tokens and refills continuously at
+    ``rate`` tokens per second. ``acquire`` blocks until enough tokens are
+    available, so callers sharing a bucket together stay under the rate while
+    short bursts up to ``capacity`` go through immediately. The balance may go
+    negative when a caller reports using more than it acquired.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens``, waiting for them if needed; returns the seconds spent waiting"""
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = max(self._paused_until - now, (tokens - self._tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def consume(self, tokens: float):
+        """Take ``tokens`` without waiting (negative to give tokens back)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - tokens)
+
+    def limit_available(self, tokens: float):
+        """Lower the balance to at most ``tokens``, e.g. to match what the server reports as remaining"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, tokens)
+
+    def set_rate(self, rate: float, capacity: float = None):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            if capacity is not None:
+                self.capacity = capacity
+                self._tokens = min(self._tokens, capacity)
+
+    def pause(self, seconds: float):
+        """Hold back every caller for ``seconds``"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
@@ -0,0 +1,253 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from services.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Bump when the prompt changes so cached analyses are regenerated
+ANALYSIS_PROMPT_VERSION = "1"
+
+KEY_FILES = ['package.json', 'requirements.txt', 'pom.xml', 'build.gradle', 'Cargo.toml', 'go.mod']
+
+ANALYSIS_INSTRUCTIONS = """
+            Please provide:
+            1. **Project Purpose**: What this project does (2-3 sentences)
+            2. **Technology Stack**: Technologies, frameworks, and tools used
+            3. **Project Category**: Type of project (web app, library, tool, etc.)
+            4. **Key Features**: Main functionality and capabilities
+            5. **Development Status**: Assessment of project maturity and activity
+            6. **Use Cases**: Who would use this and why
+
+            Keep the response concise but informative, suitable for a developer portfolio summary.
+"""
+
+
+def repository_context(repo: Dict[str, Any], topics: List[str], file_structure: List[str],
+                       file_contents: Dict[str, str]) -> str:
+    """The description of one repository that analysis prompts are built from"""
+    return f"""
+            **Repository Details:**
+            - Name: {repo.get('name', '')}
+            - Description: {repo.get('description') or 'No description'}
+            - Primary Language: {repo.get('language') or 'Not specified'}
+            - Topics: {', '.join(topics) if topics else 'None'}
+            - Size: {repo.get('size', 0)} KB
+            - Stars: {repo.get('stargazers_count', 0)}, Forks: {repo.get('forks_count', 0)}
+
+            **File Structure (sample):**
+            {chr(10).join(file_structure[:15])}
+
+            **Key Configuration Files:**
+            {json.dumps(file_contents, indent=2) if file_contents else 'None found'}
+"""
+
+
+def single_prompt(context: str) -> str:
+    return f"""
+            Analyze this GitHub repository and provide a comprehensive summary:
+            {context}{ANALYSIS_INSTRUCTIONS}"""
+
+
+def batch_prompt(contexts: Dict[str, str]) -> str:
+    sections = "".join(f"\n            ### Repository `{full_name}`{context}" for full_name, context in contexts.items())
+    return f"""
+            Analyze each of these GitHub repositories and provide a comprehensive summary of each:
+            {sections}
+            For every repository, in its markdown summary:{ANALYSIS_INSTRUCTIONS}
+            Respond with a JSON object mapping each repository name exactly as given above
+            (e.g. "{next(iter(contexts))}") to its markdown summary string.
+"""
+
+
+class RepoAnalysisCache:
+    """
+    Persistent SQLite cache of AI repository analyses.
+
+    Entries are keyed on the repository's full name, its default branch head
+    SHA and the prompt version: every viewer and refresh of an unchanged
+    repository reuses the analysis, while a new commit or prompt misses.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "full_name TEXT, head_sha TEXT, prompt_version TEXT, analysis TEXT, created_at REAL, "
+            "PRIMARY KEY (full_name, head_sha, prompt_version))"
+        )
+        self._db.commit()
+
+    def get(self, full_name: str, head_sha: str, prompt_version: str) -> Optional[str]:
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT analysis FROM analyses WHERE full_name = ? AND head_sha = ? AND prompt_version = ?",
+                    (full_name.lower(), head_sha, prompt_version)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Repository analysis cache read failed: {e}")
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def put(self, full_name: str, head_sha: str, prompt_version: str, analysis: str):
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?)",
+                    (full_name.lower(), head_sha, prompt_version, analysis, time.time())
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Repository analysis cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            return {"entries": entries, "hits": self.hits, "misses": self.misses, "path": self.path}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class GeminiRepoAnalyzer:
+    """
+    Gemini analyses of repositories: cached, batched and rate limited.
+
+    ``analyze_many`` serves unchanged repositories from the cache. It
+    gathers the prompt context of the others concurrently and asks for
+    ``batch_size`` of them per call as a JSON object of per-repository
+    summaries; a repository missing from a batch answer is analysed on
+    its own. Calls wait for the shared ``requests_per_minute`` budget and
+    at most ``max_concurrency`` are in flight, also across threads sharing
+    the analyzer. Failed analyses are returned as ``"AI Analysis failed:
+    ..."`` and not cached.
+    """
+
+    def __init__(self, model, cache: Optional[RepoAnalysisCache] = None, requests_per_minute: float = 15,
+                 max_concurrency: int = 4, batch_size: int = 5):
+        self.model = model
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max_concurrency
+        self.request_bucket = TokenBucket(requests_per_minute / 60, capacity=max(1.0, min(requests_per_minute, max_concurrency)))
+        self._semaphore = threading.Semaphore(max_concurrency)
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batched_repos = 0
+        self.failures = 0
+        self.throttle_wait_seconds = 0.0
+
+    def _generate(self, prompt: str, json_output: bool = False) -> str:
+        waited = self.request_bucket.acquire(1)
+        with self._lock:
+            self.requests += 1
+            self.throttle_wait_seconds += waited
+        with self._semaphore:
+            if json_output:
+                response = self.model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
+            else:
+                response = self.model.generate_content(prompt)
+        return response.text
+
+    def _analyze_one(self, full_name: str, context: str) -> str:
+        try:
+            return self._generate(single_prompt(context))
+        except Exception as e:
+            logger.warning(f"Gemini analysis of {full_name} failed: {e}")
+            with self._lock:
+                self.failures += 1
+            return f"AI Analysis failed: {str(e)}"
+
+    def _analyze_batch(self, contexts: Dict[str, str]) -> Dict[str, str]:
+        if len(contexts) == 1:
+            full_name, context = next(iter(contexts.items()))
+            return {full_name: self._analyze_one(full_name, context)}
+
+        analyses = {}
+        try:
+            answer = json.loads(self._generate(batch_prompt(contexts), json_output=True))
+            if isinstance(answer, dict):
+                requested = {full_name.lower(): full_name for full_name in contexts}
+                analyses = {requested[name.lower()]: text for name, text in answer.items()
+                            if name.lower() in requested and isinstance(text, str) and text.strip()}
+        except Exception as e:
+            logger.warning(f"Gemini batch analysis of {len(contexts)} repos failed, analysing them one by one: {e}")
+        with self._lock:
+            self.batched_repos += len(analyses)
+
+        for full_name, context in contexts.items():
+            if full_name not in analyses:
+                analyses[full_name] = self._analyze_one(full_name, context)
+        return analyses
+
+    def analyze_many(self, items: List[Tuple[str, Optional[str], Callable[[], str]]]) -> Dict[str, str]:
+        """
+        Analyses keyed by full name for ``(full name, head SHA, context builder)`` items.
+
+        The context builder is only called on a cache miss; without a head SHA
+        the analysis is not cached.
+        """
+        analyses, misses = {}, []
+        for full_name, head_sha, build_context in items:
+            cached = self.cache.get(full_name, head_sha, ANALYSIS_PROMPT_VERSION) if self.cache and head_sha else None
+            if cached is not None:
+                analyses[full_name] = cached
+            else:
+                misses.append((full_name, head_sha, build_context))
+        if not misses:
+            return analyses
+
+        def build(item):
+            try:
+                return item[2]()
+            except Exception as e:
+                logger.warning(f"Could not gather {item[0]} for analysis: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            contexts = {}
+            for (full_name, _, _), context in zip(misses, pool.map(build, misses)):
+                if context is None:
+                    analyses[full_name] = "AI Analysis failed: repository data unavailable"
+                else:
+                    contexts[full_name] = context
+
+            names = list(contexts)
+            batches = [{name: contexts[name] for name in names[start:start + self.batch_size]}
+                       for start in range(0, len(names), self.batch_size)]
+            for result in pool.map(self._analyze_batch, batches):
+                analyses.update(result)
+
+        if self.cache:
+            for full_name, head_sha, _ in misses:
+                analysis = analyses.get(full_name)
+                if head_sha and analysis and "AI Analysis failed" not in analysis:
+                    self.cache.put(full_name, head_sha, ANALYSIS_PROMPT_VERSION, analysis)
+        return analyses
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "batched_repos": self.batched_repos,
+                "failures": self.failures,
+                "throttle_wait_seconds": round(self.throttle_wait_seconds, 3),
+                "cache": self.cache.stats() if self.cache else None
+            }
@@ -0,0 +1,208 @@
+import json
+import re
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+# Word pieces and single punctuation marks; long words cost roughly one token per four characters
+_TOKEN_PIECE = re.compile(r"\w+|[^\w\s]")
+_PAGE_MARKER = re.compile(r"^--- Page \d+ ---$")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+
+SECTION_HEADINGS = {
+    'summary', 'professional summary', 'profile', 'about', 'about me', 'objective', 'career objective',
+    'education', 'academic background', 'academics', 'qualifications',
+    'experience', 'work experience', 'professional experience', 'employment', 'employment history',
+    'internships', 'internship', 'work history',
+    'projects', 'personal projects', 'academic projects', 'key projects',
+    'skills', 'technical skills', 'core competencies', 'technologies', 'tools',
+    'certifications', 'certificates', 'licenses', 'courses', 'coursework', 'relevant coursework',
+    'achievements', 'awards', 'honors', 'honours', 'accomplishments', 'awards and achievements',
+    'publications', 'research', 'papers',
+    'volunteering', 'volunteer experience', 'extracurricular activities', 'activities', 'leadership',
+    'positions of responsibility', 'hobbies', 'interests', 'languages', 'references'
+}
+
+
+def count_tokens(text: str) -> int:
+    """Approximate LLaMA token count of ``text``; errs on the high side for budgeting"""
+    if not text:
+        return 0
+    return sum(1 + (len(piece) - 1) // 4 for piece in _TOKEN_PIECE.findall(text))
+
+
+def compact_resume_text(text: str) -> str:
+    """
+    Resume text without the noise that costs tokens but carries no information.
+
+    Drops page markers, bare page numbers and header/footer lines repeated on
+    several pages, collapses runs of spaces and blank lines, and trims every
+    line.
+    """
+    pages = [[]]
+    for line in text.splitlines():
+        line = re.sub(r"[ \t\u00a0]+", " ", line).strip()
+        if _PAGE_MARKER.match(line):
+            pages.append([])
+        else:
+            pages[-1].append(line)
+    pages = [page for page in pages if any(page)]
+
+    repeated = set()
+    if len(pages) > 1:
+        counts = Counter(line for page in pages for line in set(page) if line and len(line) < 80)
+        repeated = {line for line, count in counts.items() if count >= max(2, len(pages) // 2 + 1)}
+
+    lines = []
+    for page in pages:
+        for line in page:
+            if line in repeated or _PAGE_NUMBER.match(line):
+                continue
+            if not line and (not lines or not lines[-1]):
+                continue
+            lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def is_section_heading(line: str) -> bool:
+    stripped = line.strip().rstrip(':').strip()
+    if not stripped or len(stripped) > 40:
+        return False
+    if stripped.lower() in SECTION_HEADINGS:
+        return True
+    # Short all-caps lines such as "OPEN SOURCE" are headings in most layouts
+    words = stripped.split()
+    return len(words) <= 4 and stripped.isupper() and any(c.isalpha() for c in stripped)
+
+
+def split_sections(text: str) -> List[str]:
+    """The resume split before every section heading; the first element is the header (name, contact)"""
+    sections = [[]]
+    for line in text.splitlines():
+        if is_section_heading(line) and any(sections[-1]):
+            sections.append([])
+        sections[-1].append(line)
+    return ["\n".join(section).strip() for section in sections if any(section)]
+
+
+def _split_word(word: str, max_tokens: int) -> List[str]:
+    """A word too large for one chunk (a long URL, base64, an unbroken OCR run) cut into pieces that fit"""
+    pieces = []
+    while word:
+        end = min(len(word), 4 * max_tokens)
+        tokens = count_tokens(word[:end])
+        while end > 1 and tokens > max_tokens:
+            end = min(end - 1, end * max_tokens // tokens)
+            tokens = count_tokens(word[:end])
+        pieces.append(word[:end])
+        word = word[end:]
+    return pieces
+
+
+def _split_oversize(section: str, max_tokens: int) -> List[str]:
+    """A section too large for one chunk, cut at line (or, failing that, word or even character) boundaries"""
+    pieces, current, current_tokens = [], [], 0
+    for line in section.splitlines():
+        line_tokens = count_tokens(line) + 1
+        if line_tokens > max_tokens:
+            words = [piece for word in line.split()
+                     for piece in (_split_word(word, max_tokens) if count_tokens(word) > max_tokens else [word])]
+            line_parts, part = [], []
+            for word in words:
+                if part and count_tokens(" ".join(part + [word])) > max_tokens:
+                    line_parts.append(" ".join(part))
+                    part = []
+                part.append(word)
+            if part:
+                line_parts.append(" ".join(part))
+        else:
+            line_parts = [line]
+
+        for part in line_parts:
+            part_tokens = count_tokens(part) + 1
+            if current and current_tokens + part_tokens > max_tokens:
+                pieces.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def chunk_resume(text: str, max_tokens: int) -> List[str]:
+    """
+    ``text`` packed into as few chunks of at most ``max_tokens`` as possible.
+
+    Whole sections are kept together and chunks follow the resume's order;
+    only a section that alone exceeds the budget is split across chunks.
+    """
+    if count_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks, current, current_tokens = [], [], 0
+    for section in split_sections(text):
+        section_tokens = count_tokens(section) + 2
+        parts = [section] if section_tokens <= max_tokens else _split_oversize(section, max_tokens)
+        for part in parts:
+            part_tokens = count_tokens(part) + 2
+            if current and current_tokens + part_tokens > max_tokens:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _item_key(item: Any) -> str:
+    if isinstance(item, str):
+        return item.strip().lower()
+    return json.dumps(item, sort_keys=True, ensure_ascii=False)
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def merge_extractions(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Chunk extractions combined into one, independent of completion order.
+
+    Parts are merged in chunk order: objects key by key, lists concatenated
+    without duplicates, and for other values the first non-empty one wins.
+    """
+    def merge(values: List[Any]) -> Any:
+        present = [value for value in values if not _is_empty(value)]
+        if not present:
+            return values[0] if values else None
+        if all(isinstance(value, dict) for value in present):
+            keys = []
+            for value in present:
+                keys.extend(key for key in value if key not in keys)
+            return {key: merge([value[key] for value in present if key in value]) for key in keys}
+        if all(isinstance(value, list) for value in present):
+            merged, seen = [], set()
+            for value in present:
+                for item in value:
+                    key = _item_key(item)
+                    if not _is_empty(item) and key not in seen:
+                        seen.add(key)
+                        merged.append(item)
+            return merged
+        return present[0]
+
+    return merge(list(parts)) if parts else {}
+
+
+def token_budget(context_tokens: int, max_output_tokens: int, prompt_overhead_tokens: int, margin: float = 0.1) -> int:
+    """Tokens of resume text that fit in one request next to the prompt template and the reserved output"""
+    return max(256, int((context_tokens - max_output_tokens - prompt_overhead_tokens) * (1 - margin)))
+
+
+def usage_counts(completion) -> Tuple[int, int]:
+    """(prompt tokens, completion tokens) reported for a chat completion, zeros if absent"""
+    usage = getattr(completion, 'usage', None)
+    if usage is None:
+        return 0, 0
+    return int(getattr(usage, 'prompt_tokens', 0) or 0), int(getattr(usage, 'completion_tokens', 0) or 0)
@@ -0,0 +1,225 @@
+import logging
+import threading
+from collections import Counter, deque
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Incremental updates remembered for patching statistics snapshots instead of recomputing them
+CHANGE_LOG_SIZE = 4096
+
+
+class InvertedIndex:
+    """
+    Resident inverted index over candidate documents.
+
+    Postings map each processed (stemmed) term to ``{candidate_id: term frequency}``
+    and document lengths are kept alongside, so a query only touches the
+    postings of its own terms instead of re-tokenizing the whole corpus.
+
+    Documents can be added, updated and removed individually; document frequency
+    is the posting list length and the total length is kept exactly, so the
+    statistics after any number of incremental updates equal a cold rebuild.
+
+    Every mutation bumps ``version``, and incremental ones are logged so
+    ``changes_since`` can tell a snapshot which candidates to patch. An
+    update touches only the posting lists of the candidate's own terms and
+    mutates them in place, so readers must hold ``lock`` and copy what they
+    keep (``CorpusStatistics`` does). A full ``build`` indexes into fresh
+    structures without holding ``lock`` and swaps them in at the end, so
+    searches keep running against the old index during a rebuild.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.term_frequencies: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.total_length = 0
+        self.version = 0
+        self.is_built = False
+        self.lock = threading.RLock()
+        # Incremental updates made while a build is running, replayed onto the rebuilt index
+        self._pending_updates: Optional[List[Tuple[str, Any]]] = None
+        # (version, candidate_id) of recent incremental updates; versions before _changes_base aren't covered
+        self._changes: deque = deque()
+        self._changes_base = 0
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __contains__(self, candidate_id: str) -> bool:
+        return candidate_id in self.documents
+
+    def clear(self):
+        with self.lock:
+            self.postings = {}
+            self.term_frequencies = {}
+            self.doc_lengths = {}
+            self.documents = {}
+            self.total_length = 0
+            self.version += 1
+            self.is_built = False
+            self._reset_changes()
+
+    def begin_build(self):
+        """
+        Start recording incremental updates for the next ``build``.
+
+        Call this before reading the candidates to build from, so updates that
+        land while they are being read are replayed onto the rebuilt index.
+        """
+        with self.lock:
+            if self._pending_updates is None:
+                self._pending_updates = []
+
+    def cancel_build(self):
+        """Stop recording updates after a build was abandoned"""
+        with self.lock:
+            self._pending_updates = None
+
+    def build(self, candidates: Iterable[Dict[str, Any]]):
+        """Build the index from candidates carrying ``candidate_id`` and ``processed_tokens``"""
+        # Later duplicates of a candidate ID replace earlier ones, as add_document would
+        unique_candidates: Dict[str, Dict[str, Any]] = {}
+        for candidate in candidates:
+            unique_candidates[candidate['candidate_id']] = candidate
+
+        self.begin_build()
+
+        fresh = InvertedIndex()
+        for candidate_id, candidate in unique_candidates.items():
+            for term, term_freq in fresh._index_fields(candidate).items():
+                fresh.postings.setdefault(term, {})[candidate_id] = term_freq
+
+        with self.lock:
+            self.postings = fresh.postings
+            self.term_frequencies = fresh.term_frequencies
+            self.doc_lengths = fresh.doc_lengths
+            self.documents = fresh.documents
+            self.total_length = fresh.total_length
+            self.version += 1
+            self.is_built = True
+            self._reset_changes()
+
+            pending_updates, self._pending_updates = self._pending_updates or [], None
+            for operation, argument in pending_updates:
+                if operation == 'add':
+                    self.add_document(argument)
+                else:
+                    self.remove_document(argument)
+        logger.info(f"Search index built: {len(self.documents)} candidates, {len(self.postings)} terms")
+
+    def add_document(self, candidate: Dict[str, Any]):
+        """Add a candidate document to the index, replacing any previous version"""
+        with self.lock:
+            if self._pending_updates is not None:
+                self._pending_updates.append(('add', candidate))
+            candidate_id = candidate['candidate_id']
+            if candidate_id in self.documents:
+                self._remove_postings(candidate_id)
+
+            term_frequencies = self._index_fields(candidate)
+            for term, term_freq in term_frequencies.items():
+                self.postings.setdefault(term, {})[candidate_id] = term_freq
+            self.version += 1
+            self._log_change(candidate_id)
+
+    def update_document(self, candidate: Dict[str, Any]):
+        """Re-index a single candidate; only that candidate's postings are touched"""
+        self.add_document(candidate)
+
+    def remove_document(self, candidate_id: str) -> bool:
+        """Remove a candidate from the index, returning whether it was indexed"""
+        with self.lock:
+            if self._pending_updates is not None:
+                self._pending_updates.append(('remove', candidate_id))
+            if candidate_id not in self.documents:
+                return False
+            self._remove_postings(candidate_id)
+            del self.documents[candidate_id]
+            self.version += 1
+            self._log_change(candidate_id)
+            return True
+
+    def _log_change(self, candidate_id: str):
+        if len(self._changes) >= CHANGE_LOG_SIZE:
+            self._changes_base = self._changes.popleft()[0]
+        self._changes.append((self.version, candidate_id))
+
+    def _reset_changes(self):
+        self._changes.clear()
+        self._changes_base = self.version
+
+    def changes_since(self, version: int) -> Optional[List[str]]:
+        """
+        Candidate IDs added, updated or removed after ``version``, in first-change order.
+
+        None when a build or clear happened since, or the change log no longer
+        reaches back that far; the caller must then recompute from scratch.
+        Must be called while holding ``lock``.
+        """
+        if version < self._changes_base:
+            return None
+        return list(dict.fromkeys(candidate_id for change_version, candidate_id in self._changes if change_version > version))
+
+    def _index_fields(self, candidate: Dict[str, Any]) -> Dict[str, int]:
+        """Store a candidate's document, length and term frequencies (postings excluded)"""
+        candidate_id = candidate['candidate_id']
+        tokens = candidate.get('processed_tokens') or []
+        term_frequencies = dict(Counter(tokens))
+
+        self.documents[candidate_id] = candidate
+        self.term_frequencies[candidate_id] = term_frequencies
+        self.doc_lengths[candidate_id] = len(tokens)
+        self.total_length += len(tokens)
+        return term_frequencies
+
+    def _remove_postings(self, candidate_id: str):
+        """Drop a candidate's postings and length, pruning terms left without postings"""
+        for term in self.term_frequencies.pop(candidate_id, {}):
+            postings = self.postings.get(term)
+            if postings is None or candidate_id not in postings:
+                continue
+            del postings[candidate_id]
+            if not postings:
+                del self.postings[term]
+
+        self.total_length -= self.doc_lengths.pop(candidate_id, 0)
+
+    def document_frequency(self, term: str) -> int:
+        """Number of indexed candidates containing a processed term"""
+        return len(self.postings.get(term, {}))
+
+    def get_postings(self, term: str) -> Dict[str, int]:
+        """Return ``{candidate_id: term frequency}`` for a processed term"""
+        return self.postings.get(term, {})
+
+    def average_document_length(self, candidate_ids: Optional[List[str]] = None) -> float:
+        """Average document length over the whole index or a subset of it"""
+        if candidate_ids is None:
+            return self.total_length / len(self.documents) if self.documents else 0
+        if not candidate_ids:
+            return 0
+        return sum(self.doc_lengths[cid] for cid in candidate_ids) / len(candidate_ids)
+
+    def candidate_ids(self, location_filter: Optional[str] = None) -> List[str]:
+        """
+        Candidate IDs in insertion order, optionally restricted to candidates whose
+        location contains ``location_filter`` (case-insensitive, like the Cypher filter).
+        """
+        if not location_filter:
+            return list(self.documents.keys())
+
+        return [
+            candidate_id for candidate_id, candidate in self.documents.items()
+            if self.matches_location(candidate, location_filter)
+        ]
+
+    @staticmethod
+    def matches_location(candidate: Dict[str, Any], location_filter: Optional[str]) -> bool:
+        """Whether a candidate is in a location filter's scope (always, without a filter)"""
+        if not location_filter:
+            return True
+        needle = location_filter.lower()
+        return any(needle in (location or '').lower() for location in (candidate.get('locations') or []))
@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import struct
+import time
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# File layout: magic, header length (uint64), JSON header, then 8-byte aligned sections
+_MAGIC = b'CANDSNP1'
+_ALIGNMENT = 8
+_SECTIONS = [
+    ('document_offsets', np.uint64),
+    ('document_bytes', np.uint8),
+    ('vocabulary_offsets', np.uint64),
+    ('vocabulary_bytes', np.uint8),
+    ('token_offsets', np.uint64),
+    ('token_ids', np.uint32),
+]
+
+
+def _encode_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """UTF-8 blob plus offsets (length n + 1) for a list of strings"""
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(item) for item in encoded], dtype=np.uint64)
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def _check_offsets(path: str, name: str, offsets: np.ndarray, size: int, count: int = None):
+    """Raise ValueError unless ``offsets`` run from 0 to ``size`` without going backwards"""
+    valid = (
+        offsets.size >= 1 and (count is None or offsets.size == count + 1)
+        and int(offsets[0]) == 0 and int(offsets[-1]) == size
+        and bool(np.all(offsets[1:] >= offsets[:-1]))
+    )
+    if not valid:
+        raise ValueError(f"{path} is corrupt: bad {name}")
+
+
+def _decode_strings(offsets: np.ndarray, blob: np.ndarray) -> List[str]:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[bounds[i]:bounds[i + 1]].decode('utf-8') for i in range(len(bounds) - 1)]
+
+
+def write_snapshot(path: str, candidates: List[Dict[str, Any]]):
+    """
+    Write fully joined candidate documents and their token streams to a columnar snapshot.
+
+    Documents are stored as JSON without ``processed_tokens``; tokens are
+    dictionary encoded into one uint32 column with per-candidate offsets. The
+    file is written to a temporary name and renamed, so readers never see a
+    partial snapshot.
+    """
+    vocabulary: Dict[str, int] = {}
+    token_ids: List[int] = []
+    token_offsets = [0]
+    documents = []
+
+    for candidate in candidates:
+        document = {key: value for key, value in candidate.items() if key != 'processed_tokens'}
+        documents.append(json.dumps(document, ensure_ascii=False, default=str))
+        for token in candidate.get('processed_tokens') or []:
+            token_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+        token_offsets.append(len(token_ids))
+
+    document_offsets, document_bytes = _encode_strings(documents)
+    vocabulary_offsets, vocabulary_bytes = _encode_strings(list(vocabulary))
+    arrays = {
+        'document_offsets': document_offsets,
+        'document_bytes': document_bytes,
+        'vocabulary_offsets': vocabulary_offsets,
+        'vocabulary_bytes': vocabulary_bytes,
+        'token_offsets': np.asarray(token_offsets, dtype=np.uint64),
+        'token_ids': np.asarray(token_ids, dtype=np.uint32),
+    }
+
+    # Section offsets are relative to the aligned start of the data area, right after the header
+    sections = {}
+    position = 0
+    for name, dtype in _SECTIONS:
+        array = arrays[name].astype(dtype, copy=False)
+        arrays[name] = array
+        sections[name] = [position, int(array.size)]
+        position += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+    header = json.dumps({
+        'created_at': time.time(),
+        'candidates': len(documents),
+        'vocabulary': len(vocabulary),
+        'tokens': len(token_ids),
+        'sections': sections
+    }).encode('utf-8')
+    data_start = -(-(len(_MAGIC) + 8 + len(header)) // _ALIGNMENT) * _ALIGNMENT
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as file:
+        file.write(_MAGIC)
+        file.write(struct.pack('<Q', len(header)))
+        file.write(header)
+        for name, _ in _SECTIONS:
+            file.seek(data_start + sections[name][0])
+            file.write(arrays[name].tobytes())
+        file.truncate(data_start + position)
+    os.replace(temporary_path, path)
+
+    logger.info(f"Wrote search snapshot {path}: {len(documents)} candidates, {len(vocabulary)} distinct tokens")
+
+
+def read_snapshot_header(path: str) -> Tuple[Dict[str, Any], int]:
+    """Snapshot metadata and the byte offset where its sections start; ValueError if it is not a valid snapshot"""
+    with open(path, 'rb') as file:
+        if file.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path} is not a candidate snapshot")
+        length_bytes = file.read(8)
+        if len(length_bytes) != 8:
+            raise ValueError(f"{path} is truncated")
+        (header_length,) = struct.unpack('<Q', length_bytes)
+        if header_length > os.fstat(file.fileno()).st_size - len(_MAGIC) - 8:
+            raise ValueError(f"{path} is truncated")
+        header_bytes = file.read(header_length)
+        header = json.loads(header_bytes.decode('utf-8'))
+    if not isinstance(header, dict) or not isinstance(header.get('sections'), dict):
+        raise ValueError(f"{path} has no snapshot header")
+    data_start = -(-(len(_MAGIC) + 8 + header_length) // _ALIGNMENT) * _ALIGNMENT
+    return header, data_start
+
+
+def read_snapshot(path: str) -> List[Dict[str, Any]]:
+    """
+    Load candidates (with ``processed_tokens`` restored) from a snapshot via memory mapping.
+
+    A truncated or corrupt snapshot raises ValueError (or KeyError for a
+    header missing a section) before any candidate is built.
+    """
+    header, data_start = read_snapshot_header(path)
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+
+    arrays = {}
+    for name, dtype in _SECTIONS:
+        offset, count = header['sections'][name]
+        start = data_start + offset
+        end = start + count * np.dtype(dtype).itemsize
+        if offset < 0 or count < 0 or end > mapped.size:
+            raise ValueError(f"{path} is truncated: section {name} ends past the end of the file")
+        arrays[name] = mapped[start:end].view(dtype)
+
+    _check_offsets(path, 'document offsets', arrays['document_offsets'], arrays['document_bytes'].size)
+    _check_offsets(path, 'vocabulary offsets', arrays['vocabulary_offsets'], arrays['vocabulary_bytes'].size)
+    documents = _decode_strings(arrays['document_offsets'], arrays['document_bytes'])
+    vocabulary = _decode_strings(arrays['vocabulary_offsets'], arrays['vocabulary_bytes'])
+    _check_offsets(path, 'token offsets', arrays['token_offsets'], arrays['token_ids'].size, len(documents))
+    token_offsets = arrays['token_offsets'].tolist()
+    token_ids = arrays['token_ids']
+    if token_ids.size and int(token_ids.max()) >= len(vocabulary):
+        raise ValueError(f"{path} is corrupt: token id outside the vocabulary")
+
+    candidates = []
+    for i, document in enumerate(documents):
+        candidate = json.loads(document)
+        if not isinstance(candidate, dict) or 'candidate_id' not in candidate:
+            raise ValueError(f"{path} is corrupt: document {i} is not a candidate")
+        candidate['processed_tokens'] = [vocabulary[token_id] for token_id in token_ids[token_offsets[i]:token_offsets[i + 1]].tolist()]
+        candidates.append(candidate)
+
+    logger.info(f"Read search snapshot {path}: {len(candidates)} candidates")
+    return candidates
@@ -0,0 +1,238 @@
+import logging
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Iterable, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from services.corpus_stats import CorpusStatistics
+
+logger = logging.getLogger(__name__)
+
+# Separator for the joined vocabulary; never produced by text_corpus chunks
+_VOCAB_SEPARATOR = '\x00'
+
+
+class SparseScoringEngine:
+    """
+    Vectorized BM25 / TF-IDF / exact-match scoring over a CSR term-document matrix.
+
+    Built once per CorpusStatistics snapshot. Rows are processed terms and
+    columns are candidates in ``stats.candidate_ids`` order, so each query
+    term is a contiguous slice of the matrix. The per-entry BM25 and TF-IDF
+    weights are query independent and precomputed; a query only adds the
+    rows of its terms. Contributions are accumulated term by term in query
+    order, which keeps the floating point results identical to the scalar
+    per-candidate loops.
+    """
+
+    def __init__(self, stats: CorpusStatistics, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.version = stats.version
+        self.candidate_ids = stats.candidate_ids
+        self.num_docs = len(self.candidate_ids)
+
+        self.term_rows: Dict[str, int] = {}
+        self.tf_matrix = self._build_tf_matrix(stats)
+        self.tfidf_weights, self.bm25_weights = self._build_weights(stats)
+
+        self._build_exact_match_structures(stats)
+        self._piece_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # Engines are shared by concurrent searches
+        self._piece_cache_lock = threading.Lock()
+
+        logger.info(
+            f"Built sparse scoring engine: {self.num_docs} candidates x {len(self.term_rows)} terms, "
+            f"{self.tf_matrix.nnz} non-zeros"
+        )
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def _build_tf_matrix(self, stats: CorpusStatistics) -> csr_matrix:
+        """Term-major CSR matrix of raw term frequencies"""
+        column_of = {candidate_id: column for column, candidate_id in enumerate(self.candidate_ids)}
+
+        indptr = [0]
+        indices: List[int] = []
+        data: List[int] = []
+        for term, postings in stats.postings.items():
+            self.term_rows[term] = len(indptr) - 1
+            indices.extend(column_of[candidate_id] for candidate_id in postings)
+            data.extend(postings.values())
+            indptr.append(len(indices))
+
+        return csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(self.term_rows), self.num_docs)
+        )
+
+    def _build_weights(self, stats: CorpusStatistics) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-entry TF-IDF and BM25 weights aligned with ``tf_matrix.data``"""
+        tf = self.tf_matrix.data
+        row_lengths = np.diff(self.tf_matrix.indptr)
+        total_docs = stats.total_docs
+
+        # IDF per row, using math.log exactly as the scalar scorers do
+        tfidf_idf = np.empty(len(self.term_rows), dtype=np.float64)
+        bm25_idf = np.empty(len(self.term_rows), dtype=np.float64)
+        for term, row in self.term_rows.items():
+            doc_freq = stats.document_frequency(term)
+            tfidf_idf[row] = math.log(total_docs / doc_freq)
+            bm25_idf[row] = math.log((total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+        # 1 + log(tf) via a lookup over the (few) distinct frequencies
+        distinct_tf, inverse = np.unique(tf, return_inverse=True)
+        log_tf = np.asarray([1 + math.log(value) for value in distinct_tf.tolist()], dtype=np.float64)
+        tfidf_weights = log_tf[inverse] * np.repeat(tfidf_idf, row_lengths)
+
+        doc_lengths = np.asarray([stats.doc_lengths[candidate_id] for candidate_id in self.candidate_ids], dtype=np.float64)
+        entry_doc_lengths = doc_lengths[self.tf_matrix.indices]
+        # avg_doc_length is only zero for an empty corpus, where there are no entries to normalize
+        length_ratios = entry_doc_lengths / stats.avg_doc_length if tf.size else entry_doc_lengths
+        tf_components = (tf * (self.k1 + 1)) / (
+            tf + self.k1 * (1 - self.b + self.b * length_ratios)
+        )
+        bm25_weights = np.repeat(bm25_idf, row_lengths) * tf_components
+
+        return tfidf_weights, bm25_weights
+
+    def _build_exact_match_structures(self, stats: CorpusStatistics):
+        """Space-delimited word postings and first-location map over the lowercased text corpus"""
+        self.texts_lower: List[str] = []
+        word_columns: Dict[str, List[int]] = {}
+        location_columns: Dict[str, List[int]] = {}
+
+        for column, candidate_id in enumerate(self.candidate_ids):
+            candidate = stats.documents[candidate_id]
+            text_lower = (candidate.get('text_corpus', '') or '').lower()
+            self.texts_lower.append(text_lower)
+
+            for word in set(text_lower.split(' ')):
+                if word:
+                    word_columns.setdefault(word, []).append(column)
+
+            locations = candidate.get('locations')
+            location_lower = locations[0].lower() if locations else ''
+            if location_lower:
+                location_columns.setdefault(location_lower, []).append(column)
+
+        self.vocabulary = list(word_columns.keys())
+        self.word_columns = {word: np.asarray(columns, dtype=np.int64) for word, columns in word_columns.items()}
+        self.location_columns = {loc: np.asarray(columns, dtype=np.int64) for loc, columns in location_columns.items()}
+
+        # Joined vocabulary lets substring lookups run as a single C-level regex scan
+        self._vocab_blob = _VOCAB_SEPARATOR.join(self.vocabulary)
+        offsets = []
+        position = 0
+        for word in self.vocabulary:
+            offsets.append(position)
+            position += len(word) + 1
+        self._vocab_offsets = np.asarray(offsets, dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _accumulate(self, weights: np.ndarray, processed_terms: Iterable[str]) -> np.ndarray:
+        scores = np.zeros(self.num_docs, dtype=np.float64)
+        indptr = self.tf_matrix.indptr
+        indices = self.tf_matrix.indices
+
+        for processed_term in processed_terms:
+            row = self.term_rows.get(processed_term)
+            if row is None:
+                continue
+            start, end = indptr[row], indptr[row + 1]
+            scores[indices[start:end]] += weights[start:end]
+
+        return scores
+
+    def tf_idf_scores(self, processed_terms: Iterable[str]) -> np.ndarray:
+        """TF-IDF score per candidate column for already processed (stemmed) query terms"""
+        return self._accumulate(self.tfidf_weights, processed_terms)
+
+    def bm25_scores(self, processed_terms: Iterable[str]) -> np.ndarray:
+        """BM25 score per candidate column for already processed (stemmed) query terms"""
+        return self._accumulate(self.bm25_weights, processed_terms)
+
+    def exact_match_bonus(self, query_terms: Iterable[str]) -> np.ndarray:
+        """Location, exact word and partial match bonuses per candidate column"""
+        bonus = np.zeros(self.num_docs, dtype=np.float64)
+
+        for term in query_terms:
+            term_lower = term.lower()
+
+            # Top priority: Exact location match
+            location_columns = self.location_columns.get(term_lower)
+            if location_columns is not None:
+                bonus[location_columns] += 10.0
+
+            exact_columns, partial_columns = self._match_columns(term_lower)
+            bonus[exact_columns] += 2.0
+            bonus[partial_columns] += 1.0
+
+        return bonus
+
+    def _match_columns(self, term_lower: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Columns whose corpus contains ``term_lower`` as a whole space-delimited
+        phrase (exact) or only as a substring (partial).
+        """
+        pieces = [piece for piece in term_lower.split(' ') if piece]
+
+        if pieces and ' ' not in term_lower:
+            # A space-free term matches inside a single chunk, so the word vocabulary answers both checks
+            exact_columns = self.word_columns.get(term_lower, np.empty(0, dtype=np.int64))
+            partial_columns = np.setdiff1d(self._columns_containing(term_lower), exact_columns, assume_unique=True)
+            return exact_columns, partial_columns
+
+        # Multi-word terms: every piece must occur in some chunk; verify the survivors directly
+        if pieces:
+            candidate_columns = self._columns_containing(pieces[0])
+            for piece in pieces[1:]:
+                candidate_columns = np.intersect1d(candidate_columns, self._columns_containing(piece), assume_unique=True)
+        else:
+            candidate_columns = np.arange(self.num_docs)
+
+        exact, partial = [], []
+        padded_term = f' {term_lower} '
+        for column in candidate_columns.tolist():
+            text_lower = self.texts_lower[column]
+            if padded_term in f' {text_lower} ':
+                exact.append(column)
+            elif term_lower in text_lower:
+                partial.append(column)
+
+        return np.asarray(exact, dtype=np.int64), np.asarray(partial, dtype=np.int64)
+
+    def _columns_containing(self, piece: str) -> np.ndarray:
+        """Sorted columns with at least one corpus chunk containing ``piece``"""
+        with self._piece_cache_lock:
+            cached = self._piece_cache.get(piece)
+            if cached is not None:
+                self._piece_cache.move_to_end(piece)
+                return cached
+
+        if _VOCAB_SEPARATOR in piece:
+            words = [word for word in self.vocabulary if piece in word]
+        else:
+            match_offsets = [match.start() for match in re.finditer(re.escape(piece), self._vocab_blob)]
+            word_indexes = np.unique(np.searchsorted(self._vocab_offsets, match_offsets, side='right') - 1)
+            words = [self.vocabulary[i] for i in word_indexes.tolist()]
+
+        if words:
+            columns = np.unique(np.concatenate([self.word_columns[word] for word in words]))
+        else:
+            columns = np.empty(0, dtype=np.int64)
+
+        with self._piece_cache_lock:
+            self._piece_cache[piece] = columns
+            if len(self._piece_cache) > 4096:
+                self._piece_cache.popitem(last=False)
+        return columns
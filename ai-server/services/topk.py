@@ -0,0 +1,46 @@
+import heapq
+from typing import List, Optional
+
+import numpy as np
+
+
+def select_top_k(scores: np.ndarray, top_k: Optional[int]) -> List[int]:
+    """
+    Positions of the ``top_k`` highest scores, best first.
+
+    Returns exactly ``sorted(range(n), key=scores.__getitem__, reverse=True)[:top_k]``,
+    including its tie order (earlier positions first), without sorting every
+    candidate: the k-th largest score is found in linear time and used as an
+    upper bound to discard candidates that cannot enter the top k, and only
+    the survivors go through a bounded heap of size k.
+    """
+    num_scores = len(scores)
+
+    if top_k is None or top_k < 0 or top_k >= num_scores:
+        # Slicing semantics for None/negative values, and nothing to prune when k covers everything
+        order = np.argsort(-scores, kind='stable').tolist()
+        return order[:top_k]
+
+    if top_k == 0:
+        return []
+
+    # Score of the k-th best candidate; anything strictly below it cannot be in the top k
+    threshold = np.partition(scores, num_scores - top_k)[num_scores - top_k]
+    survivors = np.flatnonzero(scores >= threshold).tolist()
+
+    values = scores.tolist()
+    return heapq.nlargest(top_k, survivors, key=lambda position: (values[position], -position))
+
+
+def min_max_normalize(scores: np.ndarray) -> np.ndarray:
+    """Vectorized 0-1 min-max normalization; a constant vector normalizes to all ones"""
+    if not scores.size:
+        return scores
+
+    max_score = scores.max()
+    min_score = scores.min()
+
+    if max_score == min_score:
+        return np.ones_like(scores)
+
+    return (scores - min_score) / (max_score - min_score)
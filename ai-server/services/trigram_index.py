@@ -0,0 +1,266 @@
+import logging
+from difflib import SequenceMatcher
+from typing import List, Dict, Any, Iterable, Set
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Similarity modes: "bounded" prunes SequenceMatcher calls with upper bounds, "exact" is the brute-force reference
+BOUNDED = "bounded"
+EXACT = "exact"
+
+# Queries longer than this look up field-in-query matches by scanning distinct fields instead of enumerating substrings
+_MAX_SUBSTRING_QUERY_LENGTH = 256
+
+
+def fuzzy_similarity(s1: str, s2: str) -> float:
+    """Calculate fuzzy string similarity using multiple algorithms"""
+    if not s1 or not s2:
+        return 0.0
+
+    s1_lower = s1.lower().strip()
+    s2_lower = s2.lower().strip()
+
+    # Exact match
+    if s1_lower == s2_lower:
+        return 1.0
+
+    # Substring match
+    if s1_lower in s2_lower or s2_lower in s1_lower:
+        return 0.8
+
+    # Sequence matcher similarity
+    seq_similarity = SequenceMatcher(None, s1_lower, s2_lower).ratio()
+
+    # Token-based similarity
+    tokens1 = set(s1_lower.split())
+    tokens2 = set(s2_lower.split())
+
+    if tokens1 and tokens2:
+        token_similarity = len(tokens1.intersection(tokens2)) / len(tokens1.union(tokens2))
+    else:
+        token_similarity = 0.0
+
+    # Return maximum similarity
+    return max(seq_similarity, token_similarity)
+
+
+def sequence_ratio_upper_bound(length1: int, length2: int) -> float:
+    """Length-only upper bound on SequenceMatcher.ratio() (same as real_quick_ratio)"""
+    total = length1 + length2
+    return 2.0 * min(length1, length2) / total if total else 1.0
+
+
+def bounded_sequence_ratio(s1: str, s2: str, floor: float = 0.0, max_error: float = 0.0) -> float:
+    """
+    SequenceMatcher(None, s1, s2).ratio(), skipped when it cannot matter.
+
+    Returns ``floor`` instead when cheap upper bounds show the ratio is at most
+    ``floor + max_error``, so ``max(floor, result)`` is within ``max_error`` of
+    ``max(floor, ratio)``; with ``max_error=0`` the maximum is exact.
+    """
+    if sequence_ratio_upper_bound(len(s1), len(s2)) <= floor + max_error:
+        return floor
+
+    matcher = SequenceMatcher(None, s1, s2)
+    if matcher.quick_ratio() <= floor + max_error:
+        return floor
+
+    return matcher.ratio()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramSimilarityIndex:
+    """
+    Indexed replacement for per-candidate ``fuzzy_similarity(query, field)`` maxima.
+
+    For every candidate the similarity is the maximum of ``fuzzy_similarity``
+    over its name, description, summary, text corpus, skills and technologies.
+    Instead of running SequenceMatcher over every field, the index answers the
+    equality and substring tiers through a field hash map and character
+    trigram postings over each candidate's fields, computes token overlap
+    from token postings, and only runs SequenceMatcher for fields whose length
+    and character-count upper bounds could still raise the candidate's score
+    by more than ``max_error``. ``mode="exact"`` keeps the brute-force path for
+    regression comparisons.
+    """
+
+    def __init__(self, candidate_ids: List[str], documents: Dict[str, Dict[str, Any]]):
+        self.candidate_ids = candidate_ids
+        self.num_docs = len(candidate_ids)
+
+        self.raw_fields: List[List[str]] = []
+        field_texts: List[str] = []
+        field_columns: List[int] = []
+        # A candidate's fields are contiguous: field ids field_offsets[c] .. field_offsets[c + 1]
+        self.field_offsets = [0]
+
+        for column, candidate_id in enumerate(candidate_ids):
+            candidate = documents[candidate_id]
+            raw = self._candidate_fields(candidate)
+            self.raw_fields.append(raw)
+            self.field_offsets.append(self.field_offsets[-1] + len(raw))
+            for field in raw:
+                field_texts.append(field.lower().strip())
+                field_columns.append(column)
+
+        self.field_texts = field_texts
+        self.field_columns = np.asarray(field_columns, dtype=np.int64)
+        self.field_lengths = np.asarray([len(text) for text in field_texts], dtype=np.int64)
+
+        # Normalized field text -> field ids, for equality and field-in-query matches
+        self.fields_by_text: Dict[str, List[int]] = {}
+        # Token -> field ids, and per-field distinct token counts, for token overlap
+        token_fields: Dict[str, List[int]] = {}
+        token_counts = []
+        for field_id, text in enumerate(field_texts):
+            self.fields_by_text.setdefault(text, []).append(field_id)
+            tokens = set(text.split())
+            token_counts.append(len(tokens))
+            for token in tokens:
+                token_fields.setdefault(token, []).append(field_id)
+        self.token_fields = {token: np.asarray(ids, dtype=np.int64) for token, ids in token_fields.items()}
+        self.field_token_counts = np.asarray(token_counts, dtype=np.int64)
+
+        # Trigram -> candidate columns with a field containing it
+        trigram_columns: Dict[str, List[int]] = {}
+        for column in range(self.num_docs):
+            column_trigrams = set()
+            for field_id in range(self.field_offsets[column], self.field_offsets[column + 1]):
+                column_trigrams.update(_trigrams(field_texts[field_id]))
+            for trigram in column_trigrams:
+                trigram_columns.setdefault(trigram, []).append(column)
+        self.trigram_columns = {trigram: np.asarray(columns, dtype=np.int64) for trigram, columns in trigram_columns.items()}
+
+        logger.info(
+            f"Built trigram similarity index: {self.num_docs} candidates, {len(field_texts)} fields, "
+            f"{len(self.trigram_columns)} trigrams"
+        )
+
+    @staticmethod
+    def _candidate_fields(candidate: Dict[str, Any]) -> List[str]:
+        """Fields compared against the query, matching the original similarity scorer"""
+        fields = [
+            candidate.get('name', ''),
+            candidate.get('description', ''),
+            candidate.get('summary', ''),
+            candidate.get('text_corpus', '')
+        ]
+        fields.extend(candidate.get('skills', []) or [])
+        fields.extend(candidate.get('technologies', []) or [])
+        return [field for field in fields if field]
+
+    def similarity_scores(self, query: str, mode: str = BOUNDED, max_error: float = 0.0) -> np.ndarray:
+        """
+        Maximum fuzzy similarity between ``query`` and each candidate's fields, in column order.
+
+        In bounded mode every score is within ``max_error`` below the exact value
+        (and exact when ``max_error`` is 0).
+        """
+        if mode == EXACT:
+            return self._exact_scores(query)
+
+        query_lower = query.lower().strip()
+        if not query or len(query_lower) < 3:
+            # Too short for trigrams (or empty); the direct path is cheap here
+            return self._exact_scores(query)
+
+        field_scores = np.zeros(len(self.field_texts), dtype=np.float64)
+        tiered = np.zeros(len(self.field_texts), dtype=bool)
+
+        # Tier 1: exact match
+        for field_id in self.fields_by_text.get(query_lower, []):
+            field_scores[field_id] = 1.0
+            tiered[field_id] = True
+
+        # Tier 2: substring match, field inside query ...
+        for field_id in self._fields_inside(query_lower):
+            if not tiered[field_id]:
+                field_scores[field_id] = 0.8
+                tiered[field_id] = True
+
+        # ... and query inside field, only possible for candidates holding all of the query's trigrams
+        for column in self._trigram_candidates(query_lower).tolist():
+            for field_id in range(self.field_offsets[column], self.field_offsets[column + 1]):
+                if not tiered[field_id] and query_lower in self.field_texts[field_id]:
+                    field_scores[field_id] = 0.8
+                    tiered[field_id] = True
+
+        # Token overlap for the remaining fields
+        query_tokens = set(query_lower.split())
+        postings = [self.token_fields[token] for token in query_tokens if token in self.token_fields]
+        if postings:
+            field_ids, shared = np.unique(np.concatenate(postings), return_counts=True)
+            keep = ~tiered[field_ids]
+            field_ids, shared = field_ids[keep], shared[keep]
+            overlap = shared / (len(query_tokens) + self.field_token_counts[field_ids] - shared)
+            field_scores[field_ids] = np.maximum(field_scores[field_ids], overlap)
+
+        scores = np.zeros(self.num_docs, dtype=np.float64)
+        np.maximum.at(scores, self.field_columns, field_scores)
+
+        # Sequence similarity, only where the length bound could still raise the candidate's score
+        query_length = len(query_lower)
+        length_bounds = 2.0 * np.minimum(self.field_lengths, query_length) / (self.field_lengths + query_length)
+        open_fields = np.flatnonzero(~tiered & (length_bounds > scores[self.field_columns] + max_error))
+        # Most promising fields first so later ones are more likely to be pruned
+        open_fields = open_fields[np.argsort(-length_bounds[open_fields], kind='stable')]
+
+        for field_id in open_fields.tolist():
+            column = self.field_columns[field_id]
+            current = scores[column]
+            if length_bounds[field_id] <= current + max_error:
+                continue
+            ratio = bounded_sequence_ratio(query_lower, self.field_texts[field_id], floor=current, max_error=max_error)
+            if ratio > current:
+                scores[column] = ratio
+
+        return scores
+
+    def _fields_inside(self, query_lower: str) -> Iterable[int]:
+        """Field ids whose normalized text is a substring of the query"""
+        if len(query_lower) > _MAX_SUBSTRING_QUERY_LENGTH:
+            for text, field_ids in self.fields_by_text.items():
+                if len(text) <= len(query_lower) and text in query_lower:
+                    yield from field_ids
+            return
+
+        substrings = {''}
+        for start in range(len(query_lower)):
+            for end in range(start + 1, len(query_lower) + 1):
+                substrings.add(query_lower[start:end])
+        for substring in substrings:
+            yield from self.fields_by_text.get(substring, [])
+
+    def _trigram_candidates(self, query_lower: str) -> np.ndarray:
+        """Columns having every trigram of the query in their fields; a superset of those containing it"""
+        trigram_postings = []
+        for trigram in _trigrams(query_lower):
+            columns = self.trigram_columns.get(trigram)
+            if columns is None:
+                return np.empty(0, dtype=np.int64)
+            trigram_postings.append(columns)
+
+        trigram_postings.sort(key=len)
+        candidates = trigram_postings[0]
+        for columns in trigram_postings[1:]:
+            if not candidates.size:
+                break
+            candidates = np.intersect1d(candidates, columns, assume_unique=True)
+
+        return candidates
+
+    def _exact_scores(self, query: str) -> np.ndarray:
+        """Brute-force reference: fuzzy_similarity against every field of every candidate"""
+        query_lower = query.lower()
+        scores = np.zeros(self.num_docs, dtype=np.float64)
+        for column, fields in enumerate(self.raw_fields):
+            max_similarity = 0.0
+            for field in fields:
+                max_similarity = max(max_similarity, fuzzy_similarity(query_lower, field))
+            scores[column] = max_similarity
+        return scores
@@ -0,0 +1,88 @@
+import json
+import random
+
+from services.candidate_store import CandidateStore
+
+FIELDS = ["candidate_name", "contact_information", "experience", "projects", "skills", "linkedin_data", "missing"]
+
+
+def make_candidate(rng: random.Random, number: int):
+    tricky = ['quote " inside', 'back\\slash', 'brace } and [ bracket', '"key": "value",', 'emoji ✓ and é', '']
+    candidate = {
+        '_id': {'$oid': f"{number:024x}"},
+        'candidate_name': rng.choice(tricky + [f"Candidate {number}"]),
+        'contact_information': {'location': rng.choice(["Pune", "New Delhi", ""]), 'github': None},
+        'experience': [{'title': rng.choice(tricky), 'years': rng.randint(0, 9)} for _ in range(rng.randint(0, 3))],
+        'projects': [],
+        'skills': rng.sample(["python", "go", "c++", "sql"], rng.randint(0, 4)),
+        'score': rng.random(),
+        'linkedin_data': {'blob': ''.join(rng.choice('ab{}[]",:\\') for _ in range(rng.randint(0, 200)))}
+    }
+    if rng.random() < 0.3:
+        del candidate['skills']
+    return candidate
+
+
+def write_candidates(path, candidates, seed: int):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('[\n')
+        for position, candidate in enumerate(candidates):
+            separator = ',\n' if position + 1 < len(candidates) else '\n'
+            # Mix compact and indented layouts, and escaped and raw non-ASCII text
+            indent = rng.choice([None, 2])
+            file.write(json.dumps(candidate, indent=indent, ensure_ascii=rng.random() < 0.5) + separator)
+        file.write(']\n')
+
+
+def test_get_fields_matches_json_loads(tmp_path):
+    rng = random.Random(6)
+    candidates = [make_candidate(rng, number) for number in range(120)]
+    path = tmp_path / "full_candidate.json"
+    write_candidates(path, candidates, seed=1)
+
+    store = CandidateStore(str(path), cache_size=8)
+    with open(path, encoding='utf-8') as file:
+        expected = {candidate['_id']['$oid']: candidate for candidate in json.load(file)}
+
+    assert list(store) == list(expected)
+    for oid, candidate in expected.items():
+        assert store[oid] == candidate
+        fields = rng.sample(FIELDS, rng.randint(1, len(FIELDS)))
+        assert store.get_fields(oid, fields) == {field: candidate[field] for field in fields if field in candidate}
+    store.close()
+
+
+def test_offset_index_is_reused_and_invalidated(tmp_path):
+    rng = random.Random(2)
+    path = tmp_path / "full_candidate.json"
+    write_candidates(path, [make_candidate(rng, number) for number in range(5)], seed=2)
+
+    first = CandidateStore(str(path))
+    listing = first.listing()
+    first.close()
+    assert (tmp_path / "full_candidate.json.idx.json").exists()
+
+    reused = CandidateStore(str(path))
+    assert reused.listing() == listing
+    reused.close()
+
+    replacement = [make_candidate(rng, number) for number in range(100, 103)]
+    write_candidates(path, replacement, seed=3)
+    rebuilt = CandidateStore(str(path))
+    assert list(rebuilt) == [candidate['_id']['$oid'] for candidate in replacement]
+    assert rebuilt.get_fields(replacement[1]['_id']['$oid'], ["projects"]) == {"projects": []}
+    rebuilt.close()
+
+
+def test_single_object_file(tmp_path):
+    candidate = make_candidate(random.Random(0), 1)
+    path = tmp_path / "candidate.json"
+    path.write_text(json.dumps(candidate, indent=4), encoding='utf-8')
+
+    store = CandidateStore(str(path))
+    assert len(store) == 1
+    assert store.get_fields(candidate['_id']['$oid'], ["score", "skills"]) == {
+        field: candidate[field] for field in ["score", "skills"] if field in candidate
+    }
+    store.close()
@@ -0,0 +1,171 @@
+import base64
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+from models.github_enrichment import GitHubEnrichmentJob
+
+README = "# demo\n\nA small command line tool that turns resumes into structured JSON for recruiters to search.\n"
+
+REPOS = [
+    {
+        "name": name, "stargazers_count": stars, "forks_count": 1, "watchers_count": stars, "language": "Python",
+        "description": f"{name} project", "html_url": f"https://github.com/alice/{name}", "size": 120,
+        "default_branch": "main", "fork": False, "created_at": "2023-01-02T00:00:00Z",
+        "updated_at": "2024-05-06T00:00:00Z", "pushed_at": "2024-05-06T00:00:00Z"
+    }
+    for name, stars in [("resume-parser", 12), ("dotfiles", 0)]
+]
+
+ROUTES = {
+    "/users/alice": {"login": "alice", "name": "Alice", "followers": 3, "following": 1, "public_repos": 2},
+    "/users/alice/repos": REPOS,
+    "/users/alice/followers": [{"login": "bob"}],
+    "/users/alice/following": [{"login": "carol"}],
+}
+for repo in REPOS:
+    base = f"/repos/alice/{repo['name']}"
+    ROUTES.update({
+        f"{base}/readme": {"sha": "r1", "content": base64.b64encode(README.encode()).decode()},
+        f"{base}/contributors": [{"login": "alice"}, {"login": "bob"}],
+        f"{base}/releases": [{"tag_name": "v1.0"}],
+        f"{base}/topics": {"names": ["cli", "python"]},
+        f"{base}/languages": {"Python": 900, "Shell": 100},
+        f"{base}/commits": [{"sha": "abc", "commit": {"author": {"date": "2024-05-06T00:00:00Z"}}}],
+        f"{base}/issues": [{"state": "open"}, {"state": "closed"}],
+    })
+
+# Status codes for paths that aren't answered with a body; 422 fails without being retried
+STATUSES = {"/users/ghost": 404, "/users/broken": 422}
+
+
+class MockGitHub(BaseHTTPRequestHandler):
+    requests = Counter()
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        MockGitHub.requests[path] += 1
+        status = STATUSES.get(path, 200 if path in ROUTES else 404)
+        body = json.dumps(ROUTES[path] if status == 200 else {"message": "Not Found"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_url():
+    MockGitHub.requests.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockGitHub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def write_candidates(candidate_dir, github_urls):
+    candidate_dir.mkdir()
+    for number, github_url in github_urls.items():
+        (candidate_dir / f"candidate_{number}.json").write_text(
+            json.dumps({"contact_information": {"github": github_url}}), encoding="utf-8"
+        )
+
+
+def make_job(tmp_path, api_url, **options):
+    return GitHubEnrichmentJob(
+        tmp_path / "candidate_data", tmp_path / "candidate_github", token=None, workers=4, api_url=api_url,
+        cache_path=str(tmp_path / "cache.sqlite3"), watermark_path=str(tmp_path / "watermarks.sqlite3"), **options
+    )
+
+
+def test_enrichment_counts_and_record_layout(tmp_path, api_url):
+    write_candidates(tmp_path / "candidate_data", {
+        1: "https://github.com/alice",
+        2: "github.com/Alice/resume-parser",
+        3: "https://github.com/ghost",
+        4: "https://github.com/broken",
+        5: None,
+        6: "https://github.com/",
+        7: "https://github.com/alice",
+    })
+    output_dir = tmp_path / "candidate_github"
+    output_dir.mkdir()
+    (output_dir / "github_candidate_7.json").write_text('{"done": true}', encoding="utf-8")
+
+    job = make_job(tmp_path, api_url)
+    assert job.backend == "rest"
+    job.run()
+
+    assert (job.enriched_count, job.skipped_count, job.no_github_count, job.not_found_count, job.failed_count) == (2, 1, 2, 1, 1)
+    assert sorted(path.name for path in output_dir.glob("*.json")) == [
+        "github_candidate_1.json", "github_candidate_2.json", "github_candidate_7.json"
+    ]
+    assert json.loads((output_dir / "github_candidate_7.json").read_text()) == {"done": True}
+    # Candidates 1 and 2 share the account, which is crawled once
+    assert MockGitHub.requests["/users/alice"] == 1
+    assert MockGitHub.requests["/repos/alice/resume-parser/readme"] == 1
+
+    record = json.loads((output_dir / "github_candidate_1.json").read_text(encoding="utf-8"))
+    assert list(record) == ["user_profile", "repositories_analysis", "top_repositories_by_stars",
+                            "top_10_projects_summary", "repositories", "metadata"]
+    assert record["user_profile"]["username"] == "@alice"
+    assert record["user_profile"]["top_followers"] == ["bob"]
+    assert record["repositories_analysis"] == {"total_repositories": 2, "total_stars": 12, "total_forks": 2,
+                                               "total_watchers": 12}
+    assert [repo["name"] for repo in record["top_repositories_by_stars"]] == ["resume-parser"]
+
+    top = record["repositories"][0]
+    assert (top["rank"], top["name"], top["contributors"], top["latest_release"]) == (1, "resume-parser", 2, "v1.0")
+    assert (top["open_issues"], top["closed_issues"], top["last_commit"]) == (1, 1, "2024-05-06")
+    assert top["language_breakdown"] == {"Python": 90.0, "Shell": 10.0}
+    assert top["readme_excerpt"].startswith("A small command line tool")
+    assert top["category"] == "Data Science/AI"
+    assert record["metadata"]["source_url"] == "https://github.com/alice"
+
+    second = json.loads((output_dir / "github_candidate_2.json").read_text(encoding="utf-8"))
+    assert second["metadata"]["source_url"] == "github.com/Alice/resume-parser"
+    assert {key: value for key, value in second.items() if key != "metadata"} == \
+        {key: value for key, value in record.items() if key != "metadata"}
+
+
+def test_rerun_skips_written_records_and_retries_the_rest(tmp_path, api_url):
+    write_candidates(tmp_path / "candidate_data", {
+        1: "https://github.com/alice",
+        2: "https://github.com/ghost",
+        3: "https://github.com/broken",
+    })
+    make_job(tmp_path, api_url).run()
+    MockGitHub.requests.clear()
+
+    job = make_job(tmp_path, api_url)
+    job.run()
+
+    assert (job.enriched_count, job.skipped_count, job.not_found_count, job.failed_count) == (0, 1, 1, 1)
+    assert MockGitHub.requests["/users/alice"] == 0
+    assert MockGitHub.requests["/users/ghost"] == 1
+    assert MockGitHub.requests["/users/broken"] == 1
+
+
+def test_refresh_reuses_details_of_unchanged_repositories(tmp_path, api_url):
+    write_candidates(tmp_path / "candidate_data", {1: "https://github.com/alice"})
+    make_job(tmp_path, api_url).run()
+    first = json.loads((tmp_path / "candidate_github" / "github_candidate_1.json").read_text(encoding="utf-8"))
+    MockGitHub.requests.clear()
+
+    job = make_job(tmp_path, api_url, refresh=True)
+    job.run()
+
+    assert job.enriched_count == 1
+    assert MockGitHub.requests["/users/alice"] == 1
+    assert not [path for path in MockGitHub.requests if path.startswith("/repos/")]
+    refreshed = json.loads((tmp_path / "candidate_github" / "github_candidate_1.json").read_text(encoding="utf-8"))
+    assert refreshed["repositories"] == first["repositories"]
@@ -0,0 +1,123 @@
+import random
+
+from services.corpus_stats import CorpusStatistics, CorpusStatisticsCache
+from services.search_index import InvertedIndex
+from services.sparse_scoring import SparseScoringEngine
+
+WORDS = [f"term{i}" for i in range(40)]
+LOCATIONS = ["Pune", "Delhi", "New Delhi", "Mumbai"]
+
+
+def make_candidate(rng: random.Random, number: int):
+    locations = rng.sample(LOCATIONS, rng.randint(1, 2))
+    base_tokens = rng.choices(WORDS, k=rng.randint(0, 25))
+    return {
+        'candidate_id': f"c{number}",
+        'base_tokens': base_tokens,
+        'locations': locations,
+        'text_corpus': ' '.join(base_tokens + locations),
+        'processed_tokens': base_tokens + [location.lower() for location in locations]
+    }
+
+
+def scope_to_location(candidate, location_filter):
+    """Stand-in for the server's scoping: only matching locations, tokens rebuilt from them"""
+    matching = [location for location in candidate['locations'] if location_filter.lower() in location.lower()]
+    if len(matching) == len(candidate['locations']):
+        return candidate
+    return dict(candidate, locations=matching,
+                processed_tokens=candidate['base_tokens'] + [location.lower() for location in matching])
+
+
+def mutate(rng: random.Random, index: InvertedIndex, steps: int):
+    for _ in range(steps):
+        if rng.random() < 0.65:
+            index.add_document(make_candidate(rng, rng.randint(0, 80)))
+        else:
+            index.remove_document(f"c{rng.randint(0, 80)}")
+
+
+def scores_by_id(stats: CorpusStatistics, query_terms):
+    engine = SparseScoringEngine(stats)
+    bm25 = engine.bm25_scores(query_terms)
+    tfidf = engine.tf_idf_scores(query_terms)
+    return {candidate_id: (bm25[column], tfidf[column]) for column, candidate_id in enumerate(stats.candidate_ids)}
+
+
+def test_incremental_updates_match_cold_rebuild():
+    rng = random.Random(7)
+    index = InvertedIndex()
+    index.build([make_candidate(rng, number) for number in range(50)])
+    mutate(rng, index, 400)
+
+    rebuilt = InvertedIndex()
+    rebuilt.build(list(index.documents.values()))
+
+    assert index.postings == rebuilt.postings
+    assert index.term_frequencies == rebuilt.term_frequencies
+    assert index.doc_lengths == rebuilt.doc_lengths
+    assert index.total_length == rebuilt.total_length
+    assert index.documents.keys() == rebuilt.documents.keys()
+
+
+def test_bm25_after_incremental_updates_matches_cold_rebuild():
+    rng = random.Random(11)
+    index = InvertedIndex()
+    index.build([make_candidate(rng, number) for number in range(50)])
+    cache = CorpusStatisticsCache(index)
+    cache.get()
+
+    query_terms = ["term1", "term7", "term7", "term30", "missing"]
+    for _ in range(30):
+        mutate(rng, index, rng.randint(1, 6))
+        patched = cache.get()
+
+        rebuilt = InvertedIndex()
+        rebuilt.build(list(index.documents.values()))
+        with rebuilt.lock:
+            cold = CorpusStatistics.from_index(rebuilt)
+
+        assert patched.document_frequencies == cold.document_frequencies
+        assert patched.total_length == cold.total_length
+        assert scores_by_id(patched, query_terms) == scores_by_id(cold, query_terms)
+    assert cache.stats()["patched"] == 30
+
+
+def test_patched_statistics_match_full_recompute_in_every_scope():
+    rng = random.Random(3)
+    index = InvertedIndex()
+    index.build([make_candidate(rng, number) for number in range(40)])
+    cache = CorpusStatisticsCache(index, scope_document=scope_to_location)
+
+    for step in range(120):
+        mutate(rng, index, rng.randint(1, 4))
+        if step == 60:
+            index.build([make_candidate(rng, number) for number in range(30)])
+        for location_filter in (None, "delhi", "pune"):
+            patched = cache.get(location_filter)
+            with index.lock:
+                candidate_ids = index.candidate_ids(location_filter) if location_filter else None
+                expected = CorpusStatistics.from_index(index, candidate_ids, location_filter, scope_to_location)
+
+            assert patched.candidate_ids == expected.candidate_ids
+            assert patched.postings == expected.postings
+            assert patched.document_frequencies == expected.document_frequencies
+            assert patched.doc_lengths == expected.doc_lengths
+            assert patched.total_length == expected.total_length
+            if location_filter:
+                assert all(location_filter in location.lower()
+                           for document in patched.documents.values() for location in document['locations'])
+
+
+def test_statistics_snapshot_is_unaffected_by_later_updates():
+    index = InvertedIndex()
+    index.build([{'candidate_id': 'a', 'processed_tokens': ['x', 'y']}])
+    with index.lock:
+        stats = CorpusStatistics.from_index(index)
+
+    index.add_document({'candidate_id': 'b', 'processed_tokens': ['x']})
+    index.remove_document('a')
+
+    assert stats.postings == {'x': {'a': 1}, 'y': {'a': 1}}
+    assert index.postings == {'x': {'b': 1}}
+    assert stats.total_length == 2
@@ -0,0 +1,123 @@
+import math
+import random
+from collections import Counter
+
+from services.corpus_stats import CorpusStatistics
+from services.search_index import InvertedIndex
+from services.sparse_scoring import SparseScoringEngine
+
+WORDS = ["python", "java", "react", "node.js", "c++", "ml", "data", "pune", "new", "delhi", "go", "rust"]
+LOCATIONS = ["Pune", "New Delhi", "Delhi", "Mumbai", ""]
+K1, B = 1.5, 0.75
+
+
+def make_candidates(seed: int, count: int):
+    rng = random.Random(seed)
+    candidates = []
+    for number in range(count):
+        words = rng.choices(WORDS, k=rng.randint(0, 20))
+        candidates.append({
+            'candidate_id': f"c{number}",
+            'text_corpus': ' '.join(words),
+            'processed_tokens': [word.replace('.', '') for word in words],
+            'locations': [rng.choice(LOCATIONS)] if rng.random() < 0.8 else []
+        })
+    return candidates
+
+
+def engine_for(candidates):
+    index = InvertedIndex()
+    index.build(candidates)
+    with index.lock:
+        return SparseScoringEngine(CorpusStatistics.from_index(index), k1=K1, b=B)
+
+
+def document_frequencies(candidates):
+    df = Counter()
+    for candidate in candidates:
+        df.update(set(candidate['processed_tokens']))
+    return df
+
+
+# Reference implementations: the per-candidate scoring loops the engine replaced
+
+def reference_tf_idf(candidates, processed_terms):
+    df = document_frequencies(candidates)
+    scores = []
+    for candidate in candidates:
+        tf = Counter(candidate['processed_tokens'])
+        score = 0.0
+        for term in processed_terms:
+            if term in tf and df.get(term, 0) > 0:
+                score += (1 + math.log(tf[term])) * math.log(len(candidates) / df[term])
+        scores.append(score)
+    return scores
+
+
+def reference_bm25(candidates, processed_terms):
+    df = document_frequencies(candidates)
+    avg_doc_length = sum(len(candidate['processed_tokens']) for candidate in candidates) / len(candidates)
+    scores = []
+    for candidate in candidates:
+        tf = Counter(candidate['processed_tokens'])
+        doc_length = len(candidate['processed_tokens'])
+        score = 0.0
+        for term in processed_terms:
+            if term in tf and df.get(term, 0) > 0:
+                idf = math.log((len(candidates) - df[term] + 0.5) / (df[term] + 0.5))
+                tf_component = (tf[term] * (K1 + 1)) / (tf[term] + K1 * (1 - B + B * (doc_length / avg_doc_length)))
+                score += idf * tf_component
+        scores.append(score)
+    return scores
+
+
+def reference_exact_match(candidates, query_terms):
+    scores = []
+    for candidate in candidates:
+        text_lower = candidate.get('text_corpus', '').lower()
+        location_lower = candidate['locations'][0].lower() if candidate.get('locations') else ''
+        score = 0.0
+        for term in query_terms:
+            term_lower = term.lower()
+            if term_lower == location_lower and location_lower:
+                score += 10.0
+            if f' {term_lower} ' in f' {text_lower} ':
+                score += 2.0
+            elif term_lower in text_lower:
+                score += 1.0
+        scores.append(score)
+    return scores
+
+
+def test_tf_idf_and_bm25_match_reference_exactly():
+    candidates = make_candidates(5, 300)
+    engine = engine_for(candidates)
+    assert engine.candidate_ids == [candidate['candidate_id'] for candidate in candidates]
+
+    rng = random.Random(1)
+    for _ in range(50):
+        processed_terms = [word.replace('.', '') for word in rng.choices(WORDS + ["unknown"], k=rng.randint(1, 5))]
+        assert engine.tf_idf_scores(processed_terms).tolist() == reference_tf_idf(candidates, processed_terms)
+        assert engine.bm25_scores(processed_terms).tolist() == reference_bm25(candidates, processed_terms)
+
+
+def test_exact_match_bonus_matches_reference():
+    candidates = make_candidates(9, 300)
+    engine = engine_for(candidates)
+
+    query_terms = ["Python", "pune", "New Delhi", "delhi", "node", ".js", "c++", "a", "ja", "data ml", "missing", " "]
+    for term in query_terms:
+        assert engine.exact_match_bonus([term]).tolist() == reference_exact_match(candidates, [term]), term
+    assert engine.exact_match_bonus(query_terms).tolist() == reference_exact_match(candidates, query_terms)
+
+
+def test_empty_documents_score_zero():
+    candidates = [
+        {'candidate_id': 'empty', 'text_corpus': '', 'processed_tokens': [], 'locations': []},
+        {'candidate_id': 'full', 'text_corpus': 'python', 'processed_tokens': ['python'], 'locations': ['Pune']}
+    ]
+    engine = engine_for(candidates)
+
+    assert engine.tf_idf_scores(['python']).tolist() == reference_tf_idf(candidates, ['python'])
+    assert engine.bm25_scores(['python']).tolist() == reference_bm25(candidates, ['python'])
+    assert engine.bm25_scores(['python'])[0] == 0.0
@@ -0,0 +1,32 @@
+import random
+
+import numpy as np
+
+from services.topk import select_top_k, min_max_normalize
+
+
+def sorted_slice(scores, top_k):
+    return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:top_k]
+
+
+def test_select_top_k_matches_sorted_slice_with_ties():
+    rng = random.Random(2)
+    for _ in range(300):
+        size = rng.randint(0, 60)
+        # Few distinct values so ties straddle the k-th position
+        scores = np.asarray([rng.choice([0.0, 0.5, 1.0, 1.5, 2.0]) for _ in range(size)], dtype=np.float64)
+        for top_k in (None, -1, -5, 0, 1, 3, 10, size - 1, size, size + 1):
+            assert select_top_k(scores, top_k) == sorted_slice(scores.tolist(), top_k), (scores.tolist(), top_k)
+
+
+def test_select_top_k_matches_sorted_slice_on_distinct_scores():
+    rng = np.random.default_rng(4)
+    scores = rng.random(5000)
+    for top_k in (1, 20, 100, 4999):
+        assert select_top_k(scores, top_k) == sorted_slice(scores.tolist(), top_k)
+
+
+def test_min_max_normalize():
+    np.testing.assert_array_equal(min_max_normalize(np.asarray([2.0, 4.0, 3.0])), [0.0, 1.0, 0.5])
+    np.testing.assert_array_equal(min_max_normalize(np.asarray([3.0, 3.0])), [1.0, 1.0])
+    assert min_max_normalize(np.asarray([])).size == 0
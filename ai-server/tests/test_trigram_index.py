@@ -0,0 +1,59 @@
+import random
+
+from services.trigram_index import TrigramSimilarityIndex, fuzzy_similarity, BOUNDED, EXACT
+
+WORDS = ["python", "java", "javascript", "react", "react native", "machine learning", "data", "pune", "go", "c++",
+         "Senior Engineer", "backend developer", "ml"]
+
+
+def make_documents(seed: int, count: int):
+    rng = random.Random(seed)
+    documents = {}
+    for number in range(count):
+        documents[f"c{number}"] = {
+            'name': rng.choice(["Asha Rao", "Rahul Verma", "", "Priya"]),
+            'description': ' '.join(rng.choices(WORDS, k=rng.randint(0, 4))),
+            'summary': ' '.join(rng.choices(WORDS, k=rng.randint(0, 8))),
+            'text_corpus': ' '.join(rng.choices(WORDS, k=rng.randint(0, 20))),
+            'skills': rng.sample(WORDS, rng.randint(0, 4)),
+            'technologies': rng.sample(WORDS, rng.randint(0, 2)) if rng.random() < 0.5 else None
+        }
+    return documents
+
+
+def brute_force(documents, candidate_ids, query):
+    """The per-candidate loop the index replaced"""
+    scores = []
+    for candidate_id in candidate_ids:
+        candidate = documents[candidate_id]
+        fields = [candidate.get('name', ''), candidate.get('description', ''),
+                  candidate.get('summary', ''), candidate.get('text_corpus', '')]
+        fields += (candidate.get('skills', []) or []) + (candidate.get('technologies', []) or [])
+        scores.append(max([fuzzy_similarity(query.lower(), field) for field in fields if field] or [0.0]))
+    return scores
+
+
+QUERIES = ["python", "Python developer", "react", "reakt nativ", "machine learning engineer", "ml", "go", "",
+           "pune", "senior engineer", "c++ developer in pune", "zzz", "  java  "]
+
+
+def test_bounded_scores_equal_brute_force():
+    documents = make_documents(3, 150)
+    candidate_ids = list(documents)
+    index = TrigramSimilarityIndex(candidate_ids, documents)
+
+    for query in QUERIES:
+        expected = brute_force(documents, candidate_ids, query)
+        assert index.similarity_scores(query, mode=EXACT).tolist() == expected, query
+        assert index.similarity_scores(query, mode=BOUNDED).tolist() == expected, query
+
+
+def test_bounded_scores_stay_within_max_error():
+    documents = make_documents(8, 150)
+    candidate_ids = list(documents)
+    index = TrigramSimilarityIndex(candidate_ids, documents)
+
+    for query in QUERIES:
+        expected = brute_force(documents, candidate_ids, query)
+        approximate = index.similarity_scores(query, max_error=0.05).tolist()
+        assert all(exact - 0.05 <= score <= exact for score, exact in zip(approximate, expected)), query